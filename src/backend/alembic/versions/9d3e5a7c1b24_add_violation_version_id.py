@@ -0,0 +1,26 @@
+"""add_violation_version_id
+
+Revision ID: 9d3e5a7c1b24
+Revises: 262ac1c3404f
+Create Date: 2026-10-18 10:12:37.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3e5a7c1b24'
+down_revision: Union[str, None] = '262ac1c3404f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('violations', sa.Column('version_id', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    op.drop_column('violations', 'version_id')
@@ -0,0 +1,28 @@
+"""add_violations_user_created_index
+
+Revision ID: a3c5e7f90b12
+Revises: e91b3f5d7a26
+Create Date: 2026-10-18 19:04:51.226310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c5e7f90b12'
+down_revision: Union[str, None] = 'e91b3f5d7a26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_violations_user_id_created_at_id', 'violations', ['user_id', 'created_at', 'id'], unique=False)
+    # Left prefix of the composite index, no longer needed
+    op.drop_index(op.f('ix_violations_user_id'), table_name='violations')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_violations_user_id'), 'violations', ['user_id'], unique=False)
+    op.drop_index('ix_violations_user_id_created_at_id', table_name='violations')
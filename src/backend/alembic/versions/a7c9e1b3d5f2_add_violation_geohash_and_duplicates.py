@@ -0,0 +1,90 @@
+"""add_violation_geohash_and_duplicates
+
+Revision ID: a7c9e1b3d5f2
+Revises: f2a4b6c8d0e1
+Create Date: 2026-10-18 22:06:30.774215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c9e1b3d5f2'
+down_revision: Union[str, None] = 'f2a4b6c8d0e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 5000
+
+# Frozen copy of foundation.geohash.encode at full precision: the backfill must
+# produce what this revision stored, whatever the module becomes later
+GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 12
+
+
+def encode(latitude: float, longitude: float) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < GEOHASH_PRECISION:
+        # Bits alternate between longitude and latitude, longitude first
+        rng, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coordinate >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def upgrade() -> None:
+    op.add_column('violations', sa.Column('geohash', sa.String(length=12, collation='C'), nullable=True))
+    op.add_column('violations', sa.Column('duplicate_of_id', sa.String(length=36), nullable=True))
+    op.create_foreign_key(
+        'fk_violations_duplicate_of_id_violations', 'violations', 'violations', ['duplicate_of_id'], ['id']
+    )
+    op.create_index(op.f('ix_violations_duplicate_of_id'), 'violations', ['duplicate_of_id'], unique=False)
+
+    # Geohash is computed in Python (no PostGIS), backfill existing rows in batches
+    conn = op.get_bind()
+    violations = sa.table(
+        'violations', sa.column('id'), sa.column('latitude'), sa.column('longitude'), sa.column('geohash')
+    )
+    while True:
+        rows = conn.execute(
+            sa.select(violations.c.id, violations.c.latitude, violations.c.longitude)
+            .where(
+                violations.c.geohash.is_(None),
+                violations.c.latitude.is_not(None),
+                violations.c.longitude.is_not(None),
+            )
+            .limit(BACKFILL_BATCH)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            violations.update().where(violations.c.id == sa.bindparam('violation_id')),
+            [{'violation_id': row.id, 'geohash': encode(row.latitude, row.longitude)} for row in rows],
+        )
+
+    op.create_index(
+        'ix_violations_plate_geohash_created_at', 'violations',
+        ['license_plate_normalized', 'geohash', 'created_at'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_violations_plate_geohash_created_at', table_name='violations')
+    op.drop_index(op.f('ix_violations_duplicate_of_id'), table_name='violations')
+    op.drop_constraint('fk_violations_duplicate_of_id_violations', 'violations', type_='foreignkey')
+    op.drop_column('violations', 'duplicate_of_id')
+    op.drop_column('violations', 'geohash')
@@ -0,0 +1,41 @@
+"""add_cache_entries_table
+
+Revision ID: b7f21c4e8a90
+Revises: 9d3e5a7c1b24
+Create Date: 2026-10-18 14:41:09.226714
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7f21c4e8a90'
+down_revision: Union[str, None] = '9d3e5a7c1b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('cache_entries',
+    sa.Column('namespace', sa.String(length=50), nullable=False),
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('namespace', 'key')
+    )
+    op.create_index(op.f('ix_cache_entries_latitude'), 'cache_entries', ['latitude'], unique=False)
+    op.create_index(op.f('ix_cache_entries_longitude'), 'cache_entries', ['longitude'], unique=False)
+    op.create_index(op.f('ix_cache_entries_expires_at'), 'cache_entries', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_cache_entries_expires_at'), table_name='cache_entries')
+    op.drop_index(op.f('ix_cache_entries_longitude'), table_name='cache_entries')
+    op.drop_index(op.f('ix_cache_entries_latitude'), table_name='cache_entries')
+    op.drop_table('cache_entries')
@@ -0,0 +1,28 @@
+"""add_violations_geohash_index
+
+Revision ID: b8d0f2a4c6e3
+Revises: a7c9e1b3d5f2
+Create Date: 2026-10-18 22:47:18.390521
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d0f2a4c6e3'
+down_revision: Union[str, None] = 'a7c9e1b3d5f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_violations_geohash', 'violations', ['geohash'], unique=False,
+        postgresql_include=['latitude', 'longitude', 'status'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_violations_geohash', table_name='violations')
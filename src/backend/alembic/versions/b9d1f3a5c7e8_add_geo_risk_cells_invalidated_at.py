@@ -0,0 +1,32 @@
+"""add_geo_risk_cells_invalidated_at
+
+Cells invalidated with the parking cache (DELETE /parking-analysis/cache)
+are marked rather than deleted, so API workers drop them from their
+in-memory grid on their next incremental reload.
+
+Revision ID: b9d1f3a5c7e8
+Revises: e5b7d9f1a3c4
+Create Date: 2026-10-19 11:02:45.613208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9d1f3a5c7e8'
+down_revision: Union[str, None] = 'e5b7d9f1a3c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('geo_risk_cells', sa.Column('invalidated_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_geo_risk_cells_invalidated_at'), 'geo_risk_cells', ['invalidated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_geo_risk_cells_invalidated_at'), table_name='geo_risk_cells')
+    op.drop_column('geo_risk_cells', 'invalidated_at')
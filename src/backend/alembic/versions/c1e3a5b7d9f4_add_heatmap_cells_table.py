@@ -0,0 +1,71 @@
+"""add_heatmap_cells_table
+
+Revision ID: c1e3a5b7d9f4
+Revises: b8d0f2a4c6e3
+Create Date: 2026-10-18 23:31:52.104866
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1e3a5b7d9f4'
+down_revision: Union[str, None] = 'b8d0f2a4c6e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of interactors.heatmap.REBUILD_SQL and the levels it served
+# when this revision was written (zoom 8..16, 32x32 bins per tile), so the
+# backfill does not follow later changes to that module or to the
+# HEATMAP_*_ZOOM settings. scripts/rebuild_heatmap.py re-bins the table for
+# the current settings.
+BACKFILL_LEVELS = (13, 21)
+MAX_LATITUDE = 85.05112878
+BACKFILL_SQL = """
+    INSERT INTO heatmap_cells (level, x, y, count, updated_at)
+    SELECT levels.level, finest.x >> (CAST(:top AS int) - levels.level), finest.y >> (CAST(:top AS int) - levels.level),
+        sum(finest.n), now()
+    FROM (
+        SELECT x, y, count(*) AS n
+        FROM (
+            SELECT
+                least(floor((longitude + 180) / 360 * n), n - 1)::int AS x,
+                least(greatest(floor((1 - ln(tan(radians(lat)) + 1 / cos(radians(lat))) / pi()) / 2 * n), 0), n - 1)::int AS y
+            FROM (
+                SELECT longitude, greatest(-CAST(:max_lat AS float8), least(CAST(:max_lat AS float8), latitude)) AS lat,
+                    CAST(:bins_per_side AS float8) AS n
+                FROM violations
+                WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+                    AND duplicate_of_id IS NULL
+                    AND status IN ('SUBMITTED', 'UNDER_REVIEW', 'RESOLVED')
+            ) AS located
+        ) AS points
+        GROUP BY x, y
+    ) AS finest,
+    generate_series(CAST(:bottom AS int), CAST(:top AS int)) AS levels(level)
+    GROUP BY 1, 2, 3
+"""
+
+
+def upgrade() -> None:
+    op.create_table('heatmap_cells',
+    sa.Column('level', sa.Integer(), nullable=False),
+    sa.Column('x', sa.Integer(), nullable=False),
+    sa.Column('y', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('level', 'x', 'y')
+    )
+
+    # Count the violations already submitted
+    bottom, top = BACKFILL_LEVELS
+    op.get_bind().execute(sa.text(BACKFILL_SQL), {
+        'bottom': bottom, 'top': top, 'bins_per_side': 1 << top, 'max_lat': MAX_LATITUDE,
+    })
+
+
+def downgrade() -> None:
+    op.drop_table('heatmap_cells')
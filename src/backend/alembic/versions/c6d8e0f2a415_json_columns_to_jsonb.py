@@ -0,0 +1,53 @@
+"""json_columns_to_jsonb
+
+Revision ID: c6d8e0f2a415
+Revises: a3c5e7f90b12
+Create Date: 2026-10-18 20:31:09.518742
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6d8e0f2a415'
+down_revision: Union[str, None] = 'a3c5e7f90b12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = [
+    ('photos', 'exif_data'),
+    ('photos', 'ocr_results'),
+    ('violations', 'violations'),
+    ('violations', 'violation_metadata'),
+]
+
+
+def upgrade() -> None:
+    for table, column in COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=postgresql.JSONB(astext_type=sa.Text()),
+            existing_type=sa.JSON(),
+            existing_nullable=True,
+            postgresql_using=f'{column}::jsonb',
+        )
+    op.create_index(
+        'ix_photos_violation_id_ocr_ok', 'photos', ['violation_id', 'photo_type'], unique=False,
+        postgresql_where=sa.text("ocr_results->>'status' = 'OK'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_photos_violation_id_ocr_ok', table_name='photos')
+    for table, column in COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(astext_type=sa.Text()),
+            existing_nullable=True,
+            postgresql_using=f'{column}::json',
+        )
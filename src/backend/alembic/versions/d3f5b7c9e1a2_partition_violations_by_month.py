@@ -0,0 +1,133 @@
+"""partition_violations_by_month
+
+Range-partitions violations (by created_at) and violation_status_history
+(by changed_at) by month. PostgreSQL cannot turn a table into a partitioned
+one in place, so each is copied into a new partitioned table: this takes a
+write lock for the duration of the copy, plan a maintenance window on large
+databases. Foreign keys into violations are dropped, a partitioned table
+can only be referenced through a unique key that includes created_at.
+
+Revision ID: d3f5b7c9e1a2
+Revises: c1e3a5b7d9f4
+Create Date: 2026-10-19 00:12:06.481925
+
+"""
+from datetime import datetime
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f5b7c9e1a2'
+down_revision: Union[str, None] = 'c1e3a5b7d9f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PREMAKE_MONTHS = 3
+
+
+# Frozen copies of the foundation.partitions helpers: this revision must keep
+# creating the partitions it always did, whatever that module becomes later
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def create_partition_sql(table: str, month: datetime) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table}_{month:%Y_%m} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+    )
+
+
+def _copy_rows(source: str, target: str) -> None:
+    # Generated columns (license_plate_normalized) are recomputed, not copied
+    columns = ", ".join(op.get_bind().execute(sa.text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :table AND is_generated = 'NEVER' "
+        "ORDER BY ordinal_position"
+    ), {"table": source}).scalars())
+    op.execute(f"INSERT INTO {target} ({columns}) SELECT {columns} FROM {source}")
+
+
+def _rebuild(table: str, partition_key: Optional[str]) -> None:
+    """Replace `table` by a copy of it, range-partitioned by month of `partition_key` (None: not partitioned)"""
+    old = f"{table}_old"
+    op.rename_table(table, old)
+    partition_by = f" PARTITION BY RANGE ({partition_key})" if partition_key else ""
+    op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING GENERATED){partition_by}")
+
+    if partition_key:
+        # Every month holding rows, up to PREMAKE_MONTHS ahead (then foundation/partitions.py takes over)
+        first = op.get_bind().execute(sa.text(f"SELECT min({partition_key}) FROM {old}")).scalar()
+        month = month_start(first or datetime.utcnow())
+        last = add_months(month_start(datetime.utcnow()), PREMAKE_MONTHS)
+        while month <= last:
+            op.execute(create_partition_sql(table, month))
+            month = add_months(month, 1)
+
+    _copy_rows(old, table)
+    # Dropping the old table frees its constraint and index names
+    op.drop_table(old)
+    op.create_primary_key(f"{table}_pkey", table, ["id", partition_key] if partition_key else ["id"])
+    op.execute(f"ANALYZE {table}")
+
+
+def _create_history_indexes() -> None:
+    op.create_index(op.f('ix_violation_status_history_changed_at'), 'violation_status_history', ['changed_at'], unique=False)
+    op.create_index(op.f('ix_violation_status_history_violation_id'), 'violation_status_history', ['violation_id'], unique=False)
+
+
+def _create_violation_indexes() -> None:
+    op.create_index(op.f('ix_violations_created_at'), 'violations', ['created_at'], unique=False)
+    op.create_index(op.f('ix_violations_license_plate'), 'violations', ['license_plate'], unique=False)
+    op.create_index(op.f('ix_violations_status'), 'violations', ['status'], unique=False)
+    op.create_index(op.f('ix_violations_duplicate_of_id'), 'violations', ['duplicate_of_id'], unique=False)
+    op.create_index('ix_violations_user_id_created_at_id', 'violations', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index(
+        'ix_violations_geohash', 'violations', ['geohash'], unique=False,
+        postgresql_include=['latitude', 'longitude', 'status'],
+    )
+    op.create_index(
+        'ix_violations_plate_geohash_created_at', 'violations',
+        ['license_plate_normalized', 'geohash', 'created_at'], unique=False,
+    )
+    op.create_index(
+        'ix_violations_license_plate_normalized_trgm', 'violations', ['license_plate_normalized'], unique=False,
+        postgresql_using='gin', postgresql_ops={'license_plate_normalized': 'gin_trgm_ops'},
+    )
+
+
+def upgrade() -> None:
+    op.drop_constraint('photos_violation_id_fkey', 'photos', type_='foreignkey')
+    op.drop_constraint('fk_violations_duplicate_of_id_violations', 'violations', type_='foreignkey')
+
+    # History first: dropping its old table drops its foreign key into violations
+    _rebuild('violation_status_history', 'changed_at')
+    _create_history_indexes()
+    _rebuild('violations', 'created_at')
+    op.create_foreign_key('violations_user_id_fkey', 'violations', 'users', ['user_id'], ['id'])
+    _create_violation_indexes()
+
+
+def downgrade() -> None:
+    _rebuild('violations', None)
+    op.create_foreign_key('violations_user_id_fkey', 'violations', 'users', ['user_id'], ['id'])
+    _create_violation_indexes()
+    _rebuild('violation_status_history', None)
+    _create_history_indexes()
+
+    op.create_foreign_key(
+        'violation_status_history_violation_id_fkey', 'violation_status_history', 'violations',
+        ['violation_id'], ['id'],
+    )
+    op.create_foreign_key(
+        'fk_violations_duplicate_of_id_violations', 'violations', 'violations', ['duplicate_of_id'], ['id']
+    )
+    op.create_foreign_key('photos_violation_id_fkey', 'photos', 'violations', ['violation_id'], ['id'])
@@ -0,0 +1,40 @@
+"""add_geo_risk_cells_table
+
+Revision ID: d4a8c2f61e37
+Revises: b7f21c4e8a90
+Create Date: 2026-10-18 16:05:42.518390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8c2f61e37'
+down_revision: Union[str, None] = 'b7f21c4e8a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('geo_risk_cells',
+    sa.Column('cell_meters', sa.Float(), nullable=False),
+    sa.Column('lat_index', sa.Integer(), nullable=False),
+    sa.Column('lon_index', sa.Integer(), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('is_violation', sa.Boolean(), nullable=False),
+    sa.Column('result', sa.JSON(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('cell_meters', 'lat_index', 'lon_index')
+    )
+    op.create_index(op.f('ix_geo_risk_cells_is_violation'), 'geo_risk_cells', ['is_violation'], unique=False)
+    op.create_index(op.f('ix_geo_risk_cells_computed_at'), 'geo_risk_cells', ['computed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_geo_risk_cells_computed_at'), table_name='geo_risk_cells')
+    op.drop_index(op.f('ix_geo_risk_cells_is_violation'), table_name='geo_risk_cells')
+    op.drop_table('geo_risk_cells')
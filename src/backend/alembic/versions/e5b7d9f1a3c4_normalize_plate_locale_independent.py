@@ -0,0 +1,61 @@
+"""normalize_plate_locale_independent
+
+normalize_plate() as first shipped stripped '[^[:alnum:]]' before folding
+Cyrillic to Latin, and under C collation [:alnum:] does not match Cyrillic:
+'АА 1234 ВВ' became '1234'. Replace it with the locale-independent version
+(now also in f2a4b6c8d0e1) and recompute the stored
+license_plate_normalized values: an UPDATE recomputes generated columns,
+and the indexes on the column follow.
+
+Revision ID: e5b7d9f1a3c4
+Revises: d3f5b7c9e1a2
+Create Date: 2026-10-19 09:41:27.305118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b7d9f1a3c4'
+down_revision: Union[str, None] = 'd3f5b7c9e1a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NORMALIZE_PLATE = """
+CREATE OR REPLACE FUNCTION normalize_plate(plate text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT regexp_replace(
+        translate(
+            upper(plate),
+            'АВЕІКМНОРСТХУавеікмнорстхуOQIBSZ',
+            'A8E1KMH0PCTXYA8E1KMH0PCTXY001852'
+        ),
+        '[^A-Z0-9]', '', 'g'
+    )
+$$
+"""
+
+PREVIOUS_NORMALIZE_PLATE = """
+CREATE OR REPLACE FUNCTION normalize_plate(plate text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT translate(
+        upper(regexp_replace(plate, '[^[:alnum:]]', '', 'g')),
+        'АВЕІКМНОРСТХУавеікмнорстхуOQIBSZ',
+        'A8E1KMH0PCTXYA8E1KMH0PCTXY001852'
+    )
+$$
+"""
+
+RECOMPUTE = "UPDATE violations SET license_plate = license_plate WHERE license_plate IS NOT NULL"
+
+
+def upgrade() -> None:
+    op.execute(NORMALIZE_PLATE)
+    op.execute(RECOMPUTE)
+
+
+def downgrade() -> None:
+    op.execute(PREVIOUS_NORMALIZE_PLATE)
+    op.execute(RECOMPUTE)
@@ -0,0 +1,48 @@
+"""add_llm_calls_table
+
+Revision ID: e91b3f5d7a26
+Revises: d4a8c2f61e37
+Create Date: 2026-10-18 18:22:05.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91b3f5d7a26'
+down_revision: Union[str, None] = 'd4a8c2f61e37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('llm_calls',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('purpose', sa.String(length=50), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=False),
+    sa.Column('violation_id', sa.String(length=36), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('streamed', sa.Boolean(), nullable=False),
+    sa.Column('latency_ms', sa.Integer(), nullable=False),
+    sa.Column('prompt_tokens', sa.Integer(), nullable=True),
+    sa.Column('cached_prompt_tokens', sa.Integer(), nullable=True),
+    sa.Column('completion_tokens', sa.Integer(), nullable=True),
+    sa.Column('total_tokens', sa.Integer(), nullable=True),
+    sa.Column('image_detail', sa.String(length=10), nullable=True),
+    sa.Column('image_bytes', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_llm_calls_purpose'), 'llm_calls', ['purpose'], unique=False)
+    op.create_index(op.f('ix_llm_calls_violation_id'), 'llm_calls', ['violation_id'], unique=False)
+    op.create_index(op.f('ix_llm_calls_created_at'), 'llm_calls', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_llm_calls_created_at'), table_name='llm_calls')
+    op.drop_index(op.f('ix_llm_calls_violation_id'), table_name='llm_calls')
+    op.drop_index(op.f('ix_llm_calls_purpose'), table_name='llm_calls')
+    op.drop_table('llm_calls')
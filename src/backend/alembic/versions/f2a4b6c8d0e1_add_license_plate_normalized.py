@@ -0,0 +1,58 @@
+"""add_license_plate_normalized
+
+Revision ID: f2a4b6c8d0e1
+Revises: c6d8e0f2a415
+Create Date: 2026-10-18 21:12:44.081357
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a4b6c8d0e1'
+down_revision: Union[str, None] = 'c6d8e0f2a415'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Search key for a plate: only letters and digits, upper case, Cyrillic
+# look-alikes folded to Latin and characters OCR confuses folded together
+# (O/0, I/1, B/8, S/5, Z/2), so those differences cost no edit distance.
+# Folded before anything is stripped, and only to ASCII: [:alnum:] and
+# upper() of Cyrillic depend on the database locale (under C neither knows
+# Cyrillic), which an IMMUTABLE function backing an index must not.
+NORMALIZE_PLATE = """
+CREATE OR REPLACE FUNCTION normalize_plate(plate text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT regexp_replace(
+        translate(
+            upper(plate),
+            'АВЕІКМНОРСТХУавеікмнорстхуOQIBSZ',
+            'A8E1KMH0PCTXYA8E1KMH0PCTXY001852'
+        ),
+        '[^A-Z0-9]', '', 'g'
+    )
+$$
+"""
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute('CREATE EXTENSION IF NOT EXISTS fuzzystrmatch')
+    op.execute(NORMALIZE_PLATE)
+    op.add_column('violations', sa.Column(
+        'license_plate_normalized', sa.String(length=20),
+        sa.Computed('normalize_plate(license_plate)', persisted=True), nullable=True,
+    ))
+    op.create_index(
+        'ix_violations_license_plate_normalized_trgm', 'violations', ['license_plate_normalized'], unique=False,
+        postgresql_using='gin', postgresql_ops={'license_plate_normalized': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_violations_license_plate_normalized_trgm', table_name='violations')
+    op.drop_column('violations', 'license_plate_normalized')
+    op.execute('DROP FUNCTION normalize_plate(text)')
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from foundation.database import AsyncSessionLocal
+from foundation.models import AuditLog
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Every event carries all of these, so a batch is one multi-row INSERT
+AUDIT_COLUMNS = (
+    "id", "user_id", "violation_id", "action", "resource_type", "resource_id",
+    "ip_address", "user_agent", "request_data", "response_data", "created_at",
+)
+
+
+class AuditWriter:
+    """
+    Writes audit_logs rows off the request path.
+
+    Requests put events on a bounded in-process queue and move on; one
+    background task takes what is queued, up to `batch_size` events, waiting
+    `flush_interval` for a batch to build up when traffic is light, and
+    stores it with a single multi-row INSERT.
+
+    When the queue is full, submit() waits up to `enqueue_timeout` for room,
+    so a writer falling behind slows mutations down a little (backpressure),
+    then drops the event and counts it: a slow or unavailable database never
+    stalls the API. stop() stops accepting events and flushes the queue
+    within a deadline; whatever is left after it is dropped and counted.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = settings.AUDIT_QUEUE_SIZE,
+        batch_size: int = settings.AUDIT_BATCH_SIZE,
+        flush_interval: float = settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+        enqueue_timeout: float = settings.AUDIT_ENQUEUE_TIMEOUT_SECONDS,
+        session_factory: async_sessionmaker = AsyncSessionLocal,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.session_factory = session_factory
+        self._queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._batch: list[dict] = []
+        self._closing = False
+        self._flush_now = asyncio.Event()
+        self.counts = {"written": 0, "dropped": 0, "failed": 0, "batches": 0}
+
+    async def submit(self, **event) -> bool:
+        """
+        Queue one audit row (AuditLog columns; id and created_at are filled in).
+
+        Returns:
+            False if the event was dropped
+        """
+        if self._closing or self._task is None:
+            self.counts["dropped"] += 1
+            return False
+        row = {column: event.get(column) for column in AUDIT_COLUMNS}
+        row["id"] = row["id"] or str(uuid4())
+        row["created_at"] = row["created_at"] or datetime.utcnow()
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(row), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self.counts["dropped"] += 1
+                if self.counts["dropped"] % 1000 == 1:
+                    logger.warning(f"Audit queue full, {self.counts['dropped']} events dropped so far")
+                return False
+        return True
+
+    def _drain(self, batch: list[dict]):
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                return
+
+    async def _write(self, batch: list[dict]):
+        try:
+            async with self.session_factory() as session:
+                await session.execute(insert(AuditLog), batch)
+                await session.commit()
+            self.counts["written"] += len(batch)
+            self.counts["batches"] += 1
+        except Exception as e:
+            self.counts["failed"] += len(batch)
+            logger.warning(f"Failed to write {len(batch)} audit events: {e!r}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    async def _run(self):
+        while True:
+            self._batch = batch = [await self._queue.get()]
+            self._drain(batch)
+            if len(batch) < self.batch_size and not self._closing:
+                # Light traffic: let a batch build up instead of one INSERT per event
+                try:
+                    await asyncio.wait_for(self._flush_now.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._drain(batch)
+            await self._write(batch)
+            self._batch = []
+
+    def start(self):
+        if self._task is None:
+            self._closing = False
+            self._flush_now.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = settings.AUDIT_SHUTDOWN_TIMEOUT_SECONDS):
+        """Stop accepting events and write the queued ones, for at most `timeout` seconds"""
+        if self._task is None:
+            return
+        self._closing = True
+        self._flush_now.set()
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            left = self._queue.qsize() + len(self._batch)
+            self.counts["dropped"] += left
+            logger.warning(f"Audit writer stopped with {left} events unwritten")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def snapshot(self) -> dict:
+        return {"queued": self._queue.qsize(), "capacity": self._queue.maxsize, **self.counts}
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP audit_queue_events Audit events waiting to be written",
+            "# TYPE audit_queue_events gauge",
+            f"audit_queue_events {self._queue.qsize()}",
+            "# HELP audit_events_total Audit events by outcome",
+            "# TYPE audit_events_total counter",
+        ]
+        lines += [
+            f'audit_events_total{{outcome="{outcome}"}} {self.counts[outcome]}'
+            for outcome in ("written", "dropped", "failed")
+        ]
+        return "\n".join(lines) + "\n"
+
+
+_writer: Optional[AuditWriter] = None
+
+
+def get_audit_writer() -> AuditWriter:
+    """Process-wide writer, shared by all requests"""
+    global _writer
+    if _writer is None:
+        _writer = AuditWriter()
+    return _writer
@@ -0,0 +1,319 @@
+import logging
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+import redis.asyncio as redis
+from sqlalchemy import and_, delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from foundation.database import AsyncSessionLocal
+from foundation.models import CacheEntry
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+# After a Redis error the tier is skipped for this long instead of timing out on every call
+REDIS_RETRY_SECONDS = 30.0
+
+# GEO index members whose value key is gone (expired): KEYS[1] is the index,
+# KEYS[2..] the value keys of the members in ARGV, in the same order. Checked
+# and removed in one step, so a member re-added by a concurrent set stays.
+PRUNE_GEO_SCRIPT = """
+local removed = 0
+for i = 1, #ARGV do
+    if redis.call('EXISTS', KEYS[i + 1]) == 0 then
+        removed = removed + redis.call('ZREM', KEYS[1], ARGV[i])
+    end
+end
+return removed
+"""
+
+_redis_client: Optional[redis.Redis] = None
+_redis_disabled_until = 0.0
+
+
+def _redis() -> Optional[redis.Redis]:
+    global _redis_client
+    if not settings.CACHE_REDIS_ENABLED or time.monotonic() < _redis_disabled_until:
+        return None
+    if _redis_client is None:
+        _redis_client = redis.from_url(settings.REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+    return _redis_client
+
+
+def _redis_failed(error: Exception):
+    global _redis_disabled_until
+    logger.warning(f"Redis cache unavailable, skipping it for {REDIS_RETRY_SECONDS:.0f}s: {error!r}")
+    _redis_disabled_until = time.monotonic() + REDIS_RETRY_SECONDS
+
+
+class CacheStats:
+    """Hit / miss counters per cache namespace and tier"""
+
+    def __init__(self):
+        self.counts: dict[tuple[str, str], int] = {}
+
+    def incr(self, namespace: str, result: str):
+        key = (namespace, result)
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def snapshot(self) -> dict:
+        namespaces: dict[str, dict] = {}
+        for (namespace, result), count in self.counts.items():
+            namespaces.setdefault(namespace, {})[result] = count
+        for counts in namespaces.values():
+            hits = sum(v for k, v in counts.items() if k.startswith("hit_"))
+            total = hits + counts.get("miss", 0)
+            counts["hit_ratio"] = round(hits / total, 3) if total else None
+        return namespaces
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP cache_requests_total Cache lookups by namespace and result (hit_<tier> or miss)",
+            "# TYPE cache_requests_total counter",
+        ]
+        for (namespace, result), count in sorted(self.counts.items()):
+            lines.append(f'cache_requests_total{{namespace="{namespace}",result="{result}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+cache_stats = CacheStats()
+
+
+class TieredCache:
+    """
+    Read-through cache over in-process memory, Redis and optionally Postgres.
+
+    Values are bytes. A lookup checks the tiers in order and copies a hit
+    into the faster tiers above it. Every entry carries the coordinates it
+    belongs to, so all entries inside a bounding box can be invalidated
+    (Redis keeps a GEO index per namespace for that). Redis expires values
+    but not their GEO index members; prune_geo_index() drops those.
+
+    The memory tier is per worker process, so it uses a short TTL to bound
+    how long other workers serve an entry invalidated elsewhere.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: int,
+        memory_ttl: int = 300,
+        memory_max_entries: int = 1000,
+        persist: bool = False,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.memory_ttl = min(memory_ttl, ttl)
+        self.memory_max_entries = memory_max_entries
+        self.persist = persist
+        # key -> (expires_at monotonic, value, latitude, longitude)
+        self._memory: OrderedDict[str, tuple[float, bytes, float, float]] = OrderedDict()
+
+    def _redis_key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    @property
+    def _redis_geo_key(self) -> str:
+        return f"cache:{self.namespace}:geo"
+
+    def _memory_get(self, key: str) -> Optional[bytes]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return entry[1]
+
+    def _memory_set(self, key: str, value: bytes, latitude: float, longitude: float):
+        self._memory[key] = (time.monotonic() + self.memory_ttl, value, latitude, longitude)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_max_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = self._memory_get(key)
+        if value is not None:
+            cache_stats.incr(self.namespace, "hit_memory")
+            return value
+
+        client = _redis()
+        if client is not None:
+            try:
+                value = await client.get(self._redis_key(key))
+            except Exception as e:
+                _redis_failed(e)
+            if value is not None:
+                cache_stats.incr(self.namespace, "hit_redis")
+                position = await self._redis_position(client, key)
+                if position:
+                    self._memory_set(key, value, *position)
+                return value
+
+        if self.persist:
+            entry = await self._db_get(key)
+            if entry is not None:
+                cache_stats.incr(self.namespace, "hit_db")
+                remaining = int((entry.expires_at - datetime.utcnow()).total_seconds())
+                self._memory_set(key, entry.payload, entry.latitude, entry.longitude)
+                await self._redis_set(key, entry.payload, entry.latitude, entry.longitude, remaining)
+                return entry.payload
+
+        cache_stats.incr(self.namespace, "miss")
+        return None
+
+    async def set(self, key: str, value: bytes, latitude: float, longitude: float):
+        self._memory_set(key, value, latitude, longitude)
+        await self._redis_set(key, value, latitude, longitude, self.ttl)
+        if self.persist:
+            await self._db_set(key, value, latitude, longitude)
+
+    async def invalidate_region(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> int:
+        """
+        Drop every entry whose coordinates fall inside the bounding box.
+
+        Returns:
+            Number of entries removed (counted once per tier they were in)
+        """
+        def inside(lat: float, lon: float) -> bool:
+            return min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
+
+        stale = [key for key, entry in self._memory.items() if inside(entry[2], entry[3])]
+        for key in stale:
+            del self._memory[key]
+        removed = len(stale)
+
+        client = _redis()
+        if client is not None:
+            try:
+                members = await client.geosearch(
+                    self._redis_geo_key,
+                    longitude=(min_lon + max_lon) / 2,
+                    latitude=(min_lat + max_lat) / 2,
+                    width=_lon_span_km(min_lat, max_lat, min_lon, max_lon),
+                    height=max(0.001, (max_lat - min_lat) * 111.32),
+                    unit="km",
+                )
+                if members:
+                    keys = [m.decode() if isinstance(m, bytes) else m for m in members]
+                    removed += await client.delete(*(self._redis_key(k) for k in keys))
+                    await client.zrem(self._redis_geo_key, *keys)
+            except Exception as e:
+                _redis_failed(e)
+
+        if self.persist:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    delete(CacheEntry).where(
+                        CacheEntry.namespace == self.namespace,
+                        CacheEntry.latitude.between(min_lat, max_lat),
+                        CacheEntry.longitude.between(min_lon, max_lon),
+                    )
+                )
+                await session.commit()
+                removed += result.rowcount or 0
+
+        logger.info(f"Invalidated {removed} {self.namespace} cache entries in ({min_lat}, {min_lon}) - ({max_lat}, {max_lon})")
+        return removed
+
+    async def prune_geo_index(self, batch_size: int = 500) -> int:
+        """
+        Remove GEO index members whose Redis entry has expired.
+
+        Returns:
+            Number of members removed
+        """
+        client = _redis()
+        if client is None:
+            return 0
+        removed, cursor = 0, 0
+        try:
+            while True:
+                cursor, members = await client.zscan(self._redis_geo_key, cursor, count=batch_size)
+                keys = [m.decode() if isinstance(m, bytes) else m for m, _ in members]
+                if keys:
+                    removed += await client.eval(
+                        PRUNE_GEO_SCRIPT, 1 + len(keys),
+                        self._redis_geo_key, *(self._redis_key(k) for k in keys), *keys,
+                    )
+                if cursor == 0:
+                    break
+        except Exception as e:
+            _redis_failed(e)
+        if removed:
+            logger.info(f"Pruned {removed} expired {self.namespace} entries from the Redis GEO index")
+        return removed
+
+    async def _redis_position(self, client: redis.Redis, key: str) -> Optional[tuple[float, float]]:
+        try:
+            positions = await client.geopos(self._redis_geo_key, key)
+        except Exception as e:
+            _redis_failed(e)
+            return None
+        if not positions or positions[0] is None:
+            return None
+        lon, lat = positions[0]
+        return lat, lon
+
+    async def _redis_set(self, key: str, value: bytes, latitude: float, longitude: float, ttl: int):
+        client = _redis()
+        if client is None or ttl <= 0:
+            return
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.set(self._redis_key(key), value, ex=ttl)
+                pipe.geoadd(self._redis_geo_key, (longitude, latitude, key))
+                await pipe.execute()
+        except Exception as e:
+            _redis_failed(e)
+
+    async def _db_get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(CacheEntry).where(
+                        and_(
+                            CacheEntry.namespace == self.namespace,
+                            CacheEntry.key == key,
+                            CacheEntry.expires_at > datetime.utcnow(),
+                        )
+                    )
+                )
+                return result.scalar_one_or_none()
+        except Exception as e:
+            logger.warning(f"Cache DB lookup failed: {e}")
+            return None
+
+    async def _db_set(self, key: str, value: bytes, latitude: float, longitude: float):
+        now = datetime.utcnow()
+        values = {
+            "namespace": self.namespace,
+            "key": key,
+            "payload": value,
+            "latitude": latitude,
+            "longitude": longitude,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=self.ttl),
+        }
+        stmt = pg_insert(CacheEntry).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CacheEntry.namespace, CacheEntry.key],
+            set_={k: stmt.excluded[k] for k in ("payload", "latitude", "longitude", "created_at", "expires_at")},
+        )
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(stmt)
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Cache DB write failed: {e}")
+
+
+def _lon_span_km(min_lat: float, max_lat: float, min_lon: float, max_lon: float) -> float:
+    # Widest extent of the box is at the latitude closest to the equator
+    widest_lat = 0.0 if min_lat <= 0 <= max_lat else min(abs(min_lat), abs(max_lat))
+    return max(0.001, (max_lon - min_lon) * 111.32 * math.cos(math.radians(widest_lat)))
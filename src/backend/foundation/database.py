@@ -21,6 +21,26 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+async def release_connection(session: AsyncSession):
+    """
+    End the session's current transaction so its pooled connection goes back
+    to the pool before slow external work (OCR, OpenAI, S3). Loaded objects
+    stay usable because sessions do not expire on commit; the next query
+    checks out a connection again.
+    """
+    await session.commit()
+
+
+def pool_status() -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checked_in": pool.checkedin(),
+    }
+
+
 async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         try:
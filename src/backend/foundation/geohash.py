@@ -0,0 +1,135 @@
+import math
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(BASE32)}
+
+# Full precision stored on violations (~4 cm); queries use prefixes
+PRECISION = 12
+
+EARTH_RADIUS_METERS = 6_371_000.0
+METERS_PER_DEGREE = 111_320.0
+
+
+def encode(latitude: float, longitude: float, precision: int = PRECISION) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        # Bits alternate between longitude and latitude, longitude first
+        rng, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coordinate >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def decode_bounds(geohash: str) -> tuple[float, float, float, float]:
+    """(min_lat, min_lon, max_lat, max_lon) of a geohash cell"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if value >> shift & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def cell_size_degrees(precision: int) -> tuple[float, float]:
+    """(lat, lon) size of a cell at `precision`"""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def precision_for_radius(radius_meters: float, latitude: float) -> int:
+    """Longest prefix whose cells are at least `radius_meters` across, so a cell and its neighbours cover the radius"""
+    cos_lat = max(math.cos(math.radians(latitude)), 0.01)
+    for precision in range(PRECISION, 0, -1):
+        lat_size, lon_size = cell_size_degrees(precision)
+        if lat_size * METERS_PER_DEGREE >= radius_meters and lon_size * METERS_PER_DEGREE * cos_lat >= radius_meters:
+            return precision
+    return 1
+
+
+def neighbourhood(latitude: float, longitude: float, precision: int) -> list[str]:
+    """The cell of a point and the 8 cells around it (fewer at the poles / antimeridian)"""
+    lat_size, lon_size = cell_size_degrees(precision)
+    cells = []
+    for d_lat in (-1, 0, 1):
+        lat = latitude + d_lat * lat_size
+        if not -90.0 <= lat <= 90.0:
+            continue
+        for d_lon in (-1, 0, 1):
+            lon = (longitude + d_lon * lon_size + 180.0) % 360.0 - 180.0
+            cell = encode(lat, lon, precision)
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+
+def prefix_range(prefix: str) -> tuple[str, str]:
+    """
+    [low, high) bounds of all geohashes starting with `prefix`, for range
+    conditions a B-tree index serves even with bound parameters (unlike LIKE).
+    """
+    chars = list(prefix)
+    while chars and chars[-1] == BASE32[-1]:
+        chars.pop()
+    if not chars:
+        # Everything from the prefix on; "~" sorts after every base32 char in "C" collation
+        return prefix, "~"
+    chars[-1] = BASE32[_DECODE[chars[-1]] + 1]
+    return prefix, "".join(chars)
+
+
+def bbox_cells(min_lat: float, min_lon: float, max_lat: float, max_lon: float, max_cells: int = 32) -> list[str]:
+    """Cells of the longest precision that covers the box with at most `max_cells` cells"""
+    for precision in range(PRECISION, 0, -1):
+        lat_size, lon_size = cell_size_degrees(precision)
+        lat_start = math.floor((min_lat + 90.0) / lat_size)
+        lat_end = math.floor((min(max_lat, 89.999999) + 90.0) / lat_size)
+        lon_start = math.floor((min_lon + 180.0) / lon_size)
+        lon_end = math.floor((min(max_lon, 179.999999) + 180.0) / lon_size)
+        if (lat_end - lat_start + 1) * (lon_end - lon_start + 1) > max_cells and precision > 1:
+            continue
+        # Encode the center of every cell the box touches
+        return [
+            encode((i + 0.5) * lat_size - 90.0, (j + 0.5) * lon_size - 180.0, precision)
+            for i in range(lat_start, lat_end + 1)
+            for j in range(lon_start, lon_end + 1)
+        ]
+    return []
+
+
+def cell_ranges(cells: list[str]) -> list[tuple[str, str]]:
+    """prefix_range of each cell, adjacent ranges merged (Z-order keeps neighbours contiguous)"""
+    merged: list[list[str]] = []
+    for low, high in sorted(prefix_range(cell) for cell in cells):
+        if merged and merged[-1][1] >= low:
+            merged[-1][1] = max(merged[-1][1], high)
+        else:
+            merged.append([low, high])
+    return [(low, high) for low, high in merged]
+
+
+def distance_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle (haversine) distance"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(a))
@@ -0,0 +1,31 @@
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def uuid7(at: Optional[datetime] = None) -> str:
+    """
+    Time-ordered UUID (RFC 9562 version 7): 48 bits of Unix milliseconds
+    (UTC, naive like the rest of the schema), then random bits. The time a
+    violation id was made at bounds its created_at, so lookups by id can be
+    pruned to one partition (see foundation.models.violation_key).
+    """
+    milliseconds = ((at or datetime.utcnow()) - _EPOCH) // timedelta(milliseconds=1)
+    value = (milliseconds & ((1 << 48) - 1)) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 0x7 << 76  # version
+    value = value & ~(0x3 << 62) | 0x2 << 62  # variant
+    return str(uuid.UUID(int=value))
+
+
+def uuid7_time(value: str) -> Optional[datetime]:
+    """Time a version 7 UUID was made at (millisecond precision), None for any other id"""
+    try:
+        parsed = uuid.UUID(value)
+    except ValueError:
+        return None
+    if parsed.version != 7:
+        return None
+    return _EPOCH + timedelta(milliseconds=parsed.int >> 80)
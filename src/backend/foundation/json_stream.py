@@ -0,0 +1,76 @@
+import json
+from typing import Any, Optional
+
+
+class JSONMemberStream:
+    """
+    Incremental parser for a JSON object arriving in chunks (e.g. a streamed
+    LLM completion). Each top-level member is returned as soon as its value is
+    complete, without waiting for the rest of the object.
+
+    Usage:
+        stream = JSONMemberStream()
+        for chunk in chunks:
+            for key, value in stream.feed(chunk):
+                ...
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member_start: Optional[int] = None
+        self.done = False
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        """
+        Add text and return the top-level members completed by it, in order.
+
+        Raises:
+            json.JSONDecodeError: a completed member is not valid JSON
+        """
+        self.buffer += chunk
+        members = []
+
+        while self._pos < len(self.buffer) and not self.done:
+            char = self.buffer[self._pos]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._member_start = self._pos + 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    members += self._complete_member()
+                    self.done = True
+            elif char == "," and self._depth == 1:
+                members += self._complete_member()
+                self._member_start = self._pos + 1
+
+            self._pos += 1
+
+        return members
+
+    def _complete_member(self) -> list[tuple[str, Any]]:
+        text = self.buffer[self._member_start:self._pos].strip()
+        if not text:
+            return []
+        # A single "key": value member parses as a one-key object
+        return list(json.loads("{" + text + "}").items())
+
+    def result(self) -> dict:
+        """The whole object, once the closing brace was seen"""
+        start = self.buffer.index("{")
+        return json.loads(self.buffer[start:self._pos])
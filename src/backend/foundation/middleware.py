@@ -3,11 +3,13 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import StreamingResponse
 import time
 import logging
-from datetime import datetime
 import redis.asyncio as redis
-from typing import Callable
+from typing import Callable, Optional
+from jose import JWTError, jwt
 import json
 
+from foundation.audit import AuditWriter, get_audit_writer
+from foundation.replica import READ_PRIMARY_COOKIE, READ_PRIMARY_HEADER
 from settings import settings
 
 logger = logging.getLogger(__name__)
@@ -124,21 +126,68 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
 
 
 class AuditMiddleware(BaseHTTPMiddleware):
+    """
+    One audit_logs row per mutating request, handed to the batching
+    AuditWriter: the request never waits on the insert.
+    """
+
+    def __init__(self, app, writer: AuditWriter = None):
+        super().__init__(app)
+        self.writer = writer or get_audit_writer()
+
+    @staticmethod
+    def _user_id(request: Request) -> Optional[str]:
+        authorization = request.headers.get("authorization", "")
+        if not authorization.lower().startswith("bearer "):
+            return None
+        try:
+            return jwt.decode(authorization[7:], settings.SECRET_KEY, algorithms=[settings.ALGORITHM]).get("sub")
+        except JWTError:
+            return None
+
     async def dispatch(self, request: Request, call_next: Callable):
         response = await call_next(request)
 
         if request.method in ["POST", "PUT", "PATCH", "DELETE"]:
-            logger.info(
-                f"Audit log",
-                extra={
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "method": request.method,
-                    "path": request.url.path,
-                    "client_ip": request.client.host,
-                    "user_agent": request.headers.get("user-agent"),
-                    "status_code": response.status_code,
-                },
+            # Filled in by routing: the route template keeps actions few and groupable
+            route = request.scope.get("route")
+            path_params = request.scope.get("path_params") or {}
+            path = getattr(route, "path", request.url.path)
+            segments = path.removeprefix("/api/v1/").split("/")
+            violation_id = path_params.get("violation_id")
+            resource_id = next((str(v) for k, v in path_params.items() if k.endswith("id")), None)
+            # One oversized value would fail the whole batch it is written with
+            await self.writer.submit(
+                user_id=self._user_id(request),
+                violation_id=violation_id[:36] if violation_id else None,
+                action=f"{request.method} {path}"[:100],
+                resource_type=segments[0][:50],
+                resource_id=resource_id[:36] if resource_id else None,
+                ip_address=request.client.host if request.client else None,
+                user_agent=(request.headers.get("user-agent") or "")[:500] or None,
+                request_data={"query": dict(request.query_params)} if request.query_params else None,
+                response_data={"status_code": response.status_code},
+            )
+
+        return response
+
+
+class ReadYourWritesMiddleware(BaseHTTPMiddleware):
+    """
+    Marks a client that just wrote, so its reads skip the replica until the
+    write has surely replicated (see foundation.replica.get_read_db).
+    """
+
+    async def dispatch(self, request: Request, call_next: Callable):
+        response = await call_next(request)
+
+        if request.method in ["POST", "PUT", "PATCH", "DELETE"] and response.status_code < 400:
+            until = str(int(time.time()) + settings.READ_YOUR_WRITES_SECONDS)
+            response.set_cookie(
+                READ_PRIMARY_COOKIE, until,
+                max_age=settings.READ_YOUR_WRITES_SECONDS, httponly=True, samesite="lax",
             )
+            response.headers[READ_PRIMARY_HEADER] = until
 
         return response
 
@@ -188,7 +237,10 @@ class RequestResponseLoggingMiddleware(BaseHTTPMiddleware):
         response_body = None
         response_body_bytes = b""
 
-        if hasattr(response, "body_iterator"):
+        if response.headers.get("content-type", "").startswith("text/event-stream"):
+            # Buffering would hold back every event until the stream ends
+            response_body = "<event stream>"
+        elif hasattr(response, "body_iterator"):
             response_body_parts = []
             async for chunk in response.body_iterator:
                 response_body_parts.append(chunk)
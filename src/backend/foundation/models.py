@@ -1,9 +1,11 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
 from uuid import uuid4
-from sqlalchemy import String, Float, DateTime, ForeignKey, Enum, JSON, Text, Integer
+from sqlalchemy import String, Float, DateTime, ForeignKey, Enum, JSON, Text, Integer, LargeBinary, Boolean, Index, Computed, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from foundation.database import Base
+from foundation.ids import uuid7, uuid7_time
 import enum
 
 
@@ -44,20 +46,49 @@ class User(Base):
 
 class Violation(Base):
     __tablename__ = "violations"
-
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
-    user_id: Mapped[str] = mapped_column(ForeignKey("users.id"), index=True)
+    # Range-partitioned by month of created_at (foundation/partitions.py). The
+    # primary key has to include it, and no foreign key can reference the
+    # table, so photos and status history join on violation_id alone.
+    __table_args__ = (
+        # Keyset pagination of a user's violations; also serves lookups by user_id alone
+        Index("ix_violations_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Bounding box / radius queries; coordinates included for index-only clustering
+        Index("ix_violations_geohash", "geohash", postgresql_include=["latitude", "longitude", "status"]),
+        # Duplicate reports: same plate, nearby geohash cells, close in time
+        Index("ix_violations_plate_geohash_created_at", "license_plate_normalized", "geohash", "created_at"),
+        # Fuzzy plate search (pg_trgm), see interactors/plate_search.py
+        Index(
+            "ix_violations_license_plate_normalized_trgm",
+            "license_plate_normalized",
+            postgresql_using="gin",
+            postgresql_ops={"license_plate_normalized": "gin_trgm_ops"},
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    # UUIDv7: the id tells which month's partition holds the row
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=uuid7)
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.id"))
 
     status: Mapped[ViolationStatus] = mapped_column(Enum(ViolationStatus), default=ViolationStatus.DRAFT, index=True)
 
     license_plate: Mapped[Optional[str]] = mapped_column(String(20), nullable=True, index=True)
     license_plate_confidence: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    # Search key maintained by PostgreSQL, normalize_plate() is defined in migrations f2a4b6c8d0e1 and e5b7d9f1a3c4
+    license_plate_normalized: Mapped[Optional[str]] = mapped_column(
+        String(20), Computed("normalize_plate(license_plate)", persisted=True), nullable=True
+    )
 
     latitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     longitude: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     address: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    # foundation.geohash.encode(latitude, longitude); "C" collation so prefix ranges can use B-tree indexes
+    geohash: Mapped[Optional[str]] = mapped_column(String(12, collation="C"), nullable=True)
 
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+    # Earlier report of the same car at the same place (interactors/duplicates.py)
+    duplicate_of_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True, index=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True, default=datetime.utcnow, index=True)
     verified_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     submitted_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     resolved_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
@@ -73,23 +104,55 @@ class Violation(Base):
     violation_reason: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     violation_code: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     violation_type: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
-    violations: Mapped[Optional[list]] = mapped_column(JSON, nullable=True)  # List of violation items
+    violations: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)  # List of violation items
     timer_started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     has_road_sign_photo: Mapped[bool] = mapped_column(default=False)
 
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    violation_metadata: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    violation_metadata: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+
+    # Optimistic concurrency: every UPDATE checks and bumps it, a concurrent
+    # change made while the session was released raises StaleDataError
+    version_id: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version_id}
 
     user: Mapped["User"] = relationship("User", back_populates="violations")
-    photos: Mapped[list["Photo"]] = relationship("Photo", back_populates="violation", cascade="all, delete-orphan")
-    status_history: Mapped[list["ViolationStatusHistory"]] = relationship("ViolationStatusHistory", back_populates="violation", cascade="all, delete-orphan")
+    photos: Mapped[list["Photo"]] = relationship("Photo", back_populates="violation", primaryjoin="Violation.id == foreign(Photo.violation_id)", cascade="all, delete-orphan", order_by="Photo.uploaded_at")
+    status_history: Mapped[list["ViolationStatusHistory"]] = relationship("ViolationStatusHistory", back_populates="violation", primaryjoin="Violation.id == foreign(ViolationStatusHistory.violation_id)", cascade="all, delete-orphan", order_by="ViolationStatusHistory.changed_at")
+
+
+# A violation made within this long after its id (the id is generated first)
+VIOLATION_ID_CLOCK_SLACK = timedelta(days=1)
+
+
+def violation_key(violation_id: str) -> list:
+    """
+    Conditions selecting one violation by id. For a UUIDv7 id created_at is
+    bounded too, so the planner only searches that month's partition;
+    older (UUIDv4) ids search every partition.
+    """
+    conditions = [Violation.id == violation_id]
+    created = uuid7_time(violation_id)
+    if created is not None:
+        conditions.append(Violation.created_at.between(created, created + VIOLATION_ID_CLOCK_SLACK))
+    return conditions
+
+
+# Photo with a recognised plate. Queries filter with this exact expression
+# (literals, not bound parameters) so the planner matches the partial index.
+PHOTO_OCR_OK = text("ocr_results->>'status' = 'OK'")
 
 
 class Photo(Base):
     __tablename__ = "photos"
+    __table_args__ = (
+        # Only photos plate voting and submission look at
+        Index("ix_photos_violation_id_ocr_ok", "violation_id", "photo_type", postgresql_where=PHOTO_OCR_OK),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
-    violation_id: Mapped[Optional[str]] = mapped_column(ForeignKey("violations.id"), index=True, nullable=True)
+    violation_id: Mapped[Optional[str]] = mapped_column(String(36), index=True, nullable=True)
 
     photo_type: Mapped[PhotoType] = mapped_column(Enum(PhotoType))
 
@@ -108,29 +171,31 @@ class Photo(Base):
     captured_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     uploaded_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
-    exif_data: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    exif_data: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
 
-    ocr_results: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    ocr_results: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
 
-    violation: Mapped["Violation"] = relationship("Violation", back_populates="photos")
+    violation: Mapped["Violation"] = relationship("Violation", back_populates="photos", primaryjoin="foreign(Photo.violation_id) == Violation.id")
 
 
 class ViolationStatusHistory(Base):
     __tablename__ = "violation_status_history"
+    # Range-partitioned by month of changed_at, like violations
+    __table_args__ = {"postgresql_partition_by": "RANGE (changed_at)"}
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
-    violation_id: Mapped[str] = mapped_column(ForeignKey("violations.id"), index=True)
+    violation_id: Mapped[str] = mapped_column(String(36), index=True)
 
     from_status: Mapped[Optional[ViolationStatus]] = mapped_column(Enum(ViolationStatus), nullable=True)
     to_status: Mapped[ViolationStatus] = mapped_column(Enum(ViolationStatus))
 
-    changed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+    changed_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True, default=datetime.utcnow, index=True)
     changed_by: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
 
     reason: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     change_metadata: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
 
-    violation: Mapped["Violation"] = relationship("Violation", back_populates="status_history")
+    violation: Mapped["Violation"] = relationship("Violation", back_populates="status_history", primaryjoin="foreign(ViolationStatusHistory.violation_id) == Violation.id")
 
 
 class AuditLog(Base):
@@ -173,7 +238,7 @@ class Conversation(Base):
     user_id: Mapped[str] = mapped_column(ForeignKey("users.id"), index=True)
 
     status: Mapped[ConversationStatus] = mapped_column(Enum(ConversationStatus), default=ConversationStatus.ACTIVE)
-    violation_id: Mapped[Optional[str]] = mapped_column(ForeignKey("violations.id"), nullable=True)
+    violation_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
 
     started_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
@@ -182,7 +247,7 @@ class Conversation(Base):
 
     messages: Mapped[list["ConversationMessage"]] = relationship("ConversationMessage", back_populates="conversation", cascade="all, delete-orphan")
     user: Mapped["User"] = relationship("User")
-    violation: Mapped[Optional["Violation"]] = relationship("Violation")
+    violation: Mapped[Optional["Violation"]] = relationship("Violation", primaryjoin="foreign(Conversation.violation_id) == Violation.id")
 
 
 class ConversationMessage(Base):
@@ -204,3 +269,76 @@ class ConversationMessage(Base):
     message_metadata: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
 
     conversation: Mapped["Conversation"] = relationship("Conversation", back_populates="messages")
+
+
+class CacheEntry(Base):
+    """Persistent tier of foundation.cache.TieredCache"""
+    __tablename__ = "cache_entries"
+
+    namespace: Mapped[str] = mapped_column(String(50), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+
+    payload: Mapped[bytes] = mapped_column(LargeBinary)
+    latitude: Mapped[float] = mapped_column(Float, index=True)
+    longitude: Mapped[float] = mapped_column(Float, index=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True)
+
+
+class GeoRiskCell(Base):
+    """Precomputed geo service /api/check result for one location grid cell"""
+    __tablename__ = "geo_risk_cells"
+
+    cell_meters: Mapped[float] = mapped_column(Float, primary_key=True)
+    lat_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    lon_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    latitude: Mapped[float] = mapped_column(Float)  # cell center the check was run for
+    longitude: Mapped[float] = mapped_column(Float)
+    is_violation: Mapped[bool] = mapped_column(Boolean, index=True)
+    result: Mapped[dict] = mapped_column(JSON)
+
+    computed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+    # Set when the cell is invalidated with the parking cache, cleared when it is recomputed
+    invalidated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, index=True)
+
+
+class HeatmapCell(Base):
+    """
+    Reported violations in one heatmap bin: the Web Mercator tile (x, y) at
+    `level`, which is a bin of the tiles BIN_BITS zoom levels up
+    """
+    __tablename__ = "heatmap_cells"
+
+    level: Mapped[int] = mapped_column(Integer, primary_key=True)
+    x: Mapped[int] = mapped_column(Integer, primary_key=True)
+    y: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class LLMCall(Base):
+    """Token and latency accounting for one OpenAI call"""
+    __tablename__ = "llm_calls"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
+
+    purpose: Mapped[str] = mapped_column(String(50), index=True)  # parking_analysis, vehicle_analysis
+    model: Mapped[str] = mapped_column(String(100))
+    violation_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True, index=True)
+
+    status: Mapped[str] = mapped_column(String(20))  # success, error
+    streamed: Mapped[bool] = mapped_column(Boolean, default=False)
+    latency_ms: Mapped[int] = mapped_column(Integer)
+
+    prompt_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    cached_prompt_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    completion_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    total_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    image_detail: Mapped[Optional[str]] = mapped_column(String(10), nullable=True)
+    image_bytes: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,118 @@
+import logging
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from foundation.database import AsyncSessionLocal
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Tables range-partitioned by month, and their partition key
+PARTITIONED_TABLES = {
+    "violations": "created_at",
+    "violation_status_history": "changed_at",
+}
+
+# Partitions attached to a table
+PARTITIONS_SQL = text("""
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = :table
+""")
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def create_partition_sql(table: str, month: datetime) -> str:
+    """DDL of the partition holding `month` of `table`"""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+    )
+
+
+async def _partitions(session: AsyncSession, table: str) -> set[str]:
+    result = await session.execute(PARTITIONS_SQL, {"table": table})
+    return set(result.scalars().all())
+
+
+async def ensure_partitions(months_ahead: int = settings.PARTITION_PREMAKE_MONTHS) -> list[str]:
+    """
+    Create the partitions of the current month and `months_ahead` following
+    ones that do not exist yet. There is no default partition, so a row
+    dated past the last partition fails to insert: run this (it runs at
+    startup, scripts/maintain_partitions.py runs it on a schedule) well
+    before the premade months run out.
+
+    Returns:
+        Names of the partitions created
+    """
+    current = month_start(datetime.utcnow())
+    created = []
+    async with AsyncSessionLocal() as session:
+        for table in PARTITIONED_TABLES:
+            existing = await _partitions(session, table)
+            for offset in range(months_ahead + 1):
+                month = add_months(current, offset)
+                if partition_name(table, month) in existing:
+                    continue
+                # Only missing ones: creating a partition locks the parent table
+                await session.execute(text(create_partition_sql(table, month)))
+                created.append(partition_name(table, month))
+        await session.commit()
+    if created:
+        logger.info(f"Created partitions: {', '.join(created)}")
+    return created
+
+
+async def archive_partitions(
+    retention_months: Optional[int] = settings.PARTITION_RETENTION_MONTHS,
+    schema: str = settings.PARTITION_ARCHIVE_SCHEMA,
+) -> list[str]:
+    """
+    Detach the partitions of months older than `retention_months` and move
+    them to `schema`: the rows leave every query on the parent table but stay
+    in the database, to be dumped and dropped at the operator's pace.
+    None keeps every month.
+
+    Returns:
+        Names of the partitions archived
+    """
+    if retention_months is None:
+        return []
+    oldest_kept = add_months(month_start(datetime.utcnow()), -retention_months)
+    archived = []
+    async with AsyncSessionLocal() as session:
+        await session.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+        for table in PARTITIONED_TABLES:
+            for name in sorted(await _partitions(session, table)):
+                try:
+                    month = datetime.strptime(name[len(table) + 1:], "%Y_%m")
+                except ValueError:
+                    logger.warning(f"Skipping partition {name}: not named by month")
+                    continue
+                if month >= oldest_kept:
+                    continue
+                await session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                await session.execute(text(f"ALTER TABLE {name} SET SCHEMA {schema}"))
+                archived.append(name)
+        await session.commit()
+    if archived:
+        logger.info(f"Archived partitions into {schema}: {', '.join(archived)}")
+    return archived
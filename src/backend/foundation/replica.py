@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from foundation.database import AsyncSessionLocal
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Set on responses to a client's writes (cookie and header, same value: unix time
+# until which its reads go to the primary); clients without a cookie jar echo the header
+READ_PRIMARY_COOKIE = "read_primary_until"
+READ_PRIMARY_HEADER = "X-Read-Primary-Until"
+
+# Seconds the replica is behind the primary: 0 when it has replayed all it received
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+# Read-only transactions: a write sent to the replica by mistake fails loudly,
+# even when DATABASE_READ_URL points at the primary
+read_engine = create_async_engine(
+    settings.DATABASE_READ_URL,
+    pool_size=settings.DATABASE_READ_POOL_SIZE,
+    max_overflow=settings.DATABASE_READ_MAX_OVERFLOW,
+    echo=settings.DEBUG,
+    connect_args={"server_settings": {"default_transaction_read_only": "on"}},
+) if settings.DATABASE_READ_URL else None
+
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+) if read_engine is not None else None
+
+
+class ReplicaLagMonitor:
+    """
+    Polls the replica's replication lag. Reads go to the replica only while
+    the last check succeeded and found it at most `max_lag` seconds behind;
+    otherwise (unknown at startup, replica down or lagging) they go to the
+    primary.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = ReadSessionLocal,
+        max_lag: float = settings.DATABASE_READ_MAX_LAG_SECONDS,
+        interval: float = settings.DATABASE_READ_LAG_CHECK_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.max_lag = max_lag
+        self.interval = interval
+        self.lag_seconds: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self.reads = {"replica": 0, "primary": 0}
+
+    @property
+    def healthy(self) -> bool:
+        return self.lag_seconds is not None and self.lag_seconds <= self.max_lag
+
+    async def check(self) -> Optional[float]:
+        healthy = self.healthy
+        try:
+            async with self.session_factory() as session:
+                lag = (await session.execute(REPLICA_LAG_SQL)).scalar()
+            self.lag_seconds = float(lag) if lag is not None else None
+        except Exception as e:
+            self.lag_seconds = None
+            logger.warning(f"Replica lag check failed: {e!r}")
+        self.checked_at = time.time()
+        if healthy != self.healthy:
+            logger.warning(
+                f"Replica {'back in' if self.healthy else 'out of'} rotation, lag {self.lag_seconds}s"
+            )
+        return self.lag_seconds
+
+    async def _check_loop(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None and self.session_factory is not None:
+            self._task = asyncio.create_task(self._check_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> dict:
+        pool = read_engine.pool if read_engine is not None else None
+        return {
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": self.max_lag,
+            "checked_at": self.checked_at,
+            "reads": dict(self.reads),
+            "pool": {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "checked_in": pool.checkedin(),
+            } if pool is not None else None,
+        }
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP db_replica_healthy Whether reads are routed to the replica",
+            "# TYPE db_replica_healthy gauge",
+            f"db_replica_healthy {int(self.healthy)}",
+        ]
+        if self.lag_seconds is not None:
+            lines += [
+                "# HELP db_replica_lag_seconds Replication lag at the last check",
+                "# TYPE db_replica_lag_seconds gauge",
+                f"db_replica_lag_seconds {self.lag_seconds}",
+            ]
+        lines += [
+            "# HELP db_reads_total Read-only requests by database they were routed to",
+            "# TYPE db_reads_total counter",
+        ]
+        lines += [f'db_reads_total{{target="{target}"}} {count}' for target, count in self.reads.items()]
+        return "\n".join(lines) + "\n"
+
+
+_monitor: Optional[ReplicaLagMonitor] = None
+
+
+def get_replica_monitor() -> ReplicaLagMonitor:
+    """Process-wide monitor, shared by all requests"""
+    global _monitor
+    if _monitor is None:
+        _monitor = ReplicaLagMonitor()
+    return _monitor
+
+
+def reads_own_writes(request: Request) -> bool:
+    """Whether the client wrote recently enough that the replica may not have its write yet"""
+    value = request.cookies.get(READ_PRIMARY_COOKIE) or request.headers.get(READ_PRIMARY_HEADER)
+    try:
+        return value is not None and float(value) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(request: Request) -> AsyncSession:
+    """
+    Session for endpoints that only read: on the replica when one is
+    configured and in rotation, on the primary for a client reading right
+    after its own write (read-your-writes) or when the replica lags.
+    """
+    monitor = get_replica_monitor()
+    replica = ReadSessionLocal is not None and monitor.healthy and not reads_own_writes(request)
+    monitor.reads["replica" if replica else "primary"] += 1
+    async with (ReadSessionLocal if replica else AsyncSessionLocal)() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
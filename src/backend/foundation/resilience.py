@@ -0,0 +1,322 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import httpx
+
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"Upstream {upstream} is unavailable, retry in {retry_after:.0f}s")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """
+    Whether an error says something about upstream health.
+
+    Client errors (4xx except 429) mean our request was wrong, the upstream
+    itself answered fine, so they do not count towards opening the circuit.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        code = error.response.status_code
+        return code >= 500 or code == 429
+    return True
+
+
+class LatencyTracker:
+    """
+    Sliding window of recent successful call latencies.
+
+    The adaptive timeout is the observed p99 times a multiplier, clamped
+    between a floor and the upstream's configured maximum, so a healthy fast
+    upstream fails fast when it hangs instead of waiting the full maximum.
+    """
+
+    def __init__(
+        self,
+        max_timeout: float,
+        min_timeout: float = 1.0,
+        multiplier: float = 3.0,
+        window: int = 200,
+        min_samples: int = 20,
+    ):
+        self.max_timeout = max_timeout
+        self.min_timeout = min(min_timeout, max_timeout)
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self.samples: deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def timeout(self) -> float:
+        p99 = self.percentile(99)
+        if p99 is None:
+            return self.max_timeout
+        return max(self.min_timeout, min(self.max_timeout, p99 * self.multiplier))
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker with half-open probing for one upstream.
+
+    closed:    calls go through; `failure_threshold` consecutive failures open it
+    open:      calls fail immediately with CircuitOpenError for `reset_timeout` seconds
+    half_open: up to `half_open_max_calls` probe calls go through, a successful
+               probe closes the circuit, a failed one opens it again
+
+    Usage:
+        breaker = get_breaker("geo", max_timeout=30.0)
+        response = await breaker.call(lambda: client.get(url))
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_timeout: float,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        min_timeout: float = 1.0,
+        timeout_multiplier: float = 3.0,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.latency = LatencyTracker(max_timeout, min_timeout, timeout_multiplier)
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self.outcomes: dict[str, int] = {"success": 0, "failure": 0, "timeout": 0, "rejected": 0}
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allows_request(self) -> bool:
+        """Whether a call would currently be let through (without reserving it)"""
+        if self.state == OPEN:
+            return self.retry_after() == 0
+        if self.state == HALF_OPEN:
+            return self.half_open_calls < self.half_open_max_calls
+        return True
+
+    def hedge_delay(self) -> Optional[float]:
+        """Delay after which a hedged duplicate request is worth sending (p95 latency)"""
+        return self.latency.percentile(95)
+
+    def _acquire(self):
+        if self.state == OPEN:
+            if self.retry_after() > 0:
+                self.outcomes["rejected"] += 1
+                raise CircuitOpenError(self.name, self.retry_after())
+            self._set_state(HALF_OPEN)
+
+        if self.state == HALF_OPEN:
+            if self.half_open_calls >= self.half_open_max_calls:
+                self.outcomes["rejected"] += 1
+                raise CircuitOpenError(self.name, self.reset_timeout)
+            self.half_open_calls += 1
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            logger.warning(f"Circuit {self.name}: {self.state} -> {state}")
+        self.state = state
+        self.half_open_calls = 0
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+
+    def _on_success(self):
+        self.outcomes["success"] += 1
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            self._set_state(CLOSED)
+
+    def _on_failure(self, outcome: str):
+        self.outcomes[outcome] += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._set_state(OPEN)
+
+    async def call(self, func: Callable[[], Awaitable[T]], timeout: Optional[float] = None) -> T:
+        """
+        Run one upstream call through the breaker.
+
+        Args:
+            func: Zero-argument coroutine factory performing the call
+            timeout: Fixed deadline in seconds; by default the adaptive timeout
+                is used and the call's latency feeds the tracker
+
+        Raises:
+            CircuitOpenError: the circuit is open, func was not called
+            asyncio.TimeoutError: the call exceeded its deadline
+        """
+        self._acquire()
+        was_half_open = self.state == HALF_OPEN
+        deadline = timeout or self.latency.timeout()
+        start = time.monotonic()
+
+        try:
+            result = await asyncio.wait_for(func(), deadline)
+        except asyncio.TimeoutError:
+            logger.error(f"Upstream {self.name} timed out after {deadline:.1f}s")
+            self._on_failure("timeout")
+            raise
+        except asyncio.CancelledError:
+            # Lost a hedge race or the client went away - says nothing about health
+            if was_half_open and self.state == HALF_OPEN:
+                self.half_open_calls = max(0, self.half_open_calls - 1)
+            raise
+        except Exception as e:
+            if is_upstream_failure(e):
+                self._on_failure("failure")
+            else:
+                self._on_success()
+            raise
+
+        if timeout is None:
+            self.latency.observe(time.monotonic() - start)
+        self._on_success()
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_after": round(self.retry_after(), 1) if self.state == OPEN else 0,
+            "timeout": round(self.latency.timeout(), 3),
+            "latency_p50": self.latency.percentile(50),
+            "latency_p95": self.latency.percentile(95),
+            "latency_p99": self.latency.percentile(99),
+            "outcomes": dict(self.outcomes),
+        }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str, max_timeout: float) -> CircuitBreaker:
+    """Process-wide breaker for an upstream, created on first use from settings"""
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker(
+            name,
+            max_timeout=max_timeout,
+            failure_threshold=settings.UPSTREAM_FAILURE_THRESHOLD,
+            reset_timeout=settings.UPSTREAM_RESET_TIMEOUT_SECONDS,
+            min_timeout=settings.UPSTREAM_MIN_TIMEOUT_SECONDS,
+            timeout_multiplier=settings.UPSTREAM_TIMEOUT_MULTIPLIER,
+        )
+    return _breakers[name]
+
+
+def breaker_snapshots() -> list[dict]:
+    return [breaker.snapshot() for _, breaker in sorted(_breakers.items())]
+
+
+def render_prometheus() -> str:
+    """Breaker state and outcome counters in Prometheus text exposition format"""
+    lines = [
+        "# HELP upstream_circuit_state Circuit breaker state (0=closed, 1=half_open, 2=open)",
+        "# TYPE upstream_circuit_state gauge",
+    ]
+    breakers = sorted(_breakers.items())
+    for name, breaker in breakers:
+        lines.append(f'upstream_circuit_state{{upstream="{name}"}} {_STATE_VALUES[breaker.state]}')
+
+    lines.append("# HELP upstream_timeout_seconds Current adaptive timeout")
+    lines.append("# TYPE upstream_timeout_seconds gauge")
+    for name, breaker in breakers:
+        lines.append(f'upstream_timeout_seconds{{upstream="{name}"}} {round(breaker.latency.timeout(), 3)}')
+
+    lines.append("# HELP upstream_calls_total Upstream calls by outcome")
+    lines.append("# TYPE upstream_calls_total counter")
+    for name, breaker in breakers:
+        for outcome, count in breaker.outcomes.items():
+            lines.append(f'upstream_calls_total{{upstream="{name}",outcome="{outcome}"}} {count}')
+
+    return "\n".join(lines) + "\n"
+
+
+async def hedged_call(attempts: list[Callable[[], Awaitable[T]]], hedge_delay: Optional[float] = None) -> T:
+    """
+    Run equivalent attempts (e.g. the same request to different replicas).
+
+    The first attempt starts immediately. The next one starts when the
+    running ones have not answered within `hedge_delay` seconds, or right
+    away when an attempt fails. The first successful result wins and the
+    remaining attempts are cancelled. Without a hedge_delay this is plain
+    sequential failover.
+
+    An error that is not an upstream failure (a 4xx other than 429: the
+    request itself was refused) is raised right away, every other replica
+    would refuse it too.
+
+    Raises:
+        The first client error, or the last attempt's exception if every attempt failed
+    """
+    remaining = iter(attempts)
+    pending: set[asyncio.Task] = set()
+    last_error: Optional[BaseException] = None
+
+    def launch_next() -> bool:
+        attempt = next(remaining, None)
+        if attempt is None:
+            return False
+        pending.add(asyncio.ensure_future(attempt()))
+        return True
+
+    exhausted = not launch_next()
+    try:
+        while pending:
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=None if exhausted else hedge_delay,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                exhausted = not launch_next()
+                continue
+
+            for task in done:
+                pending.discard(task)
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+                if not is_upstream_failure(last_error):
+                    raise last_error
+
+            if not exhausted:
+                exhausted = not launch_next()
+    finally:
+        for task in pending:
+            task.cancel()
+
+    raise last_error
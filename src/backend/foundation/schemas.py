@@ -71,6 +71,30 @@ class ViolationResponse(BaseModel):
     violations: Optional[list[dict]] = None
     timer_started_at: Optional[datetime] = None
     has_road_sign_photo: bool = False
+    duplicate_of_id: Optional[str] = None
+
+
+class ViolationListItem(BaseModel):
+    """Row of a violations listing, read from a column projection rather than an ORM entity"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    status: ViolationStatus
+    license_plate: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    address: Optional[str] = None
+    violation_type: Optional[str] = None
+    violation_code: Optional[str] = None
+    created_at: datetime
+    submitted_at: Optional[datetime] = None
+    resolved_at: Optional[datetime] = None
+
+
+class ViolationPage(BaseModel):
+    items: list[ViolationListItem]
+    # Pass back as `cursor` for the next page; None on the last page
+    next_cursor: Optional[str] = None
 
 
 class ViolationDetailResponse(ViolationResponse):
@@ -157,6 +181,47 @@ class VehicleAnalysisResponse(BaseModel):
     raw_response: Optional[str] = Field(None, description="Raw response from the model")
 
 
+class PlateMatch(BaseModel):
+    normalized_plate: str
+    distance: int
+    plates: list[str] = Field(..., description="Plates as recognised, before normalisation")
+    violation_count: int
+    first_seen_at: datetime
+    last_seen_at: datetime
+
+
+class PlateSearchResponse(BaseModel):
+    query: str
+    max_distance: int
+    matches: list[PlateMatch]
+
+
+class ViolationPoint(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    status: ViolationStatus
+    latitude: float
+    longitude: float
+    created_at: datetime
+    duplicate_of_id: Optional[str] = None
+
+
+class ViolationCluster(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    geohash: str
+    count: int
+    latitude: float = Field(..., description="Centroid of the clustered violations")
+    longitude: float
+
+
+class ViolationAreaResponse(BaseModel):
+    clustered: bool
+    points: list[ViolationPoint] = []
+    clusters: list[ViolationCluster] = []
+
+
 class UserResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
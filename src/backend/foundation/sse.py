@@ -0,0 +1,6 @@
+import json
+
+
+def sse_event(event: str, data: dict) -> str:
+    """One Server-Sent Events message: a named event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
@@ -0,0 +1,23 @@
+import math
+
+# Web Mercator (slippy map) tiles, as used by OSM / Leaflet / Google: z/x/y
+# with y growing southwards. The projection is cut off at this latitude.
+MAX_LATITUDE = 85.05112878
+
+# A heatmap tile is split into 2^BIN_BITS x 2^BIN_BITS bins (32x32, 8px each of a 256px tile),
+# so the bins of a tile at zoom z are exactly the tiles of zoom z + BIN_BITS
+BIN_BITS = 5
+BINS = 1 << BIN_BITS
+
+
+def tile_xy(latitude: float, longitude: float, zoom: int) -> tuple[int, int]:
+    """(x, y) of the tile at `zoom` containing the point"""
+    n = 1 << zoom
+    lat = math.radians(max(-MAX_LATITUDE, min(MAX_LATITUDE, latitude)))
+    x = int((longitude + 180.0) / 360.0 * n)
+    y = int((1.0 - math.log(math.tan(lat) + 1.0 / math.cos(lat)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def is_valid_tile(zoom: int, x: int, y: int) -> bool:
+    return zoom >= 0 and 0 <= x < (1 << zoom) and 0 <= y < (1 << zoom)
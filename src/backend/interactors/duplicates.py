@@ -0,0 +1,74 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, or_, select
+from datetime import timedelta
+from typing import Optional
+import logging
+
+from foundation import geohash
+from foundation.models import Violation, ViolationStatus
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DuplicateDetector:
+    """
+    Finds the case a new report duplicates: another violation of the same
+    normalised plate within `radius_meters` and `window_minutes`.
+
+    The lookup runs on ix_violations_plate_geohash_created_at: plate
+    equality, then the geohash prefix ranges of the 3x3 cells (sized to the
+    radius) around the report, then the time window. The few rows that
+    pass are checked by exact distance.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        radius_meters: float = settings.DUPLICATE_RADIUS_METERS,
+        window_minutes: int = settings.DUPLICATE_WINDOW_MINUTES,
+    ):
+        self.db = db
+        self.radius_meters = radius_meters
+        self.window = timedelta(minutes=window_minutes)
+
+    async def find_case(self, violation: Violation, plate: str) -> Optional[str]:
+        """Id of the case `violation` belongs to, None if it is the first report"""
+        if violation.latitude is None or violation.longitude is None or not plate:
+            return None
+
+        precision = geohash.precision_for_radius(self.radius_meters, violation.latitude)
+        cells = geohash.neighbourhood(violation.latitude, violation.longitude, precision)
+        in_cells = or_(*(
+            and_(Violation.geohash >= low, Violation.geohash < high)
+            for low, high in map(geohash.prefix_range, cells)
+        ))
+
+        stmt = (
+            select(
+                Violation.id,
+                Violation.duplicate_of_id,
+                Violation.latitude,
+                Violation.longitude,
+            )
+            .where(
+                Violation.license_plate_normalized == func.normalize_plate(plate),
+                in_cells,
+                Violation.created_at.between(violation.created_at - self.window, violation.created_at + self.window),
+                Violation.id != violation.id,
+                Violation.status != ViolationStatus.REJECTED,
+            )
+            .order_by(Violation.created_at)
+        )
+        result = await self.db.execute(stmt)
+
+        for row in result.all():
+            distance = geohash.distance_meters(violation.latitude, violation.longitude, row.latitude, row.longitude)
+            if distance <= self.radius_meters:
+                # Link to the case itself, not to another duplicate of it
+                case_id = row.duplicate_of_id or row.id
+                if case_id == violation.id:
+                    continue
+                logger.info(f"Violation {violation.id} duplicates {case_id} ({distance:.0f}m away)")
+                return case_id
+        return None
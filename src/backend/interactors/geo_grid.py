@@ -0,0 +1,329 @@
+import asyncio
+import json
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Iterator, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from foundation.database import AsyncSessionLocal
+from foundation.models import GeoRiskCell
+from interactors.parking_cache import METERS_PER_DEGREE_LAT, LocationCell, location_cell, lon_step
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Rows per upsert statement when storing a sweep
+SAVE_BATCH_SIZE = 500
+
+
+class GeoRiskGrid:
+    """
+    In-process copy of the precomputed geo_risk_cells table.
+
+    Most cells of a city area share one of a handful of rule-engine answers,
+    so each distinct answer is kept once and cells only hold its index. A
+    lookup is a dict access: no network and no database round trip. Cells
+    older than `max_age_seconds` are treated as missing, so the caller falls
+    back to the geo service until the next sweep refreshes them.
+
+    The table is re-read every `reload_interval` seconds, fetching only rows
+    computed or invalidated since the previous load; invalidated cells are
+    dropped until a sweep recomputes them.
+    """
+
+    def __init__(self, cell_meters: float, max_age_seconds: int, reload_interval: float = 300.0):
+        self.cell_meters = cell_meters
+        self.max_age_seconds = max_age_seconds
+        self.reload_interval = reload_interval
+        # (lat_index, lon_index) -> (computed_at, index into _payloads)
+        self._cells: dict[tuple[int, int], tuple[datetime, int]] = {}
+        self._payloads: list[dict] = []
+        self._payload_index: dict[str, int] = {}
+        self._loaded_until: Optional[datetime] = None
+        self._reload_task: Optional[asyncio.Task] = None
+        self.lookups = {"hit": 0, "stale": 0, "miss": 0}
+
+    def lookup(self, latitude: float, longitude: float) -> Optional[dict]:
+        """Rule-engine JSON of the cell the point falls into, None if unknown or stale"""
+        cell = location_cell(latitude, longitude, self.cell_meters)
+        entry = self._cells.get((cell.lat_index, cell.lon_index))
+        if entry is None:
+            self.lookups["miss"] += 1
+            return None
+        computed_at, index = entry
+        if computed_at < datetime.utcnow() - timedelta(seconds=self.max_age_seconds):
+            self.lookups["stale"] += 1
+            return None
+        self.lookups["hit"] += 1
+        return self._payloads[index]
+
+    def _store(self, lat_index: int, lon_index: int, result: dict, computed_at: datetime):
+        key = json.dumps(result, sort_keys=True, separators=(",", ":"))
+        index = self._payload_index.get(key)
+        if index is None:
+            index = len(self._payloads)
+            self._payloads.append(result)
+            self._payload_index[key] = index
+        self._cells[(lat_index, lon_index)] = (computed_at, index)
+
+    async def load(self) -> int:
+        """
+        Read cells computed or invalidated since the previous load.
+
+        Returns:
+            Number of cells read
+        """
+        query = select(
+            GeoRiskCell.lat_index, GeoRiskCell.lon_index, GeoRiskCell.result,
+            GeoRiskCell.computed_at, GeoRiskCell.invalidated_at,
+        ).where(GeoRiskCell.cell_meters == self.cell_meters)
+        if self._loaded_until is None:
+            query = query.where(GeoRiskCell.invalidated_at.is_(None))
+        else:
+            # >= so rows written in the same instant as the last load are not missed
+            query = query.where(or_(
+                GeoRiskCell.computed_at >= self._loaded_until,
+                GeoRiskCell.invalidated_at >= self._loaded_until,
+            ))
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(query)
+            rows = result.all()
+
+        for lat_index, lon_index, payload, computed_at, invalidated_at in rows:
+            if invalidated_at is not None:
+                self._cells.pop((lat_index, lon_index), None)
+            else:
+                self._store(lat_index, lon_index, payload, computed_at)
+            changed_at = max(computed_at, invalidated_at or computed_at)
+            if self._loaded_until is None or changed_at > self._loaded_until:
+                self._loaded_until = changed_at
+
+        if rows:
+            logger.info(
+                f"Loaded {len(rows)} geo risk cells ({len(self._cells)} cells, "
+                f"{len(self._payloads)} distinct results in memory)"
+            )
+        return len(rows)
+
+    def invalidate_region(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> int:
+        """
+        Drop the cells overlapping the bounding box from this worker's grid
+        (invalidate_cells marks them in the table for the other workers).
+
+        Returns:
+            Number of cells dropped
+        """
+        lat_step = self.cell_meters / METERS_PER_DEGREE_LAT
+        lat_indexes = range(math.floor(min_lat / lat_step), math.floor(max_lat / lat_step) + 1)
+        stale = []
+        for lat_index, lon_index in self._cells:
+            if lat_index not in lat_indexes:
+                continue
+            # Same cells as cells_in_bbox: the longitude step depends on the row
+            step = lon_step((lat_index + 0.5) * lat_step, self.cell_meters)
+            if math.floor(min_lon / step) <= lon_index <= math.floor(max_lon / step):
+                stale.append((lat_index, lon_index))
+        for key in stale:
+            del self._cells[key]
+        return len(stale)
+
+    async def _reload_loop(self):
+        while True:
+            try:
+                await self.load()
+            except Exception as e:
+                logger.warning(f"Geo risk grid reload failed: {e!r}")
+            await asyncio.sleep(self.reload_interval)
+
+    def start(self):
+        """Load the grid in the background and keep it current"""
+        if self._reload_task is None:
+            self._reload_task = asyncio.create_task(self._reload_loop())
+
+    async def stop(self):
+        if self._reload_task is not None:
+            self._reload_task.cancel()
+            try:
+                await self._reload_task
+            except asyncio.CancelledError:
+                pass
+            self._reload_task = None
+
+    def snapshot(self) -> dict:
+        return {
+            "cell_meters": self.cell_meters,
+            "cells": len(self._cells),
+            "distinct_results": len(self._payloads),
+            "loaded_until": self._loaded_until,
+            "lookups": dict(self.lookups),
+        }
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP geo_grid_cells Precomputed geo risk cells held in memory",
+            "# TYPE geo_grid_cells gauge",
+            f"geo_grid_cells {len(self._cells)}",
+            "# HELP geo_grid_lookups_total Geo risk grid lookups by result",
+            "# TYPE geo_grid_lookups_total counter",
+        ]
+        lines += [f'geo_grid_lookups_total{{result="{result}"}} {count}' for result, count in self.lookups.items()]
+        return "\n".join(lines) + "\n"
+
+
+def cells_in_bbox(
+    min_lat: float, min_lon: float, max_lat: float, max_lon: float, cell_meters: float
+) -> Iterator[LocationCell]:
+    """Every grid cell overlapping the bounding box, row by row"""
+    lat_step = cell_meters / METERS_PER_DEGREE_LAT
+    for lat_index in range(math.floor(min_lat / lat_step), math.floor(max_lat / lat_step) + 1):
+        center_lat = (lat_index + 0.5) * lat_step
+        step = lon_step(center_lat, cell_meters)
+        for lon_index in range(math.floor(min_lon / step), math.floor(max_lon / step) + 1):
+            yield LocationCell(lat_index, lon_index, center_lat, (lon_index + 0.5) * step)
+
+
+def _in_bbox(min_lat: float, min_lon: float, max_lat: float, max_lon: float, cell_meters: float):
+    """Condition on the rows of cells overlapping the bounding box"""
+    # Cell centers of the edge rows / columns can lie just outside the box
+    pad_lat = cell_meters / METERS_PER_DEGREE_LAT
+    pad_lon = lon_step(max(abs(min_lat), abs(max_lat)), cell_meters)
+    return and_(
+        GeoRiskCell.cell_meters == cell_meters,
+        GeoRiskCell.latitude.between(min_lat - pad_lat, max_lat + pad_lat),
+        GeoRiskCell.longitude.between(min_lon - pad_lon, max_lon + pad_lon),
+    )
+
+
+async def fresh_cell_keys(
+    min_lat: float, min_lon: float, max_lat: float, max_lon: float, cell_meters: float, max_age_seconds: int
+) -> set[tuple[int, int]]:
+    """Cells of the bounding box already computed within max_age_seconds and not invalidated since"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(GeoRiskCell.lat_index, GeoRiskCell.lon_index).where(
+                _in_bbox(min_lat, min_lon, max_lat, max_lon, cell_meters),
+                GeoRiskCell.computed_at > datetime.utcnow() - timedelta(seconds=max_age_seconds),
+                GeoRiskCell.invalidated_at.is_(None),
+            )
+        )
+        return {(lat_index, lon_index) for lat_index, lon_index in result.all()}
+
+
+async def invalidate_cells(min_lat: float, min_lon: float, max_lat: float, max_lon: float, cell_meters: float) -> int:
+    """
+    Mark the cells of the bounding box invalidated: workers drop them on their
+    next reload and the next sweep of the box recomputes them.
+
+    Returns:
+        Number of cells marked
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            update(GeoRiskCell)
+            .where(_in_bbox(min_lat, min_lon, max_lat, max_lon, cell_meters), GeoRiskCell.invalidated_at.is_(None))
+            .values(invalidated_at=datetime.utcnow())
+        )
+        await session.commit()
+    return result.rowcount or 0
+
+
+async def save_cells(rows: list[dict]):
+    if not rows:
+        return
+    stmt = pg_insert(GeoRiskCell).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[GeoRiskCell.cell_meters, GeoRiskCell.lat_index, GeoRiskCell.lon_index],
+        set_={
+            k: stmt.excluded[k]
+            for k in ("latitude", "longitude", "is_violation", "result", "computed_at", "invalidated_at")
+        },
+    )
+    async with AsyncSessionLocal() as session:
+        await session.execute(stmt)
+        await session.commit()
+
+
+async def precompute_region(
+    fetch: Callable[[float, float], Awaitable[dict]],
+    min_lat: float,
+    min_lon: float,
+    max_lat: float,
+    max_lon: float,
+    cell_meters: float,
+    concurrency: int = 8,
+    max_age_seconds: Optional[int] = None,
+) -> dict:
+    """
+    Run the rule-engine check for every cell of a bounding box and store the results.
+
+    Args:
+        fetch: Geo check for a point, returning the /api/check JSON
+        concurrency: Checks in flight at once
+        max_age_seconds: Skip cells computed more recently than this (incremental
+            refresh); None recomputes every cell
+
+    Returns:
+        Counts of cells total / skipped / computed / failed
+    """
+    cells = list(cells_in_bbox(min_lat, min_lon, max_lat, max_lon, cell_meters))
+    fresh = set()
+    if max_age_seconds is not None:
+        fresh = await fresh_cell_keys(min_lat, min_lon, max_lat, max_lon, cell_meters, max_age_seconds)
+    pending = [cell for cell in cells if (cell.lat_index, cell.lon_index) not in fresh]
+    logger.info(f"Geo grid sweep: {len(cells)} cells, {len(pending)} to compute at {cell_meters}m")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    counts = {"total": len(cells), "skipped": len(cells) - len(pending), "computed": 0, "failed": 0}
+    batch: list[dict] = []
+
+    async def check(cell: LocationCell):
+        async with semaphore:
+            try:
+                result = await fetch(cell.latitude, cell.longitude)
+            except Exception as e:
+                counts["failed"] += 1
+                logger.warning(f"Geo check failed for cell {cell.key}: {e!r}")
+                return
+        counts["computed"] += 1
+        batch.append({
+            "cell_meters": cell_meters,
+            "lat_index": cell.lat_index,
+            "lon_index": cell.lon_index,
+            "latitude": cell.latitude,
+            "longitude": cell.longitude,
+            "is_violation": bool(result.get("isViolation")),
+            "result": result,
+            "computed_at": datetime.utcnow(),
+            "invalidated_at": None,
+        })
+
+    # Schedule in chunks so a large box neither creates every task up front
+    # nor keeps every result in memory before it is written
+    chunk = max(concurrency * 50, SAVE_BATCH_SIZE)
+    for start in range(0, len(pending), chunk):
+        await asyncio.gather(*(check(cell) for cell in pending[start:start + chunk]))
+        while batch:
+            rows, batch[:] = batch[:SAVE_BATCH_SIZE], batch[SAVE_BATCH_SIZE:]
+            await save_cells(rows)
+        logger.info(f"Geo grid sweep: {min(start + chunk, len(pending))}/{len(pending)} cells done")
+
+    return counts
+
+
+_grid: Optional[GeoRiskGrid] = None
+
+
+def get_geo_grid() -> GeoRiskGrid:
+    """Process-wide grid, loaded once and shared by all requests"""
+    global _grid
+    if _grid is None:
+        _grid = GeoRiskGrid(
+            cell_meters=settings.GEO_GRID_CELL_METERS,
+            max_age_seconds=settings.GEO_GRID_MAX_AGE_SECONDS,
+            reload_interval=settings.GEO_GRID_RELOAD_INTERVAL_SECONDS,
+        )
+    return _grid
@@ -0,0 +1,115 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from datetime import datetime
+import logging
+
+from foundation import tiles
+from foundation.models import HeatmapCell, Violation
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Rebuild from the violations table: bins of the finest level first, then
+# every coarser level by shifting those (a bin at level L - 1 holds the 2x2
+# bins of level L below it). Same projection as tiles.tile_xy.
+REBUILD_SQL = """
+    INSERT INTO heatmap_cells (level, x, y, count, updated_at)
+    SELECT levels.level, finest.x >> (CAST(:top AS int) - levels.level), finest.y >> (CAST(:top AS int) - levels.level),
+        sum(finest.n), now()
+    FROM (
+        SELECT x, y, count(*) AS n
+        FROM (
+            SELECT
+                least(floor((longitude + 180) / 360 * n), n - 1)::int AS x,
+                least(greatest(floor((1 - ln(tan(radians(lat)) + 1 / cos(radians(lat))) / pi()) / 2 * n), 0), n - 1)::int AS y
+            FROM (
+                SELECT longitude, greatest(-CAST(:max_lat AS float8), least(CAST(:max_lat AS float8), latitude)) AS lat,
+                    CAST(:bins_per_side AS float8) AS n
+                FROM violations
+                WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+                    AND duplicate_of_id IS NULL
+                    AND status IN ('SUBMITTED', 'UNDER_REVIEW', 'RESOLVED')
+            ) AS located
+        ) AS points
+        GROUP BY x, y
+    ) AS finest,
+    generate_series(CAST(:bottom AS int), CAST(:top AS int)) AS levels(level)
+    GROUP BY 1, 2, 3
+"""
+
+
+def levels() -> range:
+    """Levels kept in heatmap_cells: the bins of tiles at HEATMAP_MIN_ZOOM..HEATMAP_MAX_ZOOM"""
+    return range(settings.HEATMAP_MIN_ZOOM + tiles.BIN_BITS, settings.HEATMAP_MAX_ZOOM + tiles.BIN_BITS + 1)
+
+
+def rebuild_params() -> dict:
+    top = levels()[-1]
+    return {"bottom": levels()[0], "top": top, "bins_per_side": 1 << top, "max_lat": tiles.MAX_LATITUDE}
+
+
+class HeatmapInteractor:
+    """
+    Violation heatmap tiles from precomputed per-bin counts.
+
+    heatmap_cells holds the number of reported violations per Web Mercator
+    bin at every served zoom, so a tile is one primary key range scan of at
+    most 32x32 rows, whatever the number of violations. A violation is
+    counted once, when it is first submitted, by an upsert in the submitting
+    transaction; duplicate reports of a case are not counted. rebuild()
+    recomputes the table from scratch (after a backfill or a change of the
+    served zooms).
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record(self, violation: Violation):
+        """Count a newly submitted violation in its bin at every level"""
+        if violation.latitude is None or violation.longitude is None or violation.duplicate_of_id:
+            return
+        now = datetime.utcnow()
+        top = levels()[-1]
+        x, y = tiles.tile_xy(violation.latitude, violation.longitude, top)
+        # Rows in level order, so concurrent submits lock shared bins in the same order
+        rows = [
+            {"level": level, "x": x >> (top - level), "y": y >> (top - level), "count": 1, "updated_at": now}
+            for level in levels()
+        ]
+        stmt = pg_insert(HeatmapCell).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[HeatmapCell.level, HeatmapCell.x, HeatmapCell.y],
+            set_={"count": HeatmapCell.count + 1, "updated_at": stmt.excluded.updated_at},
+        )
+        await self.db.execute(stmt)
+
+    async def get_tile(self, zoom: int, x: int, y: int) -> list[tuple[int, int, int]]:
+        """Non-empty bins of a tile as (column, row, count), row 0 at the top"""
+        level = zoom + tiles.BIN_BITS
+        x0, y0 = x << tiles.BIN_BITS, y << tiles.BIN_BITS
+        # In row order: the same bins always encode to the same tile body (and ETag)
+        result = await self.db.execute(
+            select(HeatmapCell.x, HeatmapCell.y, HeatmapCell.count).where(
+                HeatmapCell.level == level,
+                HeatmapCell.x.between(x0, x0 + tiles.BINS - 1),
+                HeatmapCell.y.between(y0, y0 + tiles.BINS - 1),
+                HeatmapCell.count > 0,
+            ).order_by(HeatmapCell.y, HeatmapCell.x)
+        )
+        return [(cell_x - x0, cell_y - y0, count) for cell_x, cell_y, count in result.all()]
+
+    async def rebuild(self) -> int:
+        """
+        Recompute every bin from the violations table.
+
+        Returns:
+            Number of bins written
+        """
+        # Submits wait for the rebuild instead of incrementing rows it is about to replace
+        await self.db.execute(text("LOCK TABLE heatmap_cells IN EXCLUSIVE MODE"))
+        await self.db.execute(text("DELETE FROM heatmap_cells"))
+        result = await self.db.execute(text(REBUILD_SQL), rebuild_params())
+        await self.db.commit()
+        logger.info(f"Rebuilt heatmap: {result.rowcount} bins at levels {levels()[0]}..{levels()[-1]}")
+        return result.rowcount
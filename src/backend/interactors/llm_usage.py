@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import func, select
+
+from foundation.database import AsyncSessionLocal
+from foundation.models import LLMCall
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCallRecord:
+    """Accounting of one OpenAI call, filled in by the caller while the call runs"""
+
+    def __init__(
+        self,
+        purpose: str,
+        model: str,
+        violation_id: Optional[str] = None,
+        streamed: bool = False,
+        image_detail: Optional[str] = None,
+        image_bytes: Optional[int] = None,
+    ):
+        self.purpose = purpose
+        self.model = model
+        self.violation_id = violation_id
+        self.streamed = streamed
+        self.image_detail = image_detail
+        self.image_bytes = image_bytes
+        self.status = "success"
+        self.latency_ms = 0
+        self.prompt_tokens: Optional[int] = None
+        self.cached_prompt_tokens: Optional[int] = None
+        self.completion_tokens: Optional[int] = None
+        self.total_tokens: Optional[int] = None
+
+    def set_usage(self, usage: Optional[dict]):
+        """Take token counts from the `usage` object of a chat completion (or its last stream chunk)"""
+        if not usage:
+            return
+        self.prompt_tokens = usage.get("prompt_tokens")
+        self.completion_tokens = usage.get("completion_tokens")
+        self.total_tokens = usage.get("total_tokens")
+        self.cached_prompt_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+
+    def as_row(self) -> dict:
+        return {
+            "purpose": self.purpose,
+            "model": self.model,
+            "violation_id": self.violation_id,
+            "status": self.status,
+            "streamed": self.streamed,
+            "latency_ms": self.latency_ms,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_prompt_tokens": self.cached_prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "image_detail": self.image_detail,
+            "image_bytes": self.image_bytes,
+        }
+
+
+class LLMUsageStats:
+    """Per-process token and call totals by purpose, for /metrics"""
+
+    def __init__(self):
+        # (purpose, model) -> counters
+        self.totals: dict[tuple[str, str], dict[str, float]] = {}
+
+    def observe(self, record: LLMCallRecord):
+        totals = self.totals.setdefault(
+            (record.purpose, record.model),
+            {"calls": 0, "errors": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0,
+             "completion_tokens": 0, "latency_seconds": 0.0},
+        )
+        totals["calls"] += 1
+        if record.status != "success":
+            totals["errors"] += 1
+        totals["prompt_tokens"] += record.prompt_tokens or 0
+        totals["cached_prompt_tokens"] += record.cached_prompt_tokens or 0
+        totals["completion_tokens"] += record.completion_tokens or 0
+        totals["latency_seconds"] += record.latency_ms / 1000
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP llm_calls_total OpenAI calls by purpose, model and outcome",
+            "# TYPE llm_calls_total counter",
+        ]
+        for (purpose, model), totals in sorted(self.totals.items()):
+            labels = f'purpose="{purpose}",model="{model}"'
+            lines.append(f'llm_calls_total{{{labels},outcome="success"}} {totals["calls"] - totals["errors"]}')
+            lines.append(f'llm_calls_total{{{labels},outcome="error"}} {totals["errors"]}')
+
+        lines.append("# HELP llm_tokens_total Tokens billed by purpose, model and kind")
+        lines.append("# TYPE llm_tokens_total counter")
+        for (purpose, model), totals in sorted(self.totals.items()):
+            labels = f'purpose="{purpose}",model="{model}"'
+            for kind in ("prompt", "cached_prompt", "completion"):
+                lines.append(f'llm_tokens_total{{{labels},kind="{kind}"}} {totals[f"{kind}_tokens"]}')
+
+        lines.append("# HELP llm_call_seconds_total Time spent waiting on OpenAI by purpose and model")
+        lines.append("# TYPE llm_call_seconds_total counter")
+        for (purpose, model), totals in sorted(self.totals.items()):
+            lines.append(
+                f'llm_call_seconds_total{{purpose="{purpose}",model="{model}"}} {round(totals["latency_seconds"], 3)}'
+            )
+        return "\n".join(lines) + "\n"
+
+
+llm_usage_stats = LLMUsageStats()
+
+
+@asynccontextmanager
+async def llm_call(purpose: str, model: str, **kwargs) -> AsyncIterator[LLMCallRecord]:
+    """
+    Time one OpenAI call and store its token usage.
+
+    Usage:
+        async with llm_call("parking_analysis", model, violation_id=...) as record:
+            response = ...
+            record.set_usage(response.json().get("usage"))
+
+    The record is saved to llm_calls (LLM_USAGE_PERSIST) and counted for
+    /metrics also when the call fails; persisting never fails the request.
+    """
+    record = LLMCallRecord(purpose, model, **kwargs)
+    start = time.monotonic()
+    try:
+        yield record
+    except (asyncio.CancelledError, GeneratorExit):
+        # Client went away (e.g. closed an analysis stream)
+        record.status = "cancelled"
+        raise
+    except BaseException:
+        record.status = "error"
+        raise
+    finally:
+        record.latency_ms = round((time.monotonic() - start) * 1000)
+        llm_usage_stats.observe(record)
+        logger.info(
+            f"LLM call {purpose} ({model}): {record.status} in {record.latency_ms}ms, "
+            f"prompt {record.prompt_tokens} (cached {record.cached_prompt_tokens}), "
+            f"completion {record.completion_tokens} tokens"
+        )
+        if settings.LLM_USAGE_PERSIST:
+            await _save(record)
+
+
+async def _save(record: LLMCallRecord):
+    try:
+        async with AsyncSessionLocal() as session:
+            session.add(LLMCall(**record.as_row()))
+            await session.commit()
+    except Exception as e:
+        logger.warning(f"Failed to store LLM call accounting: {e}")
+
+
+async def usage_report(since: datetime, purpose: Optional[str] = None) -> list[dict]:
+    """Calls, tokens and latency per purpose and model since a point in time"""
+    query = (
+        select(
+            LLMCall.purpose,
+            LLMCall.model,
+            func.count().label("calls"),
+            func.count().filter(LLMCall.status != "success").label("errors"),
+            func.coalesce(func.sum(LLMCall.prompt_tokens), 0).label("prompt_tokens"),
+            func.coalesce(func.sum(LLMCall.cached_prompt_tokens), 0).label("cached_prompt_tokens"),
+            func.coalesce(func.sum(LLMCall.completion_tokens), 0).label("completion_tokens"),
+            func.avg(LLMCall.latency_ms).label("avg_latency_ms"),
+            func.max(LLMCall.latency_ms).label("max_latency_ms"),
+        )
+        .where(LLMCall.created_at >= since)
+        .group_by(LLMCall.purpose, LLMCall.model)
+        .order_by(LLMCall.purpose, LLMCall.model)
+    )
+    if purpose:
+        query = query.where(LLMCall.purpose == purpose)
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(query)
+        rows = result.mappings().all()
+
+    report = []
+    for row in rows:
+        entry = dict(row)
+        entry["avg_latency_ms"] = round(float(entry["avg_latency_ms"] or 0))
+        entry["cache_hit_ratio"] = (
+            round(entry["cached_prompt_tokens"] / entry["prompt_tokens"], 3) if entry["prompt_tokens"] else None
+        )
+        report.append(entry)
+    return report
@@ -0,0 +1,251 @@
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from foundation.cache import cache_stats
+from interactors.parking_cache import location_cell
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "map_disk"
+
+
+class MapImageStore:
+    """
+    On-disk cache of rendered map PNGs in front of the geo service /api/map.
+
+    Layout under `root`:
+        blobs/ab/abcdef....png   image, named by the SHA-256 of its content
+        keys/<lat>_<lon>_<zoom>_<size>   digest of the blob for that location cell
+
+    Identical renders share one blob. Lookups hand out the blob path, so
+    the API can send it with a file response (sendfile, no copy through
+    Python) and the analysis reads it from the OS page cache. Index updates
+    run on the event loop; every filesystem call goes to a thread.
+
+    Entries are evicted least recently used first once the blobs exceed
+    `max_bytes`. Worker processes sharing the directory each keep their own
+    index (rebuilt from disk at start, recency from mtime); a blob removed
+    by another worker is simply a miss here.
+    """
+
+    def __init__(self, root: Path, max_bytes: int, cell_meters: float):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.cell_meters = cell_meters
+        self.blobs_dir = self.root / "blobs"
+        self.keys_dir = self.root / "keys"
+        # key -> digest, least recently used first
+        self._index: OrderedDict[str, str] = OrderedDict()
+        self._blob_sizes: dict[str, int] = {}
+        self._blob_refs: dict[str, int] = {}
+        self.total_bytes = 0
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._pending: dict[str, asyncio.Task] = {}
+
+    def key(self, latitude: float, longitude: float, zoom: int, image_size: int) -> str:
+        cell = location_cell(latitude, longitude, self.cell_meters)
+        return f"{cell.lat_index}_{cell.lon_index}_{zoom}_{image_size}"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blobs_dir / digest[:2] / f"{digest}.png"
+
+    def _scan(self) -> list[tuple[float, str, str, int]]:
+        """(mtime, key, digest, size) of every key file, dropping the broken ones"""
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        self.keys_dir.mkdir(parents=True, exist_ok=True)
+
+        entries = []
+        for key_file in self.keys_dir.iterdir():
+            try:
+                digest = key_file.read_text().strip()
+                size = self._blob_path(digest).stat().st_size
+                entries.append((key_file.stat().st_mtime, key_file.name, digest, size))
+            except (OSError, ValueError):
+                key_file.unlink(missing_ok=True)
+        return entries
+
+    async def _load_index(self):
+        """Rebuild the index from the keys directory, oldest access first"""
+        async with self._load_lock:
+            if self._loaded:
+                return
+            entries = await asyncio.to_thread(self._scan)
+            for _, key, digest, size in sorted(entries):
+                self._add(key, digest, size)
+            self._loaded = True
+        logger.info(f"Map cache: {len(self._index)} entries, {self.total_bytes / 2**20:.1f}MB in {self.root}")
+
+    def _add(self, key: str, digest: str, size: int):
+        if key in self._index:
+            self._release(key)
+        self._index[key] = digest
+        self._blob_refs[digest] = self._blob_refs.get(digest, 0) + 1
+        if digest not in self._blob_sizes:
+            self._blob_sizes[digest] = size
+            self.total_bytes += size
+
+    def _release(self, key: str) -> Optional[str]:
+        """Drop a key from the index; returns the digest if its blob is no longer referenced"""
+        digest = self._index.pop(key)
+        self._blob_refs[digest] -= 1
+        if self._blob_refs[digest] > 0:
+            return None
+        del self._blob_refs[digest]
+        self.total_bytes -= self._blob_sizes.pop(digest)
+        return digest
+
+    def _unlink(self, removed: list[tuple[str, Optional[str]]]):
+        """Delete the files of removed (key, digest) entries; digest None keeps a still shared blob"""
+        for key, digest in removed:
+            (self.keys_dir / key).unlink(missing_ok=True)
+            if digest is not None:
+                self._blob_path(digest).unlink(missing_ok=True)
+
+    async def _remove(self, key: str):
+        await asyncio.to_thread(self._unlink, [(key, self._release(key))])
+
+    async def _evict(self):
+        removed = []
+        while self.total_bytes > self.max_bytes and len(self._index) > 1:
+            key = next(iter(self._index))
+            removed.append((key, self._release(key)))
+        if removed:
+            await asyncio.to_thread(self._unlink, removed)
+
+    def _touch(self, key: str, path: Path) -> bool:
+        """Whether the blob is still there; if so, record the access in the key file's mtime"""
+        if not path.exists():
+            return False
+        # Recency survives restarts through the key file's mtime
+        os.utime(self.keys_dir / key, None)
+        return True
+
+    async def lookup(self, latitude: float, longitude: float, zoom: int, image_size: int) -> Optional[Path]:
+        """Path of the cached PNG, None on a miss"""
+        if not self._loaded:
+            await self._load_index()
+
+        key = self.key(latitude, longitude, zoom, image_size)
+        digest = self._index.get(key)
+        if digest is not None:
+            path = self._blob_path(digest)
+            try:
+                found = await asyncio.to_thread(self._touch, key, path)
+            except OSError:
+                found = False
+            # Another request may have replaced or evicted the entry meanwhile
+            if self._index.get(key) == digest:
+                if found:
+                    self._index.move_to_end(key)
+                    cache_stats.incr(NAMESPACE, "hit_disk")
+                    return path
+                await self._remove(key)
+
+        cache_stats.incr(NAMESPACE, "miss")
+        return None
+
+    def _write(self, key: str, digest: str, image: bytes):
+        path = self._blob_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so readers never see a partial file
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(image)
+            os.replace(tmp, path)
+
+        key_tmp = self.keys_dir / f".{key}.{os.getpid()}.tmp"
+        key_tmp.write_text(digest)
+        os.replace(key_tmp, self.keys_dir / key)
+
+    async def store(self, latitude: float, longitude: float, zoom: int, image_size: int, image: bytes) -> Path:
+        if not self._loaded:
+            await self._load_index()
+
+        key = self.key(latitude, longitude, zoom, image_size)
+        digest = hashlib.sha256(image).hexdigest()
+        await asyncio.to_thread(self._write, key, digest, image)
+
+        self._add(key, digest, len(image))
+        await self._evict()
+        return self._blob_path(digest)
+
+    async def _render_and_store(
+        self,
+        latitude: float,
+        longitude: float,
+        zoom: int,
+        image_size: int,
+        render: Callable[[], Awaitable[bytes]],
+    ) -> Path:
+        image = await render()
+        return await self.store(latitude, longitude, zoom, image_size, image)
+
+    async def get_or_render(
+        self,
+        latitude: float,
+        longitude: float,
+        zoom: int,
+        image_size: int,
+        render: Callable[[], Awaitable[bytes]],
+    ) -> Path:
+        """
+        Cached map path, rendering and storing it on a miss. Concurrent
+        misses for the same key in this worker share one render, which runs
+        in its own task: a cancelled request leaves it running for the
+        others (and the cache).
+        """
+        key = self.key(latitude, longitude, zoom, image_size)
+        pending = self._pending.get(key)
+        if pending is None:
+            path = await self.lookup(latitude, longitude, zoom, image_size)
+            if path is not None:
+                return path
+
+            # Another miss may have started the render while we looked
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = asyncio.ensure_future(
+                    self._render_and_store(latitude, longitude, zoom, image_size, render)
+                )
+                self._pending[key] = pending
+                pending.add_done_callback(lambda task: self._render_done(key, task))
+
+        return await asyncio.shield(pending)
+
+    def _render_done(self, key: str, task: asyncio.Task):
+        if self._pending.get(key) is task:
+            del self._pending[key]
+        if not task.cancelled():
+            # Only waiters care about the error, don't warn when there are none
+            task.exception()
+
+    def snapshot(self) -> dict:
+        return {
+            "root": str(self.root),
+            "entries": len(self._index),
+            "blobs": len(self._blob_sizes),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_store: Optional[MapImageStore] = None
+
+
+def get_map_store() -> MapImageStore:
+    """Process-wide store, so the LRU index is shared by all requests"""
+    global _store
+    if _store is None:
+        _store = MapImageStore(
+            Path(settings.MAP_CACHE_DIR),
+            max_bytes=settings.MAP_CACHE_MAX_BYTES,
+            cell_meters=settings.PARKING_CACHE_CELL_METERS,
+        )
+    return _store
@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import random
+import statistics
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import httpx
+
+from foundation.resilience import CircuitBreaker, CircuitOpenError, get_breaker
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+LEAST_OUTSTANDING = "least_outstanding"
+POWER_OF_TWO = "power_of_two"
+
+# Weight of the newest sample in the latency moving average
+LATENCY_EWMA_ALPHA = 0.3
+
+
+class OCRReplica:
+    """Client-side view of one OCR service instance"""
+
+    def __init__(self, url: str, breaker: CircuitBreaker):
+        self.url = url
+        self.breaker = breaker
+        self.in_flight = 0
+        self.latency_ewma: Optional[float] = None
+        self.healthy = True
+        self.ejected_until = 0.0
+        self.requests = {"success": 0, "error": 0}
+
+    @property
+    def ejected(self) -> bool:
+        return self.ejected_until > time.monotonic()
+
+    def available(self) -> bool:
+        return self.healthy and not self.ejected and self.breaker.allows_request()
+
+    def load_key(self) -> tuple:
+        # Fewest requests in flight first, faster replica breaks ties
+        return self.in_flight, self.latency_ewma or 0.0
+
+    def observe_latency(self, seconds: float):
+        if self.latency_ewma is None:
+            self.latency_ewma = seconds
+        else:
+            self.latency_ewma = LATENCY_EWMA_ALPHA * seconds + (1 - LATENCY_EWMA_ALPHA) * self.latency_ewma
+
+    def snapshot(self) -> dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "ejected": self.ejected,
+            "circuit": self.breaker.state,
+            "in_flight": self.in_flight,
+            "latency_ewma": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            "requests": dict(self.requests),
+        }
+
+
+class OCRReplicaPool:
+    """
+    Load balancing across OCR service replicas.
+
+    Replicas are chosen by fewest outstanding requests (least_outstanding) or
+    by the better of two random replicas (power_of_two). A replica leaves
+    rotation when its circuit breaker opens (errors), when its average latency
+    is `latency_ejection_factor` times the other replicas' median (ejected for
+    `ejection_seconds`), or when the periodic /health check fails. If no
+    replica is in rotation, every replica whose circuit allows it is tried.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        max_timeout: float,
+        strategy: str = LEAST_OUTSTANDING,
+        latency_ejection_factor: float = 3.0,
+        ejection_seconds: float = 30.0,
+        health_check_interval: float = 10.0,
+    ):
+        self.replicas = [OCRReplica(url, get_breaker(f"ocr:{url}", max_timeout=max_timeout)) for url in urls]
+        self.strategy = strategy
+        self.latency_ejection_factor = latency_ejection_factor
+        self.ejection_seconds = ejection_seconds
+        self.health_check_interval = health_check_interval
+        self._health_task: Optional[asyncio.Task] = None
+
+    def select(self) -> list[OCRReplica]:
+        """
+        Replicas to try for one request: the balancer's choice first, then
+        the remaining candidates as failover / hedge targets.
+
+        Raises:
+            CircuitOpenError: every replica's circuit is open
+        """
+        candidates = [r for r in self.replicas if r.available()]
+        if not candidates:
+            candidates = [r for r in self.replicas if r.breaker.allows_request()]
+        if not candidates:
+            for replica in self.replicas:
+                replica.breaker.outcomes["rejected"] += 1
+            raise CircuitOpenError("ocr", min(r.breaker.retry_after() for r in self.replicas))
+
+        ordered = sorted(candidates, key=OCRReplica.load_key)
+        if self.strategy == POWER_OF_TWO and len(candidates) > 2:
+            first = min(random.sample(candidates, 2), key=OCRReplica.load_key)
+            ordered.remove(first)
+            ordered.insert(0, first)
+        return ordered
+
+    def track(self, replica: OCRReplica, func: Callable[[], Awaitable[T]]) -> "asyncio.Future[T]":
+        """Run one request against a replica, accounting in-flight count and latency"""
+        # Counted when the request is dispatched, not when its task first runs,
+        # so a burst of requests within one event loop tick is still spread out.
+        # Released by a done callback, which also fires for a hedge attempt
+        # cancelled before it started.
+        replica.in_flight += 1
+        task = asyncio.ensure_future(self._tracked(replica, func))
+        task.add_done_callback(lambda _: self._release(replica))
+        return task
+
+    @staticmethod
+    def _release(replica: OCRReplica):
+        replica.in_flight -= 1
+
+    async def _tracked(self, replica: OCRReplica, func: Callable[[], Awaitable[T]]) -> T:
+        start = time.monotonic()
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            replica.requests["error"] += 1
+            raise
+
+        replica.requests["success"] += 1
+        replica.observe_latency(time.monotonic() - start)
+        self._check_latency_outlier(replica)
+        return result
+
+    def _check_latency_outlier(self, replica: OCRReplica):
+        if replica.ejected:
+            return
+
+        others = [
+            r.latency_ewma for r in self.replicas
+            if r is not replica and r.latency_ewma is not None and not r.ejected
+        ]
+        if not others:
+            return
+
+        median = statistics.median(others)
+        if median > 0 and replica.latency_ewma > median * self.latency_ejection_factor:
+            logger.warning(
+                f"Ejecting OCR replica {replica.url} for {self.ejection_seconds:.0f}s: "
+                f"latency {replica.latency_ewma:.2f}s vs {median:.2f}s median of the other replicas"
+            )
+            replica.ejected_until = time.monotonic() + self.ejection_seconds
+            # Start from a clean average when it comes back
+            replica.latency_ewma = None
+
+    async def _check_health(self, client: httpx.AsyncClient, replica: OCRReplica):
+        try:
+            response = await client.get(f"{replica.url}/health")
+            payload = response.json() if response.status_code == 200 else {}
+            healthy = payload.get("status") == "OK" and payload.get("crnn_loaded", True)
+        except Exception as e:
+            logger.warning(f"OCR replica {replica.url} health check failed: {e!r}")
+            healthy = False
+
+        if healthy != replica.healthy:
+            logger.warning(f"OCR replica {replica.url} is now {'healthy' if healthy else 'unhealthy'}")
+        replica.healthy = healthy
+
+    async def _health_loop(self):
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            while True:
+                await asyncio.gather(*(self._check_health(client, r) for r in self.replicas))
+                await asyncio.sleep(self.health_check_interval)
+
+    def start(self):
+        """Start periodic /health checks (only useful with more than one replica)"""
+        if self._health_task is None and self.health_check_interval > 0 and len(self.replicas) > 1:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    def snapshot(self) -> list[dict]:
+        return [replica.snapshot() for replica in self.replicas]
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP ocr_replica_in_flight Requests currently in flight per OCR replica",
+            "# TYPE ocr_replica_in_flight gauge",
+        ]
+        lines += [f'ocr_replica_in_flight{{replica="{r.url}"}} {r.in_flight}' for r in self.replicas]
+
+        lines.append("# HELP ocr_replica_latency_seconds Moving average of successful request latency")
+        lines.append("# TYPE ocr_replica_latency_seconds gauge")
+        lines += [
+            f'ocr_replica_latency_seconds{{replica="{r.url}"}} {round(r.latency_ewma, 4)}'
+            for r in self.replicas if r.latency_ewma is not None
+        ]
+
+        lines.append("# HELP ocr_replica_available Whether the replica is in rotation")
+        lines.append("# TYPE ocr_replica_available gauge")
+        lines += [f'ocr_replica_available{{replica="{r.url}"}} {int(r.available())}' for r in self.replicas]
+
+        lines.append("# HELP ocr_replica_requests_total Requests per OCR replica by outcome")
+        lines.append("# TYPE ocr_replica_requests_total counter")
+        for r in self.replicas:
+            for outcome, count in r.requests.items():
+                lines.append(f'ocr_replica_requests_total{{replica="{r.url}",outcome="{outcome}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+
+_pools: dict[tuple, OCRReplicaPool] = {}
+
+
+def get_replica_pool(urls: list[str], max_timeout: float) -> OCRReplicaPool:
+    """Process-wide pool for a set of replica URLs, so counters are shared by all clients"""
+    key = tuple(urls)
+    if key not in _pools:
+        _pools[key] = OCRReplicaPool(
+            urls,
+            max_timeout=max_timeout,
+            strategy=settings.OCR_LOAD_BALANCING,
+            latency_ejection_factor=settings.OCR_LATENCY_EJECTION_FACTOR,
+            ejection_seconds=settings.OCR_EJECTION_SECONDS,
+            health_check_interval=settings.OCR_HEALTH_CHECK_INTERVAL_SECONDS,
+        )
+    return _pools[key]
+
+
+def replica_pools() -> list[OCRReplicaPool]:
+    return list(_pools.values())
+
+
+async def stop_replica_pools():
+    for pool in _pools.values():
+        await pool.stop()
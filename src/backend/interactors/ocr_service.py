@@ -1,21 +1,177 @@
+import asyncio
 import httpx
+import json
 import logging
-from typing import Optional
+import struct
+import uuid
+from typing import Awaitable, Callable, Optional, TypeVar
 from io import BytesIO
 from PIL import Image
+from foundation.resilience import CircuitOpenError, hedged_call
+from interactors.ocr_replicas import get_replica_pool, stop_replica_pools
 from settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Internal binary transport, see src/ocr/src/utils/frame_protocol.py
+FRAME_CONTENT_TYPE = "application/x-ocr-frames"
+_REQUEST_HEADER = struct.Struct(">II")
+_RESULT_HEADER = struct.Struct(">I")
+
+T = TypeVar("T")
+
+UNRECOGNIZED_MESSAGE = "Не вдалося розпізнати номерний знак. Спробуйте зробити чіткіше фото"
+UNAVAILABLE_MESSAGE = "Сервіс розпізнавання тимчасово недоступний. Спробуйте пізніше"
+
+
+def encode_request_frame(meta: dict, payload: bytes) -> bytes:
+    """Serialize one image and its metadata as a length-prefixed request frame"""
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+    return _REQUEST_HEADER.pack(len(meta_bytes), len(payload)) + meta_bytes + payload
+
+
+class ResultFrameReader:
+    """Incrementally splits a streamed response body into result dicts"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> list[dict]:
+        self._buffer.extend(chunk)
+        results = []
+        while len(self._buffer) >= _RESULT_HEADER.size:
+            (length,) = _RESULT_HEADER.unpack_from(self._buffer)
+            end = _RESULT_HEADER.size + length
+            if len(self._buffer) < end:
+                break
+            results.append(json.loads(bytes(self._buffer[_RESULT_HEADER.size:end])))
+            del self._buffer[:end]
+        return results
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
 
 class OCRServiceClient:
     """Client for external OCR service that detects license plates"""
 
-    def __init__(self):
-        self.base_url = settings.OCR_SERVICE_BASE_URL.rstrip('/')
+    # One keep-alive connection pool shared by all instances of the client
+    _http_client: Optional[httpx.AsyncClient] = None
+
+    def __init__(self, base_urls: Optional[list[str]] = None):
+        """
+        Args:
+            base_urls: OCR replicas to balance across; defaults to
+                OCR_SERVICE_BASE_URL plus OCR_SERVICE_REPLICA_URLS
+        """
+        urls = base_urls or [settings.OCR_SERVICE_BASE_URL] + settings.OCR_SERVICE_REPLICA_URLS
+        self.replica_urls = list(dict.fromkeys(url.rstrip('/') for url in urls))
+        self.base_url = self.replica_urls[0]
         self.timeout = 30.0
         self.max_dimension = 2048
         self.max_file_size_mb = 10
+        self.transport = settings.OCR_SERVICE_TRANSPORT
+        self.raw_pixels = settings.OCR_BINARY_RAW_PIXELS
+        self.hedge_requests = settings.OCR_HEDGE_REQUESTS
+        self.replica_pool = get_replica_pool(self.replica_urls, max_timeout=self.timeout)
+
+    @classmethod
+    def _client(cls) -> httpx.AsyncClient:
+        if cls._http_client is None or cls._http_client.is_closed:
+            cls._http_client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return cls._http_client
+
+    @classmethod
+    async def aclose(cls):
+        """Close the shared connection pool and stop replica health checks, called on application shutdown"""
+        await stop_replica_pools()
+        if cls._http_client is not None:
+            await cls._http_client.aclose()
+            cls._http_client = None
+
+    async def _call_replicas(
+        self,
+        send: Callable[[str], Awaitable[T]],
+        hedge: bool = True,
+        timeout: Optional[float] = None,
+    ) -> T:
+        """
+        Run a request against the OCR replicas through their circuit breakers.
+
+        The replica pool picks the least loaded replica in rotation, a failed
+        replica falls over to the next one. With several replicas and `hedge`,
+        a request that is slower than the chosen replica's p95 latency is
+        duplicated to the next replica and whichever answers first wins.
+
+        Args:
+            send: Coroutine function performing the request against a base URL
+            hedge: Allow hedged duplicates (only for cheap single-photo requests)
+            timeout: Fixed deadline instead of the adaptive per-replica timeout
+
+        Raises:
+            CircuitOpenError: every replica's circuit is open
+        """
+        replicas = self.replica_pool.select()
+        attempts = [
+            lambda replica=replica: self.replica_pool.track(
+                replica, lambda: replica.breaker.call(lambda: send(replica.url), timeout=timeout)
+            )
+            for replica in replicas
+        ]
+
+        hedge_delay = None
+        if hedge and self.hedge_requests and len(attempts) > 1:
+            hedge_delay = replicas[0].breaker.hedge_delay()
+        return await hedged_call(attempts, hedge_delay)
+
+    def _error_result(self, error: Exception) -> dict:
+        """Map a failed OCR call to the service's ERROR response format"""
+        if isinstance(error, CircuitOpenError):
+            logger.warning(f"OCR service unavailable, failing fast: {error}")
+            # Flagged rather than coded: every code is taken by the service's own STATUS_CODES
+            return {
+                "status": "ERROR",
+                "unavailable": True,
+                "message": UNAVAILABLE_MESSAGE,
+                "retry_after": round(error.retry_after),
+            }
+        if isinstance(error, (httpx.HTTPError, asyncio.TimeoutError)):
+            logger.error(f"OCR service HTTP error: {error!r}")
+            return {
+                "status": "ERROR",
+                "code": 1,
+                "message": UNRECOGNIZED_MESSAGE,
+            }
+        logger.error(f"Unexpected error calling OCR service: {error}")
+        return {
+            "status": "ERROR",
+            "code": 2,
+            "message": "Помилка обробки зображення"
+        }
+
+    def _load_image(self, image_bytes: bytes) -> Image.Image:
+        """Open image, convert to RGB and downscale to max_dimension"""
+        image = Image.open(BytesIO(image_bytes))
+
+        original_size = len(image_bytes) / (1024 * 1024)
+        logger.info(f"Original image size: {original_size:.2f}MB, dimensions: {image.size}")
+
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        width, height = image.size
+        if width > self.max_dimension or height > self.max_dimension:
+            ratio = min(self.max_dimension / width, self.max_dimension / height)
+            new_width = int(width * ratio)
+            new_height = int(height * ratio)
+            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            logger.info(f"Resized image to: {image.size}")
+
+        return image
 
     def _preprocess_image(self, image_bytes: bytes) -> bytes:
         """
@@ -28,21 +184,7 @@ class OCRServiceClient:
             Processed image bytes (JPEG format)
         """
         try:
-            image = Image.open(BytesIO(image_bytes))
-
-            original_size = len(image_bytes) / (1024 * 1024)
-            logger.info(f"Original image size: {original_size:.2f}MB, dimensions: {image.size}")
-
-            if image.mode in ('RGBA', 'LA', 'P'):
-                image = image.convert('RGB')
-
-            width, height = image.size
-            if width > self.max_dimension or height > self.max_dimension:
-                ratio = min(self.max_dimension / width, self.max_dimension / height)
-                new_width = int(width * ratio)
-                new_height = int(height * ratio)
-                image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                logger.info(f"Resized image to: {image.size}")
+            image = self._load_image(image_bytes)
 
             output = BytesIO()
             quality = 85
@@ -64,6 +206,106 @@ class OCRServiceClient:
             logger.error(f"Error preprocessing image: {e}")
             return image_bytes
 
+    def _build_frame(self, image_bytes: bytes, known_hashes: Optional[list[str]] = None) -> tuple[str, bytes]:
+        """
+        Build a binary request frame for one photo, returns (frame id, frame).
+
+        With OCR_BINARY_RAW_PIXELS the downscaled RGB pixels are sent as is,
+        which skips the JPEG encode here and the decode on the OCR side at the
+        cost of a larger payload (only worth it on a fast local network).
+        """
+        frame_id = uuid.uuid4().hex
+        meta = {"id": frame_id}
+        if known_hashes:
+            meta["known_hashes"] = known_hashes
+
+        if self.raw_pixels:
+            try:
+                image = self._load_image(image_bytes)
+                meta.update(encoding="rgb", width=image.width, height=image.height)
+                return frame_id, encode_request_frame(meta, image.tobytes())
+            except Exception as e:
+                logger.error(f"Error preparing raw pixels, falling back to JPEG: {e}")
+
+        meta["encoding"] = "jpeg"
+        return frame_id, encode_request_frame(meta, self._preprocess_image(image_bytes))
+
+    async def detect_batch(
+        self,
+        images: list[bytes],
+        known_hashes: Optional[list[str]] = None,
+    ) -> list[dict]:
+        """
+        Recognise several photos in one streamed /recognize_crnn_binary request
+
+        Args:
+            images: Image file bytes
+            known_hashes: crop_hash values applied to every image of the batch
+
+        Returns:
+            List of OCR results (same format as detect_from_file) in input order
+        """
+        if not images:
+            return []
+
+        ids, frames = zip(*(self._build_frame(image_bytes, known_hashes) for image_bytes in images))
+        body = b"".join(frames)
+        timeout = self.timeout * len(images)
+
+        async def send(base_url: str) -> dict:
+            results_by_id = {}
+            reader = ResultFrameReader()
+            async with self._client().stream(
+                "POST",
+                f"{base_url}/recognize_crnn_binary",
+                content=body,
+                headers={"Content-Type": FRAME_CONTENT_TYPE},
+                timeout=timeout,
+            ) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    for result in reader.feed(chunk):
+                        logger.info(f"OCR service response: status={result.get('status')}, plate={result.get('plate')}, confidence={result.get('confidence')}")
+                        results_by_id[result.get("id")] = result
+
+            if reader.pending:
+                logger.error(f"OCR service returned a truncated frame ({reader.pending} bytes left)")
+            return results_by_id
+
+        # Batches run longer than the single requests the adaptive timeout is learned
+        # from, so they get a fixed deadline and plain failover instead of hedging
+        single = len(images) == 1
+        try:
+            results_by_id = await self._call_replicas(send, hedge=single, timeout=None if single else timeout)
+        except Exception as e:
+            return [self._error_result(e)] * len(images)
+
+        # A stream-level error frame has no id and applies to all missing images
+        fallback = results_by_id.get(None) or {
+            "status": "ERROR",
+            "code": 1,
+            "message": UNRECOGNIZED_MESSAGE,
+        }
+        return [results_by_id.get(frame_id, fallback) for frame_id in ids]
+
+    async def _post_image(self, filename: str, image_bytes: bytes, data: Optional[dict] = None) -> dict:
+        """POST one photo to /recognize_crnn on the first healthy replica to answer"""
+        files = {"image": (filename, image_bytes, "image/jpeg")}
+
+        async def send(base_url: str) -> dict:
+            response = await self._client().post(
+                f"{base_url}/recognize_crnn",
+                files=files,
+                data=data,
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            return response.json()
+
+        result = await self._call_replicas(send)
+        logger.info(f"OCR service response: status={result.get('status')}, plate={result.get('plate')}, confidence={result.get('confidence')}")
+        return result
+
     async def detect_license_plate(self, image_url: str) -> dict:
         """
         Call external OCR service /recognize_crnn endpoint
@@ -92,33 +334,9 @@ class OCRServiceClient:
                 file_bytes = f.read()
 
             processed_bytes = self._preprocess_image(file_bytes)
-
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                files = {"image": (image_url.split('/')[-1], processed_bytes, "image/jpeg")}
-                response = await client.post(
-                    f"{self.base_url}/recognize_crnn",
-                    files=files
-                )
-                response.raise_for_status()
-                result = response.json()
-
-                logger.info(f"OCR service response: status={result.get('status')}, plate={result.get('plate')}, confidence={result.get('confidence')}")
-
-                return result
-        except httpx.HTTPError as e:
-            logger.error(f"OCR service HTTP error: {e}")
-            return {
-                "status": "ERROR",
-                "code": 1,
-                "message": "Не вдалося розпізнати номерний знак. Спробуйте зробити чіткіше фото"
-            }
+            return await self._post_image(image_url.split('/')[-1], processed_bytes)
         except Exception as e:
-            logger.error(f"Unexpected error calling OCR service: {e}")
-            return {
-                "status": "ERROR",
-                "code": 2,
-                "message": "Помилка обробки зображення"
-            }
+            return self._error_result(e)
 
     def _mock_detection(self) -> dict:
         """Mock OCR response for development/testing"""
@@ -134,13 +352,20 @@ class OCRServiceClient:
             "violated": []
         }
 
-    async def detect_from_file(self, file_bytes: bytes, filename: str) -> dict:
+    async def detect_from_file(
+        self,
+        file_bytes: bytes,
+        filename: str,
+        known_hashes: Optional[list[str]] = None,
+    ) -> dict:
         """
         Call external OCR service with file bytes using /recognize_crnn endpoint
 
         Args:
             file_bytes: Image file bytes
             filename: Original filename
+            known_hashes: crop_hash values of photos already recognised for the
+                same car; a near-identical crop comes back with status "SKIPPED"
 
         Returns:
             dict with OCR results:
@@ -158,32 +383,12 @@ class OCRServiceClient:
                 }
             }
         """
+        if self.transport == "binary":
+            return (await self.detect_batch([file_bytes], known_hashes))[0]
+
         try:
             processed_bytes = self._preprocess_image(file_bytes)
-
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                files = {"image": (filename, processed_bytes, "image/jpeg")}
-                response = await client.post(
-                    f"{self.base_url}/recognize_crnn",
-                    files=files
-                )
-                response.raise_for_status()
-                result = response.json()
-
-                logger.info(f"OCR service response: status={result.get('status')}, plate={result.get('plate')}, confidence={result.get('confidence')}")
-
-                return result
-        except httpx.HTTPError as e:
-            logger.error(f"OCR service HTTP error: {e}")
-            return {
-                "status": "ERROR",
-                "code": 1,
-                "message": "Не вдалося розпізнати номерний знак. Спробуйте зробити чіткіше фото"
-            }
+            data = {"known_hashes": ",".join(known_hashes)} if known_hashes else None
+            return await self._post_image(filename, processed_bytes, data)
         except Exception as e:
-            logger.error(f"Unexpected error calling OCR service: {e}")
-            return {
-                "status": "ERROR",
-                "code": 2,
-                "message": "Помилка обробки зображення"
-            }
+            return self._error_result(e)
@@ -1,12 +1,20 @@
 import asyncio
-import base64
 import httpx
 import json
 import logging
-from typing import Optional
+import time
+from pathlib import Path
+from typing import AsyncIterator, Optional
 from pydantic import BaseModel
 
 from settings import settings
+from foundation.json_stream import JSONMemberStream
+from foundation.resilience import get_breaker
+from interactors.parking_cache import LocationCell, get_parking_cache, prompt_version
+from interactors.geo_grid import get_geo_grid
+from interactors.map_cache import get_map_store
+from interactors.llm_usage import llm_call
+from interactors.vision_payload import PreparedImage, compact_json, prepare_image
 
 logger = logging.getLogger(__name__)
 from foundation.schemas import (
@@ -29,6 +37,8 @@ class GeoCheckResponse(BaseModel):
     nearbyObjects: list[NearbyObject]
 
 
+# Identical for every request and sent as the system message, so the
+# provider can cache it as a prompt prefix; per-request data goes after it
 ANALYSIS_PROMPT = """Ти — інспектор з паркування та експерт з Правил дорожнього руху України (ПДР),
 а також модель, здатна аналізувати:
 1) формалізовані дані rule-engine (OSM),
@@ -82,16 +92,16 @@ ANALYSIS_PROMPT = """Ти — інспектор з паркування та е
 
 ## 5. Дані від rule‑engine:
 
-{rule_engine_data}
+JSON від rule‑engine та статична карта надані в повідомленні користувача.
 
 Аналізуй статичну карту (червона точка — GPS користувача з похибкою) та фото автомобіля.
 Поверни відповідь *лише* у JSON з такою структурою (без додаткового тексту):
 
-{{
+{
   "isViolation": true або false,
   "overallViolationConfidence": число від 0.0 до 1.0,
   "likelyArticles": ["список статей ПДР, які найімовірніше порушені"],
-  "probabilityBreakdown": {{
+  "probabilityBreakdown": {
     "railway_crossing": число 0.0-1.0,
     "tram_track": число 0.0-1.0,
     "bridge_or_tunnel": число 0.0-1.0,
@@ -107,20 +117,20 @@ ANALYSIS_PROMPT = """Ти — інспектор з паркування та е
     "blocking_roadway": число 0.0-1.0,
     "parking_prohibited_zone": число 0.0-1.0,
     "parking_time_limited_zone": число 0.0-1.0
-  }},
+  },
   "reasons": [
-    {{
+    {
       "source": "rule_engine" або "map_analysis",
       "detail": "детальний опис"
-    }}
+    }
   ],
-  "crossChecks": {{
+  "crossChecks": {
     "map_vs_photo": "не застосовується (немає фото)",
     "map_vs_rule_engine": "порівняння карти та OSM даних",
     "photo_vs_rule_engine": "не застосовується (немає фото)"
-  }},
+  },
   "finalHumanReadableConclusion": "висновок українською мовою"
-}}
+}
 
 ВАЖЛИВО:
 — Не вигадуй об'єктів, яких немає на карті.
@@ -130,19 +140,35 @@ ANALYSIS_PROMPT = """Ти — інспектор з паркування та е
 — Поверни *тільки* JSON, без жодного додаткового тексту."""
 
 
+ANALYSIS_MODEL = "gpt-4.1"
+
+
 class ParkingAnalysisInteractor:
     def __init__(self):
         self.geo_service_url = settings.GEO_SERVICE_URL
         self.openai_api_key = settings.OPENAI_API_KEY
         self.openai_api_base = settings.OPENAI_API_BASE
-
-    async def _fetch_geo_check(
+        self.geo_breaker = get_breaker("geo", max_timeout=30.0)
+        self.openai_breaker = get_breaker("openai_parking", max_timeout=60.0)
+        self.cache = get_parking_cache() if settings.PARKING_CACHE_ENABLED else None
+        self.geo_grid = get_geo_grid() if settings.GEO_GRID_ENABLED else None
+        self.map_store = get_map_store() if settings.MAP_CACHE_ENABLED else None
+        self.prompt_version = prompt_version(ANALYSIS_PROMPT, ANALYSIS_MODEL)
+
+    async def _geo_get(self, client: httpx.AsyncClient, url: str, params: dict) -> httpx.Response:
+        async def send() -> httpx.Response:
+            response = await client.get(url, params=params)
+            response.raise_for_status()
+            return response
+
+        return await self.geo_breaker.call(send)
+
+    async def fetch_geo_check(
         self, client: httpx.AsyncClient, lat: float, lon: float
     ) -> GeoCheckResponse:
         url = f"{self.geo_service_url}/api/check"
         params = {"lat": lat, "lon": lon}
-        response = await client.get(url, params=params)
-        response.raise_for_status()
+        response = await self._geo_get(client, url, params)
         data = response.json()
         return GeoCheckResponse(**data)
 
@@ -151,60 +177,129 @@ class ParkingAnalysisInteractor:
     ) -> bytes:
         url = f"{self.geo_service_url}/api/map"
         params = {"lat": lat, "lon": lon, "zoom": zoom, "imageSize": image_size}
-        response = await client.get(url, params=params)
-        response.raise_for_status()
+        response = await self._geo_get(client, url, params)
         return response.content
 
-    async def _call_openai_vision(
-        self,
-        rule_engine_data: dict,
-        map_image_base64: str,
-    ) -> AnalyzeParkingResponse:
-        prompt = ANALYSIS_PROMPT.format(
-            rule_engine_data=json.dumps(rule_engine_data, indent=2, ensure_ascii=False)
-        )
+    async def _get_geo_check(
+        self, client: httpx.AsyncClient, cell: Optional[LocationCell], lat: float, lon: float
+    ) -> GeoCheckResponse:
+        if self.geo_grid is not None:
+            precomputed = self.geo_grid.lookup(lat, lon)
+            if precomputed is not None:
+                return GeoCheckResponse(**precomputed)
+
+        if cell is not None:
+            cached = await self.cache.get_geo_check(cell)
+            if cached is not None:
+                return GeoCheckResponse(**cached)
+
+        geo_check = await self.fetch_geo_check(client, lat, lon)
+        if cell is not None:
+            await self.cache.set_geo_check(cell, geo_check.model_dump())
+        return geo_check
+
+    async def _get_map_image(
+        self, client: httpx.AsyncClient, cell: Optional[LocationCell], lat: float, lon: float, zoom: int, image_size: int
+    ) -> bytes:
+        if self.map_store is not None:
+            path = await self.map_store.get_or_render(
+                lat, lon, zoom, image_size, lambda: self._render_map_image(client, cell, lat, lon, zoom, image_size)
+            )
+            return await asyncio.to_thread(path.read_bytes)
+        return await self._render_map_image(client, cell, lat, lon, zoom, image_size)
 
+    async def _render_map_image(
+        self, client: httpx.AsyncClient, cell: Optional[LocationCell], lat: float, lon: float, zoom: int, image_size: int
+    ) -> bytes:
+        if cell is not None:
+            cached = await self.cache.get_map(cell, zoom, image_size)
+            if cached is not None:
+                return cached
+
+        image = await self._fetch_map_image(client, lat, lon, zoom, image_size)
+        if cell is not None:
+            await self.cache.set_map(cell, zoom, image_size, image)
+        return image
+
+    async def get_map_path(self, latitude: float, longitude: float, zoom: int = 17, image_size: int = 512) -> Path:
+        """Rendered map on disk (MAP_CACHE_ENABLED), rendering it on a miss"""
+        cell = self.cache.cell(latitude, longitude) if self.cache else None
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            return await self.map_store.get_or_render(
+                latitude, longitude, zoom, image_size,
+                lambda: self._render_map_image(client, cell, latitude, longitude, zoom, image_size),
+            )
+
+    def _openai_request(self, rule_engine_data: dict, map_image: PreparedImage) -> tuple[dict, dict]:
         headers = {
             "Authorization": f"Bearer {self.openai_api_key}",
             "Content-Type": "application/json",
         }
 
         payload = {
-            "model": "gpt-4.1",
+            "model": ANALYSIS_MODEL,
             "messages": [
+                {"role": "system", "content": ANALYSIS_PROMPT},
                 {
                     "role": "user",
                     "content": [
-                        {"type": "text", "text": prompt},
+                        {"type": "text", "text": f"Дані rule‑engine (JSON): {compact_json(rule_engine_data)}"},
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/png;base64,{map_image_base64}",
-                                "detail": "high",
+                                "url": map_image.data_url(),
+                                "detail": map_image.detail,
                             },
                         },
                     ],
-                }
+                },
             ],
             "response_format": {"type": "json_object"},
             "temperature": 0.3,
             "max_tokens": 2000,
         }
+        return headers, payload
+
+    def _llm_call(self, map_image: PreparedImage, violation_id: Optional[str], streamed: bool):
+        return llm_call(
+            "parking_analysis",
+            ANALYSIS_MODEL,
+            violation_id=violation_id,
+            streamed=streamed,
+            image_detail=map_image.detail,
+            image_bytes=len(map_image.data),
+        )
+
+    async def _call_openai_vision(
+        self,
+        rule_engine_data: dict,
+        map_image: PreparedImage,
+        violation_id: Optional[str] = None,
+    ) -> AnalyzeParkingResponse:
+        headers, payload = self._openai_request(rule_engine_data, map_image)
 
         async with httpx.AsyncClient(timeout=60.0) as client:
             logger.info(f"Calling OpenAI API with model: {payload['model']}")
-            response = await client.post(
-                f"{self.openai_api_base}/chat/completions",
-                headers=headers,
-                json=payload,
-            )
-
-            if response.status_code != 200:
-                error_detail = response.text
-                logger.error(f"OpenAI API error: {error_detail}")
-                raise Exception(f"OpenAI API error (status {response.status_code}): {error_detail}")
 
-            result = response.json()
+            async def send() -> httpx.Response:
+                response = await client.post(
+                    f"{self.openai_api_base}/chat/completions",
+                    headers=headers,
+                    json=payload,
+                )
+                response.raise_for_status()
+                return response
+
+            async with self._llm_call(map_image, violation_id, streamed=False) as record:
+                try:
+                    response = await self.openai_breaker.call(send)
+                except httpx.HTTPStatusError as e:
+                    error_detail = e.response.text
+                    logger.error(f"OpenAI API error: {error_detail}")
+                    raise Exception(f"OpenAI API error (status {e.response.status_code}): {error_detail}")
+
+                result = response.json()
+                record.set_usage(result.get("usage"))
             logger.info(f"OpenAI response received: {json.dumps(result, indent=2)}")
 
         if not result.get("choices") or len(result["choices"]) == 0:
@@ -221,30 +316,198 @@ class ParkingAnalysisInteractor:
 
         return AnalyzeParkingResponse(**parsed_response)
 
-    async def analyze_parking(
+    async def _stream_openai_vision(
         self,
-        latitude: float,
-        longitude: float,
-        zoom: int = 17,
-        image_size: int = 512,
-    ) -> AnalyzeParkingResponse:
+        rule_engine_data: dict,
+        map_image: PreparedImage,
+        violation_id: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """Same request as _call_openai_vision with stream=true, yields content deltas as they arrive"""
+        headers, payload = self._openai_request(rule_engine_data, map_image)
+        payload["stream"] = True
+        # Token usage arrives in one last chunk without choices
+        payload["stream_options"] = {"include_usage": True}
+
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            logger.info(f"Streaming OpenAI API with model: {payload['model']}")
+
+            async def send() -> httpx.Response:
+                request = client.build_request(
+                    "POST", f"{self.openai_api_base}/chat/completions", headers=headers, json=payload
+                )
+                response = await client.send(request, stream=True)
+                if response.is_error:
+                    await response.aread()
+                    await response.aclose()
+                response.raise_for_status()
+                return response
+
+            # The breaker guards opening the stream. Its duration depends on
+            # the answer length, so a fixed deadline keeps it out of the
+            # adaptive timeout; the client read timeout bounds stalls after that.
+            async with self._llm_call(map_image, violation_id, streamed=True) as record:
+                try:
+                    response = await self.openai_breaker.call(send, timeout=60.0)
+                except httpx.HTTPStatusError as e:
+                    error_detail = e.response.text
+                    logger.error(f"OpenAI API error: {error_detail}")
+                    raise Exception(f"OpenAI API error (status {e.response.status_code}): {error_detail}")
+
+                try:
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        chunk = json.loads(data)
+                        record.set_usage(chunk.get("usage"))
+                        for choice in chunk.get("choices") or []:
+                            content = (choice.get("delta") or {}).get("content")
+                            if content:
+                                yield content
+                finally:
+                    await response.aclose()
+
+    async def _prepare_inputs(
+        self, cell: Optional[LocationCell], latitude: float, longitude: float, zoom: int, image_size: int
+    ) -> tuple[dict, PreparedImage]:
         async with httpx.AsyncClient(timeout=30.0) as client:
-            geo_check_task = self._fetch_geo_check(client, latitude, longitude)
-            map_image_task = self._fetch_map_image(
-                client, latitude, longitude, zoom, image_size
+            geo_check_task = self._get_geo_check(client, cell, latitude, longitude)
+            map_image_task = self._get_map_image(
+                client, cell, latitude, longitude, zoom, image_size
             )
 
             geo_check_response, map_image_bytes = await asyncio.gather(
                 geo_check_task, map_image_task
             )
 
-        map_image_base64 = base64.b64encode(map_image_bytes).decode("utf-8")
+        map_image = prepare_image(map_image_bytes, photo=False, adaptive=settings.VISION_ADAPTIVE_DETAIL)
+        return geo_check_response.model_dump(), map_image
 
-        rule_engine_data = geo_check_response.model_dump()
+    async def analyze_parking(
+        self,
+        latitude: float,
+        longitude: float,
+        zoom: int = 17,
+        image_size: int = 512,
+        violation_id: Optional[str] = None,
+    ) -> AnalyzeParkingResponse:
+        cell = self.cache.cell(latitude, longitude) if self.cache else None
+        if cell is not None:
+            cached = await self.cache.get_analysis(cell, zoom, image_size, self.prompt_version)
+            if cached is not None:
+                logger.info(f"Parking analysis cache hit for cell {cell.key}")
+                return AnalyzeParkingResponse(**cached)
+
+        rule_engine_data, map_image = await self._prepare_inputs(
+            cell, latitude, longitude, zoom, image_size
+        )
 
         analysis_result = await self._call_openai_vision(
             rule_engine_data=rule_engine_data,
-            map_image_base64=map_image_base64,
+            map_image=map_image,
+            violation_id=violation_id,
         )
 
+        if cell is not None:
+            await self.cache.set_analysis(cell, zoom, image_size, self.prompt_version, analysis_result.model_dump())
+
         return analysis_result
+
+    async def analyze_parking_stream(
+        self,
+        latitude: float,
+        longitude: float,
+        zoom: int = 17,
+        image_size: int = 512,
+        violation_id: Optional[str] = None,
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """
+        Streaming variant of analyze_parking.
+
+        Yields (event, data) pairs:
+            field   {"field": name, "value": value} for each top-level member of
+                    the answer as soon as the model has finished writing it
+                    (isViolation comes first, then the confidence, articles,
+                    probabilityBreakdown, ...)
+            result  {"analysis": full AnalyzeParkingResponse, "timing": {...}}
+                    once the answer is complete and validated
+
+        timing holds time_to_first_verdict_ms (until isViolation was known)
+        and total_ms, both measured from the start of the call.
+        """
+        started = time.monotonic()
+        first_verdict: Optional[float] = None
+
+        def timing() -> dict:
+            total = time.monotonic() - started
+            stream_timings.observe(first_verdict, total)
+            return {
+                "time_to_first_verdict_ms": round(first_verdict * 1000) if first_verdict is not None else None,
+                "total_ms": round(total * 1000),
+            }
+
+        cell = self.cache.cell(latitude, longitude) if self.cache else None
+        if cell is not None:
+            cached = await self.cache.get_analysis(cell, zoom, image_size, self.prompt_version)
+            if cached is not None:
+                logger.info(f"Parking analysis cache hit for cell {cell.key}")
+                first_verdict = time.monotonic() - started
+                for name, value in cached.items():
+                    yield "field", {"field": name, "value": value}
+                yield "result", {"analysis": cached, "timing": {**timing(), "cached": True}}
+                return
+
+        rule_engine_data, map_image = await self._prepare_inputs(
+            cell, latitude, longitude, zoom, image_size
+        )
+
+        stream = JSONMemberStream()
+        async for delta in self._stream_openai_vision(rule_engine_data, map_image, violation_id):
+            for name, value in stream.feed(delta):
+                if name == "isViolation" and first_verdict is None:
+                    first_verdict = time.monotonic() - started
+                    logger.info(f"Parking analysis verdict after {first_verdict:.2f}s: isViolation={value}")
+                yield "field", {"field": name, "value": value}
+
+        if not stream.done:
+            raise Exception(f"Incomplete JSON in OpenAI stream: {stream.buffer[-200:]}")
+
+        analysis_result = AnalyzeParkingResponse(**stream.result())
+        if cell is not None:
+            await self.cache.set_analysis(cell, zoom, image_size, self.prompt_version, analysis_result.model_dump())
+
+        result_timing = timing()
+        logger.info(
+            f"Streamed parking analysis: first verdict {result_timing['time_to_first_verdict_ms']}ms, "
+            f"total {result_timing['total_ms']}ms"
+        )
+        yield "result", {"analysis": analysis_result.model_dump(), "timing": {**result_timing, "cached": False}}
+
+
+class StreamTimings:
+    """Running totals of streamed analysis latency, for /metrics"""
+
+    def __init__(self):
+        self.count = 0
+        self.first_verdict_seconds = 0.0
+        self.total_seconds = 0.0
+
+    def observe(self, first_verdict: Optional[float], total: float):
+        self.count += 1
+        self.first_verdict_seconds += first_verdict if first_verdict is not None else total
+        self.total_seconds += total
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP parking_analysis_stream_seconds Streamed parking analysis latency by phase",
+            "# TYPE parking_analysis_stream_seconds summary",
+        ]
+        for phase, seconds in (("first_verdict", self.first_verdict_seconds), ("total", self.total_seconds)):
+            lines.append(f'parking_analysis_stream_seconds_sum{{phase="{phase}"}} {round(seconds, 3)}')
+            lines.append(f'parking_analysis_stream_seconds_count{{phase="{phase}"}} {self.count}')
+        return "\n".join(lines) + "\n"
+
+
+stream_timings = StreamTimings()
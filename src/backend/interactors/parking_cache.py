@@ -0,0 +1,149 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+from foundation.cache import TieredCache, cache_stats
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+METERS_PER_DEGREE_LAT = 111_320.0
+
+
+@dataclass(frozen=True)
+class LocationCell:
+    """Square grid cell of PARKING_CACHE_CELL_METERS a coordinate falls into"""
+    lat_index: int
+    lon_index: int
+    latitude: float  # cell center
+    longitude: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.lat_index}:{self.lon_index}"
+
+
+def lon_step(center_lat: float, cell_meters: float) -> float:
+    # Longitude step from the cell's center latitude, so every point of a
+    # row of cells uses the same step
+    return cell_meters / (METERS_PER_DEGREE_LAT * max(math.cos(math.radians(center_lat)), 1e-6))
+
+
+def location_cell(latitude: float, longitude: float, cell_meters: float) -> LocationCell:
+    lat_step = cell_meters / METERS_PER_DEGREE_LAT
+    lat_index = math.floor(latitude / lat_step)
+    center_lat = (lat_index + 0.5) * lat_step
+
+    step = lon_step(center_lat, cell_meters)
+    lon_index = math.floor(longitude / step)
+    center_lon = (lon_index + 0.5) * step
+
+    return LocationCell(lat_index, lon_index, center_lat, center_lon)
+
+
+def prompt_version(*parts: str) -> str:
+    """Short hash of everything that shapes the model's answer (prompt text, model, ...)"""
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+class ParkingAnalysisCache:
+    """
+    Caches of the three stages of a parking analysis, keyed by location cell:
+
+        geo_check   rule-engine JSON from the geo service /api/check
+        map         rendered map PNG from /api/map, per zoom and image size
+        analysis    final AnalyzeParkingResponse JSON, per zoom, image size
+                    and prompt version, so a prompt change never serves old answers
+
+    start() runs a task that prunes expired entries from the Redis GEO
+    indexes every PARKING_CACHE_GEO_PRUNE_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        persist = settings.PARKING_CACHE_PERSIST
+        memory_ttl = settings.PARKING_CACHE_MEMORY_TTL
+        self.cell_meters = settings.PARKING_CACHE_CELL_METERS
+        self.geo_checks = TieredCache("geo_check", settings.PARKING_CACHE_RULES_TTL, memory_ttl, persist=persist)
+        # Map images are large, keep fewer of them in process memory
+        self.maps = TieredCache(
+            "map", settings.PARKING_CACHE_MAP_TTL, memory_ttl, memory_max_entries=200, persist=persist
+        )
+        self.analyses = TieredCache("analysis", settings.PARKING_CACHE_ANALYSIS_TTL, memory_ttl, persist=persist)
+        self.prune_interval = settings.PARKING_CACHE_GEO_PRUNE_INTERVAL
+        self._task: Optional[asyncio.Task] = None
+
+    def cell(self, latitude: float, longitude: float) -> LocationCell:
+        return location_cell(latitude, longitude, self.cell_meters)
+
+    async def get_geo_check(self, cell: LocationCell) -> Optional[dict]:
+        value = await self.geo_checks.get(cell.key)
+        return json.loads(value) if value is not None else None
+
+    async def set_geo_check(self, cell: LocationCell, data: dict):
+        await self.geo_checks.set(cell.key, _dump(data), cell.latitude, cell.longitude)
+
+    async def get_map(self, cell: LocationCell, zoom: int, image_size: int) -> Optional[bytes]:
+        return await self.maps.get(f"{cell.key}:{zoom}:{image_size}")
+
+    async def set_map(self, cell: LocationCell, zoom: int, image_size: int, image: bytes):
+        await self.maps.set(f"{cell.key}:{zoom}:{image_size}", image, cell.latitude, cell.longitude)
+
+    async def get_analysis(self, cell: LocationCell, zoom: int, image_size: int, version: str) -> Optional[dict]:
+        value = await self.analyses.get(f"{cell.key}:{zoom}:{image_size}:{version}")
+        return json.loads(value) if value is not None else None
+
+    async def set_analysis(self, cell: LocationCell, zoom: int, image_size: int, version: str, data: dict):
+        await self.analyses.set(f"{cell.key}:{zoom}:{image_size}:{version}", _dump(data), cell.latitude, cell.longitude)
+
+    async def invalidate_region(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> dict:
+        return {
+            cache.namespace: await cache.invalidate_region(min_lat, min_lon, max_lat, max_lon)
+            for cache in (self.geo_checks, self.maps, self.analyses)
+        }
+
+    async def prune_geo_indexes(self) -> dict:
+        return {cache.namespace: await cache.prune_geo_index() for cache in (self.geo_checks, self.maps, self.analyses)}
+
+    async def _prune_loop(self):
+        while True:
+            await asyncio.sleep(self.prune_interval)
+            try:
+                await self.prune_geo_indexes()
+            except Exception as e:
+                logger.warning(f"Cache GEO index prune failed: {e!r}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._prune_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @staticmethod
+    def stats() -> dict:
+        return cache_stats.snapshot()
+
+
+def _dump(data: dict) -> bytes:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+_cache: Optional[ParkingAnalysisCache] = None
+
+
+def get_parking_cache() -> ParkingAnalysisCache:
+    """Process-wide cache, so the in-memory tier is shared by all requests"""
+    global _cache
+    if _cache is None:
+        _cache = ParkingAnalysisCache()
+    return _cache
@@ -0,0 +1,114 @@
+import logging
+import math
+from collections import defaultdict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Must match the CRNN alphabet of the OCR service (char_probs are ordered by it)
+OCR_ALPHABET = "0123456789ABCEHIKMOPTXYZ_"
+
+# Floor for probabilities so one confident frame cannot veto a character with log(0)
+MIN_CHAR_PROB = 1e-3
+
+
+class PlateVoteAggregator:
+    """
+    Combines several OCR readings of the same car into a single plate.
+
+    Each observation is an OCR service result (``plate``, ``confidence`` and,
+    for CRNN results, ``char_probs``). Observations are grouped by plate length,
+    the dominant length wins, and inside it every position is decided by summing
+    per-character log-probabilities across observations (a product of experts).
+    Readings without ``char_probs`` contribute a one-hot distribution smoothed by
+    their overall confidence.
+    """
+
+    def __init__(self, alphabet: str = OCR_ALPHABET):
+        self.alphabet = alphabet
+
+    def aggregate(self, observations: list[dict]) -> Optional[dict]:
+        """
+        Args:
+            observations: OCR results with status "OK"
+
+        Returns:
+            dict with plate, confidence, observations and agreeing, or None
+            if there is nothing to aggregate
+        """
+        readings = [self._normalize(obs) for obs in observations]
+        readings = [r for r in readings if r is not None]
+        if not readings:
+            return None
+
+        by_length: dict[int, list[dict]] = defaultdict(list)
+        for reading in readings:
+            by_length[len(reading["plate"])].append(reading)
+
+        total_weight = sum(r["weight"] for r in readings)
+        length, group = max(
+            by_length.items(),
+            key=lambda item: sum(r["weight"] for r in item[1]),
+        )
+        length_share = sum(r["weight"] for r in group) / total_weight
+
+        chars = []
+        position_confidence = 1.0
+        for position in range(length):
+            scores = [0.0] * len(self.alphabet)
+            for reading in group:
+                dist = reading["char_probs"][position]
+                for k, p in enumerate(dist):
+                    scores[k] += reading["weight"] * math.log(max(p, MIN_CHAR_PROB))
+
+            posterior = self._softmax(scores)
+            best = max(range(len(posterior)), key=posterior.__getitem__)
+            chars.append(self.alphabet[best])
+            position_confidence *= posterior[best]
+
+        plate = "".join(chars)
+        # Agreement on the length is part of the evidence: a plate read as 8
+        # characters twice and 7 characters once is less certain than 3 x 8.
+        confidence = round(position_confidence * length_share, 4)
+        agreeing = sum(1 for r in readings if r["plate"] == plate)
+
+        logger.info(
+            f"Aggregated {len(readings)} plate readings into {plate} "
+            f"(confidence={confidence}, agreeing={agreeing})"
+        )
+        return {
+            "plate": plate,
+            "confidence": confidence,
+            "observations": len(readings),
+            "agreeing": agreeing,
+        }
+
+    def _normalize(self, observation: dict) -> Optional[dict]:
+        plate = (observation.get("plate") or "").upper().replace(" ", "")
+        if not plate or any(c not in self.alphabet for c in plate):
+            return None
+
+        confidence = float(observation.get("confidence") or 0.0)
+        weight = max(confidence, MIN_CHAR_PROB)
+
+        char_probs = observation.get("char_probs")
+        if not char_probs or len(char_probs) != len(plate) or any(
+            len(dist) != len(self.alphabet) for dist in char_probs
+        ):
+            char_probs = [self._one_hot(c, confidence) for c in plate]
+            # The confidence already lives in the smoothed distribution
+            weight = 1.0
+
+        return {"plate": plate, "weight": weight, "char_probs": char_probs}
+
+    def _one_hot(self, char: str, confidence: float) -> list[float]:
+        confidence = min(max(confidence, 1.0 / len(self.alphabet)), 1.0 - MIN_CHAR_PROB)
+        rest = (1.0 - confidence) / (len(self.alphabet) - 1)
+        return [confidence if c == char else rest for c in self.alphabet]
+
+    @staticmethod
+    def _softmax(scores: list[float]) -> list[float]:
+        top = max(scores)
+        exps = [math.exp(s - top) for s in scores]
+        total = sum(exps)
+        return [e / total for e in exps]
@@ -0,0 +1,78 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, text
+from typing import Optional
+import logging
+
+from foundation.models import Violation
+
+logger = logging.getLogger(__name__)
+
+MAX_DISTANCE = 2
+
+# pg_trgm similarity a plate keeps after this many edits, with some margin:
+# an 8-character plate with one edit shares at least ~0.45 of its trigrams,
+# with two edits ~0.2. Random plates rarely go above 0.12, so the trigram
+# index still narrows millions of rows down to a few candidates that
+# levenshtein() then checks exactly.
+SIMILARITY_THRESHOLDS = {1: 0.4, 2: 0.18}
+
+
+class PlateSearchInteractor:
+    """
+    License plate lookup that tolerates OCR noise.
+
+    Plates are compared by violations.license_plate_normalized, which
+    PostgreSQL keeps as normalize_plate(license_plate): Cyrillic look-alikes
+    folded to Latin, separators dropped and O/0, I/1, B/8 style confusions
+    folded together. The query plate goes through the same SQL function, so
+    the two sides never disagree. Remaining differences are allowed up to
+    `max_distance` edits.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def search(
+        self,
+        plate: str,
+        max_distance: int = 1,
+        limit: int = 20,
+        user_id: Optional[str] = None,
+    ) -> list[dict]:
+        """Plates within `max_distance` edits of `plate`, closest and most reported first"""
+        key = func.normalize_plate(plate)
+        normalized = Violation.license_plate_normalized
+        distance = func.levenshtein(normalized, key)
+
+        stmt = select(
+            normalized.label("normalized_plate"),
+            func.min(distance).label("distance"),
+            func.array_agg(func.distinct(Violation.license_plate)).label("plates"),
+            func.count().label("violation_count"),
+            func.min(Violation.created_at).label("first_seen_at"),
+            func.max(Violation.created_at).label("last_seen_at"),
+        )
+
+        if max_distance == 0:
+            stmt = stmt.where(normalized == key)
+        else:
+            # `%` is what the trigram GIN index serves; the threshold is per transaction
+            await self.db.execute(
+                text("SELECT set_config('pg_trgm.similarity_threshold', :threshold, true)"),
+                {"threshold": str(SIMILARITY_THRESHOLDS[max_distance])},
+            )
+            stmt = stmt.where(normalized.op("%")(key), distance <= max_distance)
+
+        if user_id is not None:
+            stmt = stmt.where(Violation.user_id == user_id)
+
+        stmt = (
+            stmt.group_by(normalized)
+            .order_by(func.min(distance), func.count().desc(), normalized)
+            .limit(limit)
+        )
+        result = await self.db.execute(stmt)
+        matches = [dict(row) for row in result.mappings().all()]
+
+        logger.info(f"Plate search '{plate}' (distance {max_distance}): {len(matches)} plates")
+        return matches
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+# One slot per second; more than the 5-minute verification timer, so a
+# timer is due the first time its slot comes round
+WHEEL_SLOTS = 512
+
+
+class TimerWheel:
+    """
+    Pushes verification timer countdowns to open timer-status streams.
+
+    Streams subscribe with their violation's expiry time and get a queue of
+    seconds remaining: a tick every `tick_interval` seconds, then 0 when the
+    timer expires. One task advances a hashed timing wheel once a second, so
+    expiring a timer costs the same however many are running, and nothing
+    here touches the database: each stream reads the violation once, when it
+    opens.
+
+    A queue holds only the latest value: a stream that falls behind skips
+    ticks, never the expiry.
+    """
+
+    def __init__(self, tick_interval: int = settings.TIMER_STREAM_TICK_SECONDS):
+        self.tick_interval = max(1, tick_interval)
+        self._slots: list[set[str]] = [set() for _ in range(WHEEL_SLOTS)]
+        self._expires: dict[str, float] = {}
+        self._slot_of: dict[str, int] = {}
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._second = math.floor(time.time())
+        self._task: Optional[asyncio.Task] = None
+        self.expired = 0
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, seconds_remaining: int):
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(seconds_remaining)
+
+    def subscribe(self, violation_id: str, expires_at: datetime) -> asyncio.Queue:
+        """Queue of seconds remaining until `expires_at` (naive UTC), ending with 0"""
+        queue: asyncio.Queue[int] = asyncio.Queue(maxsize=1)
+        if violation_id not in self._expires:
+            expires = expires_at.replace(tzinfo=timezone.utc).timestamp()
+            self._expires[violation_id] = expires
+            # Past the current second: an already due timer fires on the next advance
+            self._slot_of[violation_id] = max(math.ceil(expires), self._second + 1) % WHEEL_SLOTS
+            self._slots[self._slot_of[violation_id]].add(violation_id)
+        self._subscribers.setdefault(violation_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, violation_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(violation_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[violation_id]
+            if self._expires.pop(violation_id, None) is not None:
+                self._slots[self._slot_of.pop(violation_id)].discard(violation_id)
+
+    def advance(self, second: int):
+        """Fire the timers due up to `second` (unix time), then tick the running ones"""
+        while self._second < second:
+            self._second += 1
+            slot = self._slots[self._second % WHEEL_SLOTS]
+            for violation_id in [v for v in slot if self._expires[v] <= self._second]:
+                slot.discard(violation_id)
+                del self._expires[violation_id]
+                del self._slot_of[violation_id]
+                self.expired += 1
+                for queue in self._subscribers.get(violation_id, ()):
+                    self._offer(queue, 0)
+
+        if second % self.tick_interval == 0:
+            for violation_id, expires in self._expires.items():
+                remaining = max(1, math.ceil(expires - second))
+                for queue in self._subscribers[violation_id]:
+                    self._offer(queue, remaining)
+
+    async def _run(self):
+        while True:
+            # Sleep to the next second boundary; a late wake-up catches up on missed slots
+            await asyncio.sleep(max(0.0, self._second + 1 - time.time()))
+            self.advance(math.floor(time.time()))
+
+    def start(self):
+        if self._task is None:
+            self._second = math.floor(time.time())
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> dict:
+        return {
+            "timers": len(self._expires),
+            "streams": sum(len(queues) for queues in self._subscribers.values()),
+            "expired": self.expired,
+        }
+
+    def render_prometheus(self) -> str:
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP timer_streams Open timer-status streams",
+            "# TYPE timer_streams gauge",
+            f"timer_streams {snapshot['streams']}",
+            "# HELP timer_wheel_timers Running timers with at least one open stream",
+            "# TYPE timer_wheel_timers gauge",
+            f"timer_wheel_timers {snapshot['timers']}",
+            "# HELP timer_wheel_expired_total Timers that expired while streamed",
+            "# TYPE timer_wheel_expired_total counter",
+            f"timer_wheel_expired_total {snapshot['expired']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+_wheel: Optional[TimerWheel] = None
+
+
+def get_timer_wheel() -> TimerWheel:
+    """Process-wide wheel, shared by all streams"""
+    global _wheel
+    if _wheel is None:
+        _wheel = TimerWheel()
+    return _wheel
@@ -1,8 +1,42 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Row, select, tuple_
+from fastapi import HTTPException
+from datetime import datetime
 from typing import Optional, List
+import base64
+import binascii
 
-from foundation.models import User, Violation
+from foundation.models import User, Violation, ViolationStatus
+
+# Columns of a violations listing; everything else stays in the database
+LIST_COLUMNS = (
+    Violation.id,
+    Violation.status,
+    Violation.license_plate,
+    Violation.latitude,
+    Violation.longitude,
+    Violation.address,
+    Violation.violation_type,
+    Violation.violation_code,
+    Violation.created_at,
+    Violation.submitted_at,
+    Violation.resolved_at,
+)
+
+
+def encode_cursor(created_at: datetime, violation_id: str) -> str:
+    """Opaque cursor pointing just past a row of the (created_at, id) descending order"""
+    raw = f"{created_at.isoformat()}|{violation_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, violation_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), violation_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 class UserInteractor:
@@ -14,10 +48,48 @@ class UserInteractor:
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def get_user_violations(self, user_id: str) -> List[Violation]:
-        stmt = select(Violation).where(Violation.user_id == user_id).order_by(Violation.created_at.desc())
+    async def get_user_violations(
+        self,
+        user_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        status: Optional[List[ViolationStatus]] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> tuple[List[Row], Optional[str]]:
+        """
+        One page of a user's violations, newest first, and the cursor of the next page.
+
+        Keyset pagination over the (user_id, created_at, id) index: the cursor
+        holds the last row's (created_at, id), so every page is a short index
+        range scan no matter how deep the user pages, unlike OFFSET. Rows are
+        plain column tuples (LIST_COLUMNS), not ORM entities.
+        """
+        stmt = select(*LIST_COLUMNS).where(Violation.user_id == user_id)
+        if status:
+            stmt = stmt.where(Violation.status.in_(status))
+        if created_from is not None:
+            stmt = stmt.where(Violation.created_at >= created_from)
+        if created_to is not None:
+            stmt = stmt.where(Violation.created_at < created_to)
+        if cursor:
+            created_at, violation_id = decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(Violation.created_at, Violation.id) < tuple_(created_at, violation_id),
+                # Implied by the row comparison, but only a plain bound lets the planner skip newer partitions
+                Violation.created_at <= created_at,
+            )
+
+        # One extra row tells whether there is a next page
+        stmt = stmt.order_by(Violation.created_at.desc(), Violation.id.desc()).limit(limit + 1)
         result = await self.db.execute(stmt)
-        return list(result.scalars().all())
+        rows = list(result.all())
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+        return rows, next_cursor
 
     async def create_or_update_user(self, diia_user_id: str, email: str = None, phone: str = None, full_name: str = None) -> User:
         stmt = select(User).where(User.diia_user_id == diia_user_id)
@@ -1,13 +1,13 @@
-import base64
 import httpx
 import json
 import logging
 from pathlib import Path
 from typing import Optional
-from PIL import Image
-import io
 
 from settings import settings
+from foundation.resilience import get_breaker
+from interactors.llm_usage import llm_call
+from interactors.vision_payload import PreparedImage, prepare_image
 
 logger = logging.getLogger(__name__)
 
@@ -52,69 +52,14 @@ class VehicleAnalysisInteractor:
     def __init__(self):
         self.openai_api_key = settings.OPENAI_API_KEY
         self.openai_api_base = settings.OPENAI_API_BASE
-        self.max_image_size = 1024  # Max width/height in pixels
         self.jpeg_quality = 85  # JPEG compression quality
-
-    def _compress_image(self, image_data: bytes) -> tuple[bytes, str]:
-        """
-        Compress and resize image to reduce payload size.
-
-        Returns:
-            Tuple of (compressed_image_bytes, format)
-        """
-        try:
-            # Open image
-            img = Image.open(io.BytesIO(image_data))
-
-            # Convert to RGB if necessary (for JPEG compatibility)
-            if img.mode in ('RGBA', 'LA', 'P'):
-                # Create white background
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                if img.mode in ('RGBA', 'LA'):
-                    background.paste(img, mask=img.split()[-1])  # Use alpha channel as mask
-                    img = background
-                else:
-                    img = img.convert('RGB')
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
-
-            # Resize if too large
-            original_size = img.size
-            if max(img.size) > self.max_image_size:
-                # Calculate new size maintaining aspect ratio
-                ratio = self.max_image_size / max(img.size)
-                new_size = tuple(int(dim * ratio) for dim in img.size)
-                img = img.resize(new_size, Image.Resampling.LANCZOS)
-                logger.info(f"Resized image from {original_size} to {new_size}")
-
-            # Compress to JPEG
-            output = io.BytesIO()
-            img.save(output, format='JPEG', quality=self.jpeg_quality, optimize=True)
-            compressed_data = output.getvalue()
-
-            # Log compression stats
-            original_size_kb = len(image_data) / 1024
-            compressed_size_kb = len(compressed_data) / 1024
-            compression_ratio = (1 - compressed_size_kb / original_size_kb) * 100
-
-            logger.info(
-                f"Image compressed: {original_size_kb:.1f}KB -> {compressed_size_kb:.1f}KB "
-                f"({compression_ratio:.1f}% reduction)"
-            )
-
-            return compressed_data, "jpeg"
-
-        except Exception as e:
-            logger.warning(f"Image compression failed, using original: {e}")
-            # Return original if compression fails
-            return image_data, "jpeg"
+        self.openai_breaker = get_breaker("openai_vehicle", max_timeout=30.0)
 
     async def analyze_vehicle(
             self,
             image_data: bytes,
             filename: Optional[str] = None,
+            violation_id: Optional[str] = None,
     ) -> dict:
         """
         Analyze vehicle image to detect headlights and driver presence.
@@ -122,6 +67,7 @@ class VehicleAnalysisInteractor:
         Args:
             image_data: Raw image bytes
             filename: Optional filename for logging
+            violation_id: Violation the photo belongs to, for token accounting
 
         Returns:
             dict with keys: headlights_on, driver_present, confidence, raw_response
@@ -129,11 +75,14 @@ class VehicleAnalysisInteractor:
         # Load prompt
         prompt = load_vehicle_analysis_prompt()
 
-        # Compress image to reduce payload size
-        compressed_data, image_format = self._compress_image(image_data)
-
-        # Convert image to base64
-        image_base64 = base64.b64encode(compressed_data).decode("utf-8")
+        # Downscale to what the model looks at and pick the detail level
+        try:
+            image = prepare_image(
+                image_data, photo=True, adaptive=settings.VISION_ADAPTIVE_DETAIL, jpeg_quality=self.jpeg_quality
+            )
+        except Exception as e:
+            logger.warning(f"Image preparation failed, using original: {e}")
+            image = PreparedImage(image_data, "image/jpeg", 0, 0, "high", 0)
 
         headers = {
             "Authorization": f"Bearer {self.openai_api_key}",
@@ -143,19 +92,20 @@ class VehicleAnalysisInteractor:
         payload = {
             "model": "gpt-4.1-mini",
             "messages": [
+                # Static instructions first, so the provider can reuse them as a cached prefix
+                {"role": "system", "content": prompt},
                 {
                     "role": "user",
                     "content": [
-                        {"type": "text", "text": prompt},
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/{image_format};base64,{image_base64}",
-                                "detail": "high",
+                                "url": image.data_url(),
+                                "detail": image.detail,
                             },
                         },
                     ],
-                }
+                },
             ],
             "response_format": {"type": "json_object"},
             "temperature": 0.1,
@@ -164,18 +114,32 @@ class VehicleAnalysisInteractor:
 
         async with httpx.AsyncClient(timeout=30.0) as client:
             logger.info(f"Calling OpenAI Vision API for vehicle analysis with model: {payload['model']}")
-            response = await client.post(
-                f"{self.openai_api_base}/chat/completions",
-                headers=headers,
-                json=payload,
-            )
-
-            if response.status_code != 200:
-                error_detail = response.text
-                logger.error(f"OpenAI API error: {error_detail}")
-                raise Exception(f"OpenAI API error (status {response.status_code}): {error_detail}")
 
-            result = response.json()
+            async def send() -> httpx.Response:
+                response = await client.post(
+                    f"{self.openai_api_base}/chat/completions",
+                    headers=headers,
+                    json=payload,
+                )
+                response.raise_for_status()
+                return response
+
+            async with llm_call(
+                "vehicle_analysis",
+                payload["model"],
+                violation_id=violation_id,
+                image_detail=image.detail,
+                image_bytes=len(image.data),
+            ) as record:
+                try:
+                    response = await self.openai_breaker.call(send)
+                except httpx.HTTPStatusError as e:
+                    error_detail = e.response.text
+                    logger.error(f"OpenAI API error: {error_detail}")
+                    raise Exception(f"OpenAI API error (status {e.response.status_code}): {error_detail}")
+
+                result = response.json()
+                record.set_usage(result.get("usage"))
             logger.info(f"OpenAI response received")
 
         if not result.get("choices") or len(result["choices"]) == 0:
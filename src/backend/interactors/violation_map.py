@@ -0,0 +1,116 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, or_, select
+from typing import Optional
+import math
+import logging
+
+from foundation import geohash
+from foundation.models import Violation, ViolationStatus
+
+logger = logging.getLogger(__name__)
+
+# More points than this in the area are returned as clusters whatever the zoom
+MAX_POINTS = 500
+# From this map zoom on, areas with few enough points get individual points
+POINTS_MIN_ZOOM = 15
+
+
+def cluster_precision(zoom: int) -> int:
+    """
+    Geohash length to cluster by at a map zoom: a tile is 360/2^zoom degrees
+    wide, cells about 1/8 of that (~32px of a 256px tile) make readable
+    clusters. A geohash of length p has ceil(5p/2) longitude bits.
+    """
+    return max(1, min(geohash.PRECISION, round(2 * (zoom + 3) / 5)))
+
+
+class ViolationMapInteractor:
+    """
+    Violations inside a bounding box or radius, via the geohash B-tree index.
+
+    The area is covered by up to 32 geohash cells; each becomes a range
+    condition on ix_violations_geohash (adjacent ranges merged) and the
+    exact box / distance is checked on the latitude / longitude the index
+    includes. Below POINTS_MIN_ZOOM, or with more than MAX_POINTS
+    violations, rows are grouped by geohash prefix in SQL and only counts
+    and centroids leave the database.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _area_filter(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        center: Optional[tuple[float, float, float]],
+    ) -> list:
+        cells = geohash.bbox_cells(min_lat, min_lon, max_lat, max_lon)
+        conditions = [
+            or_(*(and_(Violation.geohash >= low, Violation.geohash < high) for low, high in geohash.cell_ranges(cells))),
+            Violation.latitude.between(min_lat, max_lat),
+            Violation.longitude.between(min_lon, max_lon),
+        ]
+        if center is not None:
+            # Equirectangular distance: exact enough at city scale and cheap per row
+            lat, lon, radius = center
+            dy = (Violation.latitude - lat) * geohash.METERS_PER_DEGREE
+            dx = (Violation.longitude - lon) * (geohash.METERS_PER_DEGREE * math.cos(math.radians(lat)))
+            conditions.append(dx * dx + dy * dy <= radius * radius)
+        return conditions
+
+    async def query_area(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        zoom: int,
+        user_id: Optional[str] = None,
+        status: Optional[list[ViolationStatus]] = None,
+        center: Optional[tuple[float, float, float]] = None,
+    ) -> dict:
+        """
+        Points or clusters inside the box (and within `center` = (lat, lon,
+        radius_meters) if given), of one user's violations or all of them.
+        """
+        conditions = self._area_filter(min_lat, min_lon, max_lat, max_lon, center)
+        if user_id is not None:
+            conditions.append(Violation.user_id == user_id)
+        if status:
+            conditions.append(Violation.status.in_(status))
+
+        if zoom >= POINTS_MIN_ZOOM:
+            result = await self.db.execute(
+                select(
+                    Violation.id,
+                    Violation.status,
+                    Violation.latitude,
+                    Violation.longitude,
+                    Violation.created_at,
+                    Violation.duplicate_of_id,
+                )
+                .where(*conditions)
+                .limit(MAX_POINTS + 1)
+            )
+            points = result.all()
+            if len(points) <= MAX_POINTS:
+                return {"clustered": False, "points": points, "clusters": []}
+
+        precision = cluster_precision(zoom)
+        cell = func.substr(Violation.geohash, 1, precision)
+        result = await self.db.execute(
+            select(
+                cell.label("geohash"),
+                func.count().label("count"),
+                func.avg(Violation.latitude).label("latitude"),
+                func.avg(Violation.longitude).label("longitude"),
+            )
+            .where(*conditions)
+            .group_by(cell)
+        )
+        clusters = result.all()
+        logger.debug(f"Area query at zoom {zoom}: {len(clusters)} clusters of geohash length {precision}")
+        return {"clustered": True, "points": [], "clusters": clusters}
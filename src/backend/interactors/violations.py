@@ -1,28 +1,42 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import exists, select
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.exc import StaleDataError
 from fastapi import UploadFile, HTTPException
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 import uuid
 import logging
 
-from foundation.models import Violation, Photo, ViolationStatusHistory, ViolationStatus, PhotoType
+from foundation import geohash
+from foundation.database import release_connection
+from foundation.ids import uuid7
+from foundation.models import Violation, Photo, ViolationStatusHistory, ViolationStatus, PhotoType, PHOTO_OCR_OK, violation_key
 from interactors.ocr import OCRInteractor
 from interactors.ocr_service import OCRServiceClient
+from interactors.plate_aggregation import PlateVoteAggregator
+from interactors.duplicates import DuplicateDetector
+from interactors.heatmap import HeatmapInteractor
 from interactors.geocoding import GeocodingInteractor
 from interactors.storage import StorageInteractor
 from settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Attempts to write a result computed outside the transaction before giving up
+OPTIMISTIC_RETRIES = 3
+
 
 class ViolationInteractor:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.ocr = OCRInteractor(db)
         self.ocr_service = OCRServiceClient()
+        self.plate_aggregator = PlateVoteAggregator()
         self.geocoding = GeocodingInteractor(db)
         self.storage = StorageInteractor(db)
+        self.duplicates = DuplicateDetector(db) if settings.DUPLICATE_DETECTION_ENABLED else None
+        self.heatmap = HeatmapInteractor(db) if settings.HEATMAP_ENABLED else None
 
     async def create_violation(
         self,
@@ -33,14 +47,17 @@ class ViolationInteractor:
     ) -> Violation:
         address = await self.geocoding.reverse_geocode(latitude, longitude)
 
+        now = datetime.utcnow()
         violation = Violation(
-            id=str(uuid.uuid4()),
+            id=uuid7(now),
             user_id=user_id,
             status=ViolationStatus.DRAFT,
             latitude=latitude,
             longitude=longitude,
+            geohash=geohash.encode(latitude, longitude),
             address=address.get("formatted_address") if address else None,
             notes=notes,
+            created_at=now,
         )
 
         self.db.add(violation)
@@ -51,13 +68,31 @@ class ViolationInteractor:
         logger.info(f"Created violation {violation.id} for user {user_id}")
         return violation
 
-    async def get_violation(self, violation_id: str, user_id: str) -> Optional[Violation]:
+    async def get_violation(
+        self,
+        violation_id: str,
+        user_id: str,
+        photos: bool = False,
+        history: bool = False,
+    ) -> Optional[Violation]:
+        """
+        Load a violation, optionally with its photos and status history.
+
+        Relationships are lazy and cannot be loaded implicitly in async code,
+        so callers that read them ask for them here: photos are joined into
+        the same query, history (if asked for too) comes in one more SELECT
+        ... IN rather than multiplying the joined rows.
+        """
         stmt = select(Violation).where(
-            Violation.id == violation_id,
+            *violation_key(violation_id),
             Violation.user_id == user_id,
         )
+        if photos:
+            stmt = stmt.options(joinedload(Violation.photos))
+        if history:
+            stmt = stmt.options(selectinload(Violation.status_history))
         result = await self.db.execute(stmt)
-        violation = result.scalar_one_or_none()
+        violation = result.unique().scalar_one_or_none()
         return violation
 
     async def update_violation(
@@ -114,6 +149,14 @@ class ViolationInteractor:
 
         file_data = await file.read()
 
+        run_ocr = photo_type in ("initial", "verification")
+        previous_results = await self._get_plate_observations(violation_id) if run_ocr else []
+
+        # Storage upload and OCR can take tens of seconds, don't hold a pooled
+        # connection meanwhile. Changes made to the violation in the gap are
+        # caught by its version_id when the result is written.
+        await release_connection(self.db)
+
         storage_result = await self.storage.upload_file(
             file_data=file_data,
             file_name=file.filename,
@@ -121,6 +164,26 @@ class ViolationInteractor:
             folder=f"violations/{violation_id}",
         )
 
+        ocr_result = None
+        if run_ocr:
+            ocr_result = await self.ocr_service.detect_from_file(
+                file_data,
+                file.filename,
+                known_hashes=[r["crop_hash"] for r in previous_results if r.get("crop_hash")],
+            )
+            if ocr_result.get("status") == "ERROR" and photo_type == "initial":
+                if ocr_result.get("unavailable"):
+                    # OCR circuit is open - fail fast instead of rejecting the photo
+                    raise HTTPException(
+                        status_code=503,
+                        detail=ocr_result.get("message"),
+                        headers={"Retry-After": str(max(1, ocr_result.get("retry_after", 1)))},
+                    )
+                raise HTTPException(
+                    status_code=400,
+                    detail=ocr_result.get("message", "OCR detection failed")
+                )
+
         photo = Photo(
             id=str(uuid.uuid4()),
             violation_id=violation_id,
@@ -132,35 +195,60 @@ class ViolationInteractor:
             uploaded_at=datetime.utcnow(),
         )
 
-        if photo_type == "initial":
-            ocr_result = await self.ocr_service.detect_from_file(file_data, file.filename)
-            if ocr_result and ocr_result.get("status") == "OK":
-                photo.ocr_results = ocr_result
-                violation.license_plate = ocr_result.get("plate")
-                violation.license_plate_confidence = ocr_result.get("confidence")
-
-                if violation.status == ViolationStatus.DRAFT:
-                    await self._update_status(violation, ViolationStatus.PENDING_VERIFICATION)
-            elif ocr_result and ocr_result.get("status") == "ERROR":
-                raise HTTPException(
-                    status_code=400,
-                    detail=ocr_result.get("message", "OCR detection failed")
-                )
+        async def save(current: Violation, retry: bool):
+            if ocr_result is not None:
+                # Another photo may have been recognised meanwhile, vote with it too
+                observations = await self._get_plate_observations(violation_id) if retry else previous_results
+                await self._apply_ocr_result(current, photo, ocr_result, observations)
+            self.db.add(photo)
 
-        self.db.add(photo)
-        await self.db.commit()
+        await self._commit_with_retry(violation, save)
         await self.db.refresh(photo)
 
         logger.info(f"Uploaded photo {photo.id} for violation {violation_id}")
         return photo
 
+    async def _apply_ocr_result(
+        self,
+        violation: Violation,
+        photo: Photo,
+        ocr_result: dict,
+        previous_results: list[dict],
+    ):
+        ocr_status = ocr_result.get("status")
+
+        if ocr_status == "OK":
+            aggregated = self.plate_aggregator.aggregate(previous_results + [ocr_result])
+            if aggregated:
+                plate, confidence = aggregated["plate"], aggregated["confidence"]
+            else:
+                plate, confidence = ocr_result.get("plate"), ocr_result.get("confidence")
+
+            case_id = None
+            if self.duplicates is not None and violation.duplicate_of_id is None:
+                # Query before changing anything, autoflush would write the changes
+                # outside the version_id retry in _commit_with_retry
+                case_id = await self.duplicates.find_case(violation, plate)
+
+            photo.ocr_results = ocr_result
+            violation.license_plate = plate
+            violation.license_plate_confidence = confidence
+            if case_id is not None:
+                violation.duplicate_of_id = case_id
+
+            if violation.status == ViolationStatus.DRAFT:
+                await self._update_status(violation, ViolationStatus.PENDING_VERIFICATION)
+        elif ocr_status == "SKIPPED":
+            # Same plate view as an already recognised photo - nothing new to vote with
+            photo.ocr_results = ocr_result
+
     async def verify_violation(
         self,
         violation_id: str,
         user_id: str,
         verification_photo: UploadFile,
     ) -> dict:
-        violation = await self.get_violation(violation_id, user_id)
+        violation = await self.get_violation(violation_id, user_id, photos=True)
         if not violation:
             raise HTTPException(status_code=404, detail="Violation not found")
 
@@ -170,12 +258,7 @@ class ViolationInteractor:
                 detail="Violation is not in pending verification status",
             )
 
-        initial_photo_stmt = select(Photo).where(
-            Photo.violation_id == violation_id,
-            Photo.photo_type == PhotoType.INITIAL,
-        )
-        result = await self.db.execute(initial_photo_stmt)
-        initial_photo = result.scalar_one_or_none()
+        initial_photo = next((p for p in violation.photos if p.photo_type == PhotoType.INITIAL), None)
 
         if not initial_photo:
             raise HTTPException(status_code=400, detail="Initial photo not found")
@@ -196,10 +279,12 @@ class ViolationInteractor:
             photo_type="verification",
         )
 
-        violation.verification_time_seconds = int(time_diff)
-        violation.verified_at = datetime.utcnow()
-        await self._update_status(violation, ViolationStatus.VERIFIED)
-        await self.db.commit()
+        async def mark_verified(current: Violation, retry: bool):
+            current.verification_time_seconds = int(time_diff)
+            current.verified_at = datetime.utcnow()
+            await self._update_status(current, ViolationStatus.VERIFIED)
+
+        await self._commit_with_retry(violation, mark_verified)
 
         logger.info(f"Verified violation {violation_id}")
         return {
@@ -209,14 +294,10 @@ class ViolationInteractor:
         }
 
     async def get_evidence_package(self, violation_id: str, user_id: str) -> dict:
-        violation = await self.get_violation(violation_id, user_id)
+        violation = await self.get_violation(violation_id, user_id, photos=True)
         if not violation:
             return None
 
-        photos_stmt = select(Photo).where(Photo.violation_id == violation_id)
-        photos_result = await self.db.execute(photos_stmt)
-        photos = photos_result.scalars().all()
-
         return {
             "violation_id": violation.id,
             "license_plate": violation.license_plate,
@@ -232,7 +313,7 @@ class ViolationInteractor:
                     "url": photo.storage_url,
                     "captured_at": photo.captured_at,
                 }
-                for photo in photos
+                for photo in violation.photos
             ],
             "violations": violation.violations or [],  # Include all violations
             "verification_time_seconds": violation.verification_time_seconds,
@@ -260,6 +341,8 @@ class ViolationInteractor:
 
         file_data = await file.read()
 
+        await release_connection(self.db)
+
         storage_result = await self.storage.upload_file(
             file_data=file_data,
             file_name=file.filename,
@@ -278,10 +361,11 @@ class ViolationInteractor:
             uploaded_at=datetime.utcnow(),
         )
 
-        violation.has_road_sign_photo = True
+        async def save(current: Violation, retry: bool):
+            current.has_road_sign_photo = True
+            self.db.add(photo)
 
-        self.db.add(photo)
-        await self.db.commit()
+        await self._commit_with_retry(violation, save)
         await self.db.refresh(photo)
 
         logger.info(f"Uploaded road sign photo {photo.id} for violation {violation_id}")
@@ -347,14 +431,12 @@ class ViolationInteractor:
         if not violation:
             raise HTTPException(status_code=404, detail="Violation not found")
 
-        photos_stmt = select(Photo).where(
+        has_plate = await self.db.scalar(select(exists().where(
             Photo.violation_id == violation_id,
             Photo.photo_type == PhotoType.INITIAL,
-        )
-        photos_result = await self.db.execute(photos_stmt)
-        initial_photos = photos_result.scalars().all()
-
-        if not any(p.ocr_results and p.ocr_results.get("status") == "OK" for p in initial_photos):
+            PHOTO_OCR_OK,
+        )))
+        if not has_plate:
             raise HTTPException(
                 status_code=400,
                 detail="Must have at least one photo with successful OCR detection",
@@ -450,7 +532,13 @@ class ViolationInteractor:
                 detail="Violation must be verified before submission",
             )
 
-        violation.police_case_number = f"PC-{uuid.uuid4().hex[:8].upper()}"
+        # A duplicate report joins the police case already opened for its car and place
+        case_number = None
+        if violation.duplicate_of_id:
+            case_number = await self.db.scalar(
+                select(Violation.police_case_number).where(*violation_key(violation.duplicate_of_id))
+            )
+        violation.police_case_number = case_number or f"PC-{uuid.uuid4().hex[:8].upper()}"
         violation.submitted_at = datetime.utcnow()
         await self._update_status(violation, ViolationStatus.SUBMITTED)
         await self.db.commit()
@@ -464,10 +552,69 @@ class ViolationInteractor:
             "message": "Violation successfully submitted to police",
         }
 
+    async def get_case_location(self, violation: Violation) -> tuple[Optional[float], Optional[float]]:
+        """
+        Coordinates to analyse a violation at. A duplicate report uses its
+        case's, so its parking analysis is served from the case's cached one
+        instead of calling the geo service and OpenAI again.
+        """
+        if violation.duplicate_of_id:
+            result = await self.db.execute(
+                select(Violation.latitude, Violation.longitude).where(*violation_key(violation.duplicate_of_id))
+            )
+            row = result.one_or_none()
+            if row is not None and row.latitude is not None and row.longitude is not None:
+                return row.latitude, row.longitude
+        return violation.latitude, violation.longitude
+
+    async def _commit_with_retry(
+        self,
+        violation: Violation,
+        apply: Callable[[Violation, bool], Awaitable[None]],
+    ) -> Violation:
+        """
+        Apply changes computed outside a transaction and commit them.
+
+        If the violation was modified since it was read (version_id mismatch),
+        the changes are rolled back, the violation is re-read and `apply` runs
+        again with retry=True, up to OPTIMISTIC_RETRIES times.
+        """
+        violation_id = violation.id
+        for attempt in range(1, OPTIMISTIC_RETRIES + 1):
+            await apply(violation, attempt > 1)
+            try:
+                await self.db.commit()
+                return violation
+            except StaleDataError:
+                await self.db.rollback()
+                logger.warning(f"Violation {violation_id} was modified concurrently ({attempt}/{OPTIMISTIC_RETRIES})")
+
+            stmt = select(Violation).where(*violation_key(violation_id)).execution_options(populate_existing=True)
+            result = await self.db.execute(stmt)
+            violation = result.scalar_one_or_none()
+            if not violation:
+                raise HTTPException(status_code=404, detail="Violation not found")
+
+        raise HTTPException(
+            status_code=409,
+            detail="Violation was modified concurrently, please retry",
+        )
+
+    async def _get_plate_observations(self, violation_id: str) -> list[dict]:
+        stmt = select(Photo.ocr_results).where(
+            Photo.violation_id == violation_id,
+            Photo.photo_type.in_([PhotoType.INITIAL, PhotoType.VERIFICATION]),
+            PHOTO_OCR_OK,
+        )
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
+
     async def _update_status(self, violation: Violation, new_status: ViolationStatus):
         old_status = violation.status
         violation.status = new_status
         await self._add_status_history(violation, old_status, new_status)
+        if new_status == ViolationStatus.SUBMITTED and old_status != ViolationStatus.SUBMITTED and self.heatmap:
+            await self.heatmap.record(violation)
 
     async def _add_status_history(
         self,
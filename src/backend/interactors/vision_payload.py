@@ -0,0 +1,125 @@
+import base64
+import io
+import json
+import logging
+import math
+from dataclasses import dataclass
+
+from PIL import Image, ImageStat
+
+logger = logging.getLogger(__name__)
+
+# How OpenAI vision models see images: "low" detail is one 512px thumbnail
+# for a flat 85 tokens; "high" detail scales the image to fit 2048px with
+# the shortest side at most 768px and adds 170 tokens per 512px tile.
+LOW_DETAIL_SIDE = 512
+HIGH_DETAIL_MAX_SIDE = 2048
+HIGH_DETAIL_SHORT_SIDE = 768
+BASE_IMAGE_TOKENS = 85
+TILE_TOKENS = 170
+
+# Grayscale standard deviation below which a rendered map carries too
+# little detail (open field, water) for high detail to help
+FLAT_IMAGE_STDDEV = 12.0
+
+
+@dataclass
+class PreparedImage:
+    data: bytes
+    mime_type: str
+    width: int
+    height: int
+    detail: str
+    estimated_tokens: int
+
+    def data_url(self) -> str:
+        return f"data:{self.mime_type};base64,{base64.b64encode(self.data).decode('utf-8')}"
+
+
+def compact_json(data) -> str:
+    """JSON for prompts: no indentation or spaces, Cyrillic kept as is (fewer tokens than \\u escapes)"""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _high_detail_scale(width: int, height: int) -> float:
+    scale = min(1.0, HIGH_DETAIL_MAX_SIDE / max(width, height))
+    return scale * min(1.0, HIGH_DETAIL_SHORT_SIDE / (min(width, height) * scale))
+
+
+def image_tokens(width: int, height: int, detail: str) -> int:
+    if detail == "low":
+        return BASE_IMAGE_TOKENS
+    scale = _high_detail_scale(width, height)
+    tiles = math.ceil(width * scale / 512) * math.ceil(height * scale / 512)
+    return BASE_IMAGE_TOKENS + TILE_TOKENS * tiles
+
+
+def prepare_image(image_data: bytes, photo: bool, adaptive: bool = True, jpeg_quality: int = 85) -> PreparedImage:
+    """
+    Resize an image to what the vision model actually looks at and pick its detail level.
+
+    - Photos larger than the provider's high-detail size are downscaled to
+      it and re-encoded as JPEG (same tokens, smaller upload). Rendered maps
+      are sent as is, re-encoding a resized PNG makes it larger, not smaller.
+    - Fits into one 512px thumbnail: "low" detail sees exactly the same
+      pixels for 85 tokens instead of 255.
+    - Nearly uniform map: "low" detail, more tiles add nothing. Photos are
+      exempt, a dark night shot is exactly where headlights need detail.
+    - Otherwise "high" detail.
+
+    Args:
+        image_data: Encoded image bytes
+        photo: Camera photo (True) or rendered graphics (False)
+        adaptive: Pick the detail level from size and content; False always sends "high"
+    """
+    img = Image.open(io.BytesIO(image_data))
+    img.load()
+    original_size = img.size
+    if not photo:
+        return _prepare_graphics(image_data, img, adaptive)
+
+    if img.mode in ("RGBA", "LA", "P"):
+        # Flatten transparency onto white
+        rgba = img.convert("RGBA")
+        img = Image.new("RGB", rgba.size, (255, 255, 255))
+        img.paste(rgba, mask=rgba.split()[-1])
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+
+    # Anything larger than high detail keeps is downscaled on the provider side anyway
+    scale = _high_detail_scale(*img.size)
+    target = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    if target != img.size:
+        img = img.resize(target, Image.Resampling.LANCZOS)
+
+    width, height = img.size
+    detail = "low" if adaptive and max(width, height) <= LOW_DETAIL_SIDE else "high"
+
+    output = io.BytesIO()
+    img.save(output, format="JPEG", quality=jpeg_quality, optimize=True)
+    data = output.getvalue()
+
+    prepared = PreparedImage(data, "image/jpeg", width, height, detail, image_tokens(width, height, detail))
+    logger.info(
+        f"Prepared photo {original_size} -> {width}x{height}, "
+        f"{len(image_data) / 1024:.1f}KB -> {len(data) / 1024:.1f}KB, "
+        f"detail={detail} (~{prepared.estimated_tokens} tokens)"
+    )
+    return prepared
+
+
+def _prepare_graphics(image_data: bytes, img: Image.Image, adaptive: bool) -> PreparedImage:
+    width, height = img.size
+    stddev = ImageStat.Stat(img.convert("L")).stddev[0]
+    if adaptive and (max(width, height) <= LOW_DETAIL_SIDE or stddev < FLAT_IMAGE_STDDEV):
+        detail = "low"
+    else:
+        detail = "high"
+
+    mime_type = Image.MIME.get(img.format or "PNG", "image/png")
+    prepared = PreparedImage(image_data, mime_type, width, height, detail, image_tokens(width, height, detail))
+    logger.info(
+        f"Prepared map {width}x{height} {mime_type}, {len(image_data) / 1024:.1f}KB, "
+        f"detail={detail} (~{prepared.estimated_tokens} tokens, stddev {stddev:.1f})"
+    )
+    return prepared
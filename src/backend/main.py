@@ -15,7 +15,15 @@ from routes.health import router as health_router
 from routes.reports import router as reports_router
 from routes.parking_analysis import router as parking_analysis_router
 from routes.auth import router as auth_router
-from foundation.middleware import RequestResponseLoggingMiddleware
+from routes.analytics import router as analytics_router
+from foundation.middleware import AuditMiddleware, ReadYourWritesMiddleware, RequestResponseLoggingMiddleware
+from foundation.audit import get_audit_writer
+from foundation.replica import get_replica_monitor
+from interactors.ocr_service import OCRServiceClient
+from interactors.geo_grid import get_geo_grid
+from interactors.timer_wheel import get_timer_wheel
+from interactors.parking_cache import get_parking_cache
+from foundation.partitions import ensure_partitions
 
 logging.basicConfig(
     level=logging.INFO if not settings.DEBUG else logging.DEBUG,
@@ -43,6 +51,12 @@ app.add_middleware(
 
 app.add_middleware(RequestResponseLoggingMiddleware)
 
+if settings.AUDIT_LOG_ENABLED:
+    app.add_middleware(AuditMiddleware)
+
+if settings.DATABASE_READ_URL:
+    app.add_middleware(ReadYourWritesMiddleware)
+
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -65,6 +79,7 @@ app.include_router(ocr_router, prefix="/api/v1/ocr", tags=["OCR"])
 app.include_router(geocoding_router, prefix="/api/v1/geocoding", tags=["Geocoding"])
 app.include_router(reports_router, prefix="/api/v1/reports", tags=["Reports"])
 app.include_router(parking_analysis_router, prefix="/api/v1/parking-analysis", tags=["Parking Analysis"])
+app.include_router(analytics_router, prefix="/api/v1/analytics", tags=["Analytics"])
 
 local_storage_path = Path("local_storage")
 local_storage_path.mkdir(exist_ok=True)
@@ -80,11 +95,30 @@ async def startup_event():
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Debug mode: {settings.DEBUG}")
+    try:
+        await ensure_partitions()
+    except Exception as e:
+        logger.warning(f"Could not create upcoming table partitions: {e!r}")
+    OCRServiceClient().replica_pool.start()
+    if settings.AUDIT_LOG_ENABLED:
+        get_audit_writer().start()
+    get_replica_monitor().start()
+    get_timer_wheel().start()
+    if settings.GEO_GRID_ENABLED:
+        get_geo_grid().start()
+    if settings.PARKING_CACHE_ENABLED and settings.CACHE_REDIS_ENABLED:
+        get_parking_cache().start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down application")
+    await get_audit_writer().stop()
+    await get_replica_monitor().stop()
+    await get_timer_wheel().stop()
+    await OCRServiceClient.aclose()
+    await get_geo_grid().stop()
+    await get_parking_cache().stop()
 
 
 if __name__ == "__main__":
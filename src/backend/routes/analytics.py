@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import hashlib
+import json
+import logging
+import struct
+
+from foundation import tiles
+from foundation.database import get_db
+from interactors.heatmap import HeatmapInteractor
+from settings import settings
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def encode_tile(zoom: int, x: int, y: int, bins: list[tuple[int, int, int]], tile_format: str) -> tuple[bytes, str]:
+    """
+    Tile body and media type.
+
+    json: {"z", "x", "y", "size": 32, "max": <largest count>, "bins": [[column, row, count], ...]}
+    bin: 6 bytes per non-empty bin, little-endian uint16 row * 32 + column
+         then uint32 count
+    """
+    if tile_format == "bin":
+        body = b"".join(struct.pack("<HI", row * tiles.BINS + column, count) for column, row, count in bins)
+        return body, "application/octet-stream"
+    body = json.dumps(
+        {
+            "z": zoom,
+            "x": x,
+            "y": y,
+            "size": tiles.BINS,
+            "max": max((count for _, _, count in bins), default=0),
+            "bins": [list(b) for b in bins],
+        },
+        separators=(",", ":"),
+    )
+    return body.encode(), "application/json"
+
+
+@router.get("/tiles/{z}/{x}/{y}")
+async def get_heatmap_tile(
+    z: int,
+    x: int,
+    y: int,
+    tile_format: str = Query(default="json", alias="format", pattern="^(json|bin)$"),
+    if_none_match: Optional[str] = Header(default=None),
+    x_admin_key: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Violation counts of a Web Mercator tile in 32x32 bins, for city operators.
+    Served from precomputed counts; clients revalidate with the ETag.
+    """
+    if not settings.ADMIN_API_KEY or x_admin_key != settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin key")
+    if not settings.HEATMAP_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Heatmap is disabled")
+    if not settings.HEATMAP_MIN_ZOOM <= z <= settings.HEATMAP_MAX_ZOOM:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Zoom must be between {settings.HEATMAP_MIN_ZOOM} and {settings.HEATMAP_MAX_ZOOM}",
+        )
+    if not tiles.is_valid_tile(z, x, y):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tile not found")
+
+    bins = await HeatmapInteractor(db).get_tile(z, x, y)
+    body, media_type = encode_tile(z, x, y, bins, tile_format)
+
+    headers = {
+        "Cache-Control": f"private, max-age={settings.HEATMAP_TILE_MAX_AGE_SECONDS}",
+        "ETag": f'"{hashlib.sha1(body).hexdigest()[:20]}"',
+    }
+    if if_none_match and headers["ETag"] in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from datetime import datetime
@@ -6,8 +7,17 @@ import httpx
 import redis.asyncio as redis
 import logging
 
-from foundation.database import get_db
+from foundation.database import get_db, pool_status
 from foundation.schemas import HealthCheckResponse, ExternalServiceHealthResponse
+from foundation.resilience import breaker_snapshots, render_prometheus
+from foundation.cache import cache_stats
+from foundation.audit import get_audit_writer
+from foundation.replica import get_replica_monitor
+from interactors.ocr_replicas import replica_pools
+from interactors.geo_grid import get_geo_grid
+from interactors.timer_wheel import get_timer_wheel
+from interactors.parking_analysis import stream_timings
+from interactors.llm_usage import llm_usage_stats
 from settings import settings
 
 router = APIRouter()
@@ -96,3 +106,61 @@ async def ocr_health_check():
         service_response=service_response,
         timestamp=datetime.utcnow(),
     )
+
+
+@router.get("/health/upstreams")
+async def upstreams_health_check():
+    """Circuit breaker state, adaptive timeout and latency percentiles per upstream"""
+    breakers = breaker_snapshots()
+    return {
+        "status": "degraded" if any(b["state"] != "closed" for b in breakers) else "healthy",
+        "upstreams": breakers,
+        "timestamp": datetime.utcnow(),
+    }
+
+
+@router.get("/health/ocr/replicas")
+async def ocr_replicas_health_check():
+    """Rotation state, in-flight requests and latency of every OCR replica"""
+    replicas = [replica for pool in replica_pools() for replica in pool.snapshot()]
+    available = sum(1 for r in replicas if r["healthy"] and not r["ejected"] and r["circuit"] == "closed")
+    return {
+        "status": "healthy" if available == len(replicas) else "degraded" if available else "unhealthy",
+        "replicas": replicas,
+        "timestamp": datetime.utcnow(),
+    }
+
+
+@router.get("/health/replica")
+async def replica_health_check():
+    """Replication lag of the read replica and where read-only requests went"""
+    if not settings.DATABASE_READ_URL:
+        return {"status": "disabled", "timestamp": datetime.utcnow()}
+    replica = get_replica_monitor().snapshot()
+    return {
+        "status": "healthy" if replica["healthy"] else "degraded",
+        "replica": replica,
+        "timestamp": datetime.utcnow(),
+    }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Upstream circuit breaker, OCR replica, cache, geo grid, analysis streaming, LLM usage, audit writer, DB pool, replica and timer stream metrics in Prometheus text format"""
+    db_pool = pool_status()
+    lines = [
+        "# HELP db_pool_connections Database connection pool state",
+        "# TYPE db_pool_connections gauge",
+    ] + [f'db_pool_connections{{state="{state}"}} {value}' for state, value in db_pool.items()]
+    return (
+        render_prometheus()
+        + "".join(pool.render_prometheus() for pool in replica_pools())
+        + cache_stats.render_prometheus()
+        + (get_geo_grid().render_prometheus() if settings.GEO_GRID_ENABLED else "")
+        + stream_timings.render_prometheus()
+        + llm_usage_stats.render_prometheus()
+        + (get_audit_writer().render_prometheus() if settings.AUDIT_LOG_ENABLED else "")
+        + get_replica_monitor().render_prometheus()
+        + get_timer_wheel().render_prometheus()
+        + "\n".join(lines) + "\n"
+    )
@@ -1,12 +1,22 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
 import logging
 
 from foundation.schemas import AnalyzeParkingRequest, AnalyzeParkingResponse
-from foundation.database import get_db
+from foundation.database import get_db, release_connection
 from interactors.parking_analysis import ParkingAnalysisInteractor
 from interactors.violations import ViolationInteractor
 from interactors.auth import get_current_user
+from foundation.resilience import CircuitOpenError
+from foundation.sse import sse_event
+from interactors.parking_cache import get_parking_cache
+from interactors.geo_grid import get_geo_grid, invalidate_cells
+from interactors.llm_usage import usage_report
+from settings import settings
 
 logger = logging.getLogger(__name__)
 
@@ -37,21 +47,188 @@ async def analyze_parking(
                 detail="Violation does not have location coordinates"
             )
 
+        latitude, longitude = await violation_interactor.get_case_location(violation)
+
+        # Geo service and OpenAI take up to a minute, give the connection back meanwhile
+        await release_connection(db)
+
         parking_interactor = ParkingAnalysisInteractor()
         result = await parking_interactor.analyze_parking(
-            latitude=violation.latitude,
-            longitude=violation.longitude,
+            latitude=latitude,
+            longitude=longitude,
             zoom=request.zoom,
             image_size=request.image_size,
+            violation_id=request.violation_id,
         )
 
         return result
 
     except HTTPException:
         raise
+    except CircuitOpenError as e:
+        logger.warning(f"Parking analysis failed fast: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Parking analysis is temporarily unavailable, please try again later",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))},
+        )
+    except asyncio.TimeoutError:
+        logger.error("Parking analysis upstream timed out")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Parking analysis timed out, please try again later",
+        )
     except Exception as e:
         logger.error(f"Error analyzing parking: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to analyze parking: {str(e)}",
         )
+
+
+@router.post("/analyze/stream")
+async def analyze_parking_stream(
+    request: AnalyzeParkingRequest,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Same analysis as /analyze, streamed as Server-Sent Events.
+
+    `field` events carry each part of the answer as soon as the model has
+    written it (isViolation first), a final `result` event the complete
+    validated analysis with time_to_first_verdict_ms and total_ms. Failures
+    after the stream started arrive as an `error` event with the HTTP status
+    /analyze would have returned.
+    """
+    violation_interactor = ViolationInteractor(db)
+    violation = await violation_interactor.get_violation(
+        request.violation_id, current_user["id"]
+    )
+
+    if not violation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Violation not found"
+        )
+
+    if violation.latitude is None or violation.longitude is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Violation does not have location coordinates"
+        )
+
+    latitude, longitude = await violation_interactor.get_case_location(violation)
+    await release_connection(db)
+
+    async def events():
+        parking_interactor = ParkingAnalysisInteractor()
+        try:
+            async for event, data in parking_interactor.analyze_parking_stream(
+                latitude=latitude,
+                longitude=longitude,
+                zoom=request.zoom,
+                image_size=request.image_size,
+                violation_id=request.violation_id,
+            ):
+                yield sse_event(event, data)
+        except CircuitOpenError as e:
+            logger.warning(f"Parking analysis stream failed fast: {e}")
+            yield sse_event("error", {
+                "status": status.HTTP_503_SERVICE_UNAVAILABLE,
+                "detail": "Parking analysis is temporarily unavailable, please try again later",
+                "retry_after": max(1, round(e.retry_after)),
+            })
+        except asyncio.TimeoutError:
+            logger.error("Parking analysis stream upstream timed out")
+            yield sse_event("error", {
+                "status": status.HTTP_504_GATEWAY_TIMEOUT,
+                "detail": "Parking analysis timed out, please try again later",
+            })
+        except Exception as e:
+            logger.error(f"Error streaming parking analysis: {e}", exc_info=True)
+            yield sse_event("error", {
+                "status": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "detail": f"Failed to analyze parking: {str(e)}",
+            })
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/map")
+async def get_map_image(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    zoom: int = Query(default=17, ge=0, le=19),
+    image_size: int = Query(default=512, ge=128, le=2048),
+    current_user: dict = Depends(get_current_user),
+):
+    """Rendered static map around a point, served straight from the on-disk map cache"""
+    if not settings.MAP_CACHE_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Map cache is disabled")
+
+    try:
+        path = await ParkingAnalysisInteractor().get_map_path(latitude, longitude, zoom, image_size)
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Map rendering is temporarily unavailable, please try again later",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))},
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Map rendering timed out")
+
+    return FileResponse(path, media_type="image/png", headers={"Cache-Control": "private, max-age=3600"})
+
+
+@router.get("/cache/stats")
+async def parking_cache_stats(current_user: dict = Depends(get_current_user)):
+    """Hit / miss counters and hit ratio per cache tier of this worker"""
+    return get_parking_cache().stats()
+
+
+@router.delete("/cache")
+async def invalidate_parking_cache(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    x_admin_key: Optional[str] = Header(default=None),
+):
+    """
+    Drop cached geo checks, maps and analyses inside a bounding box (e.g.
+    after a road sign change), and invalidate the precomputed geo risk grid
+    cells there: they are consulted before the cache. Other workers drop
+    those cells on their next grid reload; re-run the grid sweep for the box
+    to precompute them again.
+    """
+    if not settings.ADMIN_API_KEY or x_admin_key != settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin key")
+
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid bounding box")
+
+    removed = await get_parking_cache().invalidate_region(min_lat, min_lon, max_lat, max_lon)
+    removed["geo_grid"] = await invalidate_cells(min_lat, min_lon, max_lat, max_lon, settings.GEO_GRID_CELL_METERS)
+    if settings.GEO_GRID_ENABLED:
+        get_geo_grid().invalidate_region(min_lat, min_lon, max_lat, max_lon)
+    return {"removed": removed}
+
+
+@router.get("/usage")
+async def llm_usage_report(
+    hours: int = Query(default=24, ge=1, le=24 * 90),
+    purpose: Optional[str] = Query(default=None),
+    x_admin_key: Optional[str] = Header(default=None),
+):
+    """OpenAI calls, input / cached / output tokens and latency per purpose and model"""
+    if not settings.ADMIN_API_KEY or x_admin_key != settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin key")
+
+    since = datetime.utcnow() - timedelta(hours=hours)
+    return {"since": since, "usage": await usage_report(since, purpose)}
@@ -6,6 +6,7 @@ import logging
 from foundation.database import get_db
 from interactors.auth import get_current_user
 from interactors.pdf_generator import PDFReportGenerator
+from interactors.violations import ViolationInteractor
 from foundation.models import Conversation, User, Photo
 from sqlalchemy import select
 
@@ -101,16 +102,8 @@ async def generate_violation_pdf(
     Generate PDF report for a violation.
     Returns the PDF file for download/preview.
     """
-    from foundation.models import Violation
-
-    # Get violation
-    result = await db.execute(
-        select(Violation).where(
-            Violation.id == violation_id,
-            Violation.user_id == current_user["id"]
-        )
-    )
-    violation = result.scalar_one_or_none()
+    # Get violation with its photos
+    violation = await ViolationInteractor(db).get_violation(violation_id, current_user["id"], photos=True)
 
     if not violation:
         raise HTTPException(
@@ -145,18 +138,12 @@ async def generate_violation_pdf(
         "email": user.email if user else "Не вказано"
     }
 
-    # Get photos
-    photos_result = await db.execute(
-        select(Photo).where(Photo.violation_id == violation_id)
-    )
-    photos = photos_result.scalars().all()
-
     # Generate PDF
     pdf_generator = PDFReportGenerator()
     pdf_buffer = pdf_generator.generate_violation_report(
         violation_data=violation_data,
         user_data=user_data,
-        photos=photos
+        photos=violation.photos
     )
 
     # Return as streaming response
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
 from foundation.database import get_db
-from foundation.schemas import UserResponse, ViolationResponse
+from foundation.replica import get_read_db
+from foundation.models import ViolationStatus
+from foundation.schemas import UserResponse, ViolationPage
 from interactors.auth import get_current_user
 from interactors.users import UserInteractor
 
@@ -20,11 +23,23 @@ async def get_current_user_info(
     return user
 
 
-@router.get("/me/violations", response_model=List[ViolationResponse])
+@router.get("/me/violations", response_model=ViolationPage)
 async def get_user_violations(
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    status: Optional[List[ViolationStatus]] = Query(default=None),
+    created_from: Optional[datetime] = Query(default=None),
+    created_to: Optional[datetime] = Query(default=None),
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     interactor = UserInteractor(db)
-    violations = await interactor.get_user_violations(current_user["id"])
-    return violations
+    rows, next_cursor = await interactor.get_user_violations(
+        current_user["id"],
+        limit=limit,
+        cursor=cursor,
+        status=status,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    return ViolationPage(items=rows, next_cursor=next_cursor)
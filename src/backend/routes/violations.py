@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Header, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
+import asyncio
 import logging
+import math
 
-from foundation.database import get_db
+from foundation.database import get_db, release_connection
+from foundation.replica import get_read_db
 from foundation.schemas import (
     CreateViolationRequest,
     UpdateViolationRequest,
@@ -17,10 +21,20 @@ from foundation.schemas import (
     TimerStartResponse,
     PDFUrlResponse,
     VehicleAnalysisResponse,
+    PlateSearchResponse,
+    ViolationAreaResponse,
 )
 from interactors.violations import ViolationInteractor
+from interactors.plate_search import MAX_DISTANCE, PlateSearchInteractor
+from interactors.violation_map import ViolationMapInteractor
+from interactors.timer_wheel import get_timer_wheel
+from foundation.geohash import METERS_PER_DEGREE
+from foundation.models import ViolationStatus
 from interactors.vehicle_analysis import VehicleAnalysisInteractor
 from interactors.auth import get_current_user
+from foundation.resilience import CircuitOpenError
+from foundation.sse import sse_event
+from settings import settings
 
 logger = logging.getLogger(__name__)
 
@@ -43,14 +57,76 @@ async def create_violation(
     return violation
 
 
+@router.get("/plates/search", response_model=PlateSearchResponse)
+async def search_plates(
+    plate: str = Query(..., min_length=3, max_length=20),
+    max_distance: int = Query(default=1, ge=0, le=MAX_DISTANCE),
+    limit: int = Query(default=20, ge=1, le=100),
+    x_admin_key: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Find repeat offenders: plates within `max_distance` edits of an OCR reading, across all users"""
+    if not settings.ADMIN_API_KEY or x_admin_key != settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin key")
+
+    matches = await PlateSearchInteractor(db).search(plate, max_distance=max_distance, limit=limit)
+    return PlateSearchResponse(query=plate, max_distance=max_distance, matches=matches)
+
+
+@router.get("/area", response_model=ViolationAreaResponse)
+async def get_violations_in_area(
+    min_lat: Optional[float] = Query(default=None, ge=-90, le=90),
+    min_lon: Optional[float] = Query(default=None, ge=-180, le=180),
+    max_lat: Optional[float] = Query(default=None, ge=-90, le=90),
+    max_lon: Optional[float] = Query(default=None, ge=-180, le=180),
+    latitude: Optional[float] = Query(default=None, ge=-90, le=90),
+    longitude: Optional[float] = Query(default=None, ge=-180, le=180),
+    radius_meters: Optional[float] = Query(default=None, gt=0, le=50_000),
+    zoom: int = Query(default=16, ge=0, le=21),
+    status_filter: Optional[List[ViolationStatus]] = Query(default=None, alias="status"),
+    x_admin_key: Optional[str] = Header(default=None),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Violations inside a bounding box (min_lat..max_lon) or a radius around
+    latitude/longitude: individual points when zoomed in, geohash clusters
+    otherwise. Only the caller's own violations unless a valid X-Admin-Key
+    is sent.
+    """
+    center = None
+    if latitude is not None and longitude is not None and radius_meters is not None:
+        d_lat = radius_meters / METERS_PER_DEGREE
+        d_lon = radius_meters / (METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+        min_lat, max_lat = max(latitude - d_lat, -90.0), min(latitude + d_lat, 90.0)
+        min_lon, max_lon = max(longitude - d_lon, -180.0), min(longitude + d_lon, 180.0)
+        center = (latitude, longitude, radius_meters)
+    elif None in (min_lat, min_lon, max_lat, max_lon):
+        raise HTTPException(
+            status_code=400,
+            detail="Give min_lat, min_lon, max_lat, max_lon or latitude, longitude, radius_meters",
+        )
+    elif min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="Invalid bounding box")
+
+    is_admin = bool(settings.ADMIN_API_KEY) and x_admin_key == settings.ADMIN_API_KEY
+    return await ViolationMapInteractor(db).query_area(
+        min_lat, min_lon, max_lat, max_lon,
+        zoom=zoom,
+        user_id=None if is_admin else current_user["id"],
+        status=status_filter,
+        center=center,
+    )
+
+
 @router.get("/{violation_id}", response_model=ViolationDetailResponse)
 async def get_violation(
     violation_id: str,
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     interactor = ViolationInteractor(db)
-    violation = await interactor.get_violation(violation_id, current_user["id"])
+    violation = await interactor.get_violation(violation_id, current_user["id"], photos=True, history=True)
     if not violation:
         raise HTTPException(status_code=404, detail="Violation not found")
     return violation
@@ -124,7 +200,7 @@ async def verify_violation(
 async def get_evidence_package(
     violation_id: str,
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     interactor = ViolationInteractor(db)
     evidence = await interactor.get_evidence_package(violation_id, current_user["id"])
@@ -153,13 +229,56 @@ async def upload_sign_photo(
 async def get_timer_status(
     violation_id: str,
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     interactor = ViolationInteractor(db)
     timer_status = await interactor.get_timer_status(violation_id, current_user["id"])
     return timer_status
 
 
+@router.get("/{violation_id}/timer-status/stream")
+async def stream_timer_status(
+    violation_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    /timer-status pushed as Server-Sent Events instead of polled.
+
+    A `status` event with the current timer status comes first, then a
+    `tick` event with seconds_remaining every TIMER_STREAM_TICK_SECONDS and,
+    when the timer expires, a final `status` event with can_submit true.
+    The violation is read once, when the stream opens: open it after
+    /start-timer. If the timer is not running (not started, or already
+    expired) the stream ends after the first event.
+    """
+    interactor = ViolationInteractor(db)
+    timer_status = await interactor.get_timer_status(violation_id, current_user["id"])
+    await release_connection(db)
+
+    async def events():
+        yield sse_event("status", TimerStatusResponse(**timer_status).model_dump(mode="json"))
+        if timer_status["can_submit"] or not timer_status.get("timer_expires_at"):
+            return
+        wheel = get_timer_wheel()
+        queue = wheel.subscribe(violation_id, timer_status["timer_expires_at"])
+        try:
+            while (seconds_remaining := await queue.get()) > 0:
+                yield sse_event("tick", {"seconds_remaining": seconds_remaining, "can_submit": False})
+        finally:
+            wheel.unsubscribe(violation_id, queue)
+        yield sse_event("status", TimerStatusResponse(**{
+            **timer_status, "seconds_remaining": 0, "can_submit": True,
+        }).model_dump(mode="json"))
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/{violation_id}/start-timer", response_model=TimerStartResponse)
 async def start_timer(
     violation_id: str,
@@ -223,7 +342,7 @@ async def submit_to_police(
 async def get_violation_status(
     violation_id: str,
     current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     interactor = ViolationInteractor(db)
     violation = await interactor.get_violation(violation_id, current_user["id"])
@@ -269,18 +388,35 @@ async def analyze_vehicle_photo(
         logger.error(f"Failed to read uploaded file: {e}")
         raise HTTPException(status_code=400, detail="Failed to read uploaded file")
 
+    # Nothing else is read or written, don't hold a pooled connection during the OpenAI call
+    await release_connection(db)
+
     # Analyze vehicle
     try:
         analysis_interactor = VehicleAnalysisInteractor()
         result = await analysis_interactor.analyze_vehicle(
             image_data=file_data,
             filename=file.filename,
+            violation_id=violation_id,
         )
 
         logger.info(f"Vehicle analysis completed for violation {violation_id}: headlights={result['headlights_on']}, driver={result['driver_present']}")
 
         return VehicleAnalysisResponse(**result)
 
+    except CircuitOpenError as e:
+        logger.warning(f"Vehicle analysis failed fast: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Vehicle analysis is temporarily unavailable, please try again later",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))},
+        )
+    except asyncio.TimeoutError:
+        logger.error("Vehicle analysis upstream timed out")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Vehicle analysis timed out, please try again later",
+        )
     except Exception as e:
         logger.error(f"Vehicle analysis failed: {e}", exc_info=True)
         raise HTTPException(
@@ -0,0 +1,115 @@
+"""
+Benchmark: batched audit log writes (PostgreSQL)
+
+Has --producers concurrent tasks (standing in for requests) submit --events
+audit events in total through an AuditWriter, and reports the events/s
+stored (the writer is stopped, so flushed, at the end), the submit latency
+a request sees and how many events were dropped; then stores --baseline
+events the way one would without the writer, one INSERT and commit each.
+
+Run `alembic upgrade head` first. Benchmark rows (action "BENCHMARK ...")
+are deleted at the end unless --keep.
+
+Usage (from src/backend):
+    python -m scripts.benchmark_audit_writer --events 100000 --producers 200
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+from sqlalchemy import delete
+
+from foundation.audit import AuditWriter
+from foundation.database import AsyncSessionLocal
+from foundation.models import AuditLog
+from settings import settings
+
+ACTION = "BENCHMARK POST /violations/{violation_id}/submit"
+
+
+def event() -> dict:
+    violation_id = str(uuid.uuid4())
+    return {
+        "user_id": str(uuid.uuid4()),
+        "violation_id": violation_id,
+        "action": ACTION,
+        "resource_type": "violations",
+        "resource_id": violation_id,
+        "ip_address": "203.0.113.7",
+        "user_agent": "benchmark",
+        "response_data": {"status_code": 200},
+    }
+
+
+async def produce(writer: AuditWriter, count: int, latencies: list[float]):
+    for _ in range(count):
+        start = time.perf_counter()
+        await writer.submit(**event())
+        latencies.append((time.perf_counter() - start) * 1000)
+        # Let the writer task run, as it would between real requests
+        await asyncio.sleep(0)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--producers", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=settings.AUDIT_BATCH_SIZE)
+    parser.add_argument("--queue-size", type=int, default=settings.AUDIT_QUEUE_SIZE)
+    parser.add_argument("--baseline", type=int, default=2_000, help="Events stored one INSERT and commit each")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark rows")
+    args = parser.parse_args()
+
+    report = {"events": args.events, "producers": args.producers, "batch_size": args.batch_size}
+    try:
+        writer = AuditWriter(max_queue=args.queue_size, batch_size=args.batch_size)
+        writer.start()
+        latencies = []
+        per_producer, extra = divmod(args.events, args.producers)
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            produce(writer, per_producer + (i < extra), latencies) for i in range(args.producers)
+        ))
+        submitted_s = time.perf_counter() - started
+        await writer.stop(timeout=600)
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        counts = writer.snapshot()
+        report["batched"] = {
+            "events_per_s": round(counts["written"] / elapsed),
+            "submit_s": round(submitted_s, 2),
+            "total_s": round(elapsed, 2),
+            "submit_p50_ms": round(statistics.median(latencies), 3),
+            "submit_p99_ms": round(latencies[int(len(latencies) * 0.99)], 3),
+            "written": counts["written"],
+            "dropped": counts["dropped"],
+            "failed": counts["failed"],
+            "batches": counts["batches"],
+        }
+
+        # What the writer replaces: each request inserting its own row
+        started = time.perf_counter()
+        for _ in range(args.baseline):
+            async with AsyncSessionLocal() as session:
+                session.add(AuditLog(**event()))
+                await session.commit()
+        elapsed = time.perf_counter() - started
+        report["per_request"] = {
+            "events_per_s": round(args.baseline / elapsed),
+            "per_event_ms": round(elapsed / args.baseline * 1000, 3),
+        }
+    finally:
+        if not args.keep:
+            async with AsyncSessionLocal() as session:
+                await session.execute(delete(AuditLog).where(AuditLog.action == ACTION))
+                await session.commit()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
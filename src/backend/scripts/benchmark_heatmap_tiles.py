@@ -0,0 +1,153 @@
+"""
+Benchmark: violation heatmap tiles (PostgreSQL)
+
+Seeds a throwaway user with --violations submitted violations at random
+points in --bbox (COPY in batches), rebuilds heatmap_cells, then times
+HeatmapInteractor.get_tile for random tiles at each served zoom against
+aggregating the same tile from the violations table on request, and the
+per-submit HeatmapInteractor.record upsert.
+
+Run `alembic upgrade head` first. Seeded rows are deleted (and the heatmap
+rebuilt without them) at the end unless --keep.
+
+Usage (from src/backend):
+    python -m scripts.benchmark_heatmap_tiles --violations 20000000 --bbox 50.35 30.35 50.55 30.75
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, text
+
+from foundation import geohash, tiles
+from foundation.database import AsyncSessionLocal
+from foundation.models import User, Violation
+from interactors.heatmap import HeatmapInteractor, levels
+from settings import settings
+
+COLUMNS = ["id", "user_id", "status", "latitude", "longitude", "geohash", "created_at", "has_road_sign_photo", "version_id"]
+BATCH = 100_000
+
+# What the heatmap replaces: one tile aggregated from the violations table
+ON_REQUEST_SQL = text("""
+    SELECT x - :x0, y - :y0, count(*)
+    FROM (
+        SELECT
+            floor((longitude + 180) / 360 * CAST(:n AS float8))::int AS x,
+            floor((1 - ln(tan(radians(latitude)) + 1 / cos(radians(latitude))) / pi()) / 2 * CAST(:n AS float8))::int AS y
+        FROM violations
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL AND duplicate_of_id IS NULL
+            AND status IN ('SUBMITTED', 'UNDER_REVIEW', 'RESOLVED')
+    ) AS points
+    WHERE x BETWEEN :x0 AND :x0 + 31 AND y BETWEEN :y0 AND :y0 + 31
+    GROUP BY x, y
+""")
+
+
+async def seed(user_id: str, count: int, bbox: list[float]):
+    min_lat, min_lon, max_lat, max_lon = bbox
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as session:
+        session.add(User(id=user_id, diia_user_id=f"benchmark-{user_id}", is_active=True, is_verified=True))
+        await session.commit()
+
+        connection = await session.connection()
+        raw = (await connection.get_raw_connection()).driver_connection
+        for start in range(0, count, BATCH):
+            records = []
+            for i in range(start, min(count, start + BATCH)):
+                # Denser towards the center, like a real city
+                lat = min(max(random.gauss((min_lat + max_lat) / 2, (max_lat - min_lat) / 6), min_lat), max_lat)
+                lon = min(max(random.gauss((min_lon + max_lon) / 2, (max_lon - min_lon) / 6), min_lon), max_lon)
+                records.append((
+                    f"{user_id[:8]}-{i}", user_id, "SUBMITTED", lat, lon, geohash.encode(lat, lon),
+                    now - timedelta(seconds=random.randint(0, 365 * 86400)), False, 1,
+                ))
+            await raw.copy_records_to_table("violations", records=records, columns=COLUMNS)
+            print(f"Seeded {min(count, start + BATCH)}/{count}", flush=True)
+        await session.commit()
+        await session.execute(text("ANALYZE violations"))
+
+
+def timings(runs: list[float]) -> dict:
+    runs.sort()
+    return {"median_ms": round(statistics.median(runs), 2), "p95_ms": round(runs[int(len(runs) * 0.95)], 2)}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--violations", type=int, default=10_000_000)
+    parser.add_argument(
+        "--bbox", nargs=4, type=float, default=[50.35, 30.35, 50.55, 30.75],
+        metavar=("MIN_LAT", "MIN_LON", "MAX_LAT", "MAX_LON"),
+    )
+    parser.add_argument("--samples", type=int, default=100)
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded rows")
+    args = parser.parse_args()
+
+    user_id = str(uuid.uuid4())
+    started = time.perf_counter()
+    await seed(user_id, args.violations, args.bbox)
+    report = {"violations": args.violations, "seed_s": round(time.perf_counter() - started, 1)}
+
+    min_lat, min_lon, max_lat, max_lon = args.bbox
+    try:
+        async with AsyncSessionLocal() as session:
+            interactor = HeatmapInteractor(session)
+
+            started = time.perf_counter()
+            report["rebuild"] = {"bins": await interactor.rebuild(), "s": round(time.perf_counter() - started, 1)}
+
+            for zoom in range(settings.HEATMAP_MIN_ZOOM, settings.HEATMAP_MAX_ZOOM + 1):
+                runs, sizes = [], []
+                for _ in range(args.samples):
+                    x, y = tiles.tile_xy(random.uniform(min_lat, max_lat), random.uniform(min_lon, max_lon), zoom)
+                    start = time.perf_counter()
+                    bins = await interactor.get_tile(zoom, x, y)
+                    runs.append((time.perf_counter() - start) * 1000)
+                    sizes.append(len(bins))
+                report[f"zoom_{zoom}"] = {**timings(runs), "avg_bins": round(statistics.mean(sizes), 1)}
+
+            # A few samples only: each one scans the whole table
+            runs = []
+            zoom = settings.HEATMAP_MIN_ZOOM
+            for _ in range(3):
+                x, y = tiles.tile_xy(random.uniform(min_lat, max_lat), random.uniform(min_lon, max_lon), zoom)
+                start = time.perf_counter()
+                await session.execute(ON_REQUEST_SQL, {
+                    "n": 1 << (zoom + tiles.BIN_BITS), "x0": x << tiles.BIN_BITS, "y0": y << tiles.BIN_BITS,
+                })
+                runs.append((time.perf_counter() - start) * 1000)
+            report[f"zoom_{zoom}_on_request"] = timings(runs)
+
+            # The upsert a submit adds to its transaction (one row per level)
+            runs = []
+            for _ in range(args.samples):
+                violation = Violation(
+                    id=str(uuid.uuid4()),
+                    latitude=random.uniform(min_lat, max_lat),
+                    longitude=random.uniform(min_lon, max_lon),
+                )
+                start = time.perf_counter()
+                await interactor.record(violation)
+                runs.append((time.perf_counter() - start) * 1000)
+            await session.rollback()
+            report["record"] = {**timings(runs), "levels": len(levels())}
+    finally:
+        if not args.keep:
+            async with AsyncSessionLocal() as session:
+                await session.execute(delete(Violation).where(Violation.user_id == user_id))
+                await session.execute(delete(User).where(User.id == user_id))
+                await session.commit()
+                await HeatmapInteractor(session).rebuild()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
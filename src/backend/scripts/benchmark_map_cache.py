@@ -0,0 +1,79 @@
+"""
+Benchmark: map image latency with a cold vs warm on-disk map cache
+
+Picks random points in a bounding box and fetches each map twice through
+a map cache in a temporary directory: the first (cold) request renders it
+through the geo service, the second (warm) is read from disk. Needs a
+running geo service at GEO_SERVICE_URL.
+
+Usage (from src/backend):
+    python -m scripts.benchmark_map_cache --bbox 50.43 30.50 50.46 30.54 --points 50
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import tempfile
+import time
+
+import httpx
+
+from interactors.map_cache import MapImageStore
+from interactors.parking_analysis import ParkingAnalysisInteractor
+
+
+def summary(values: list[float]) -> dict:
+    ordered = sorted(values)
+    return {
+        "mean": round(statistics.mean(ordered), 2),
+        "p50": round(ordered[len(ordered) // 2], 2),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--bbox", nargs=4, type=float, required=True, metavar=("MIN_LAT", "MIN_LON", "MAX_LAT", "MAX_LON")
+    )
+    parser.add_argument("--points", type=int, default=50)
+    parser.add_argument("--zoom", type=int, default=17)
+    parser.add_argument("--image-size", type=int, default=512)
+    args = parser.parse_args()
+
+    min_lat, min_lon, max_lat, max_lon = args.bbox
+    points = [(random.uniform(min_lat, max_lat), random.uniform(min_lon, max_lon)) for _ in range(args.points)]
+
+    interactor = ParkingAnalysisInteractor()
+    # Measure the geo service itself on a cold miss, not the other cache tiers
+    interactor.cache = None
+
+    with tempfile.TemporaryDirectory() as root:
+        store = MapImageStore(root, max_bytes=2**30, cell_meters=10.0)
+        cold_ms, warm_ms = [], []
+
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            for lat, lon in points:
+                def render():
+                    return interactor._render_map_image(client, None, lat, lon, args.zoom, args.image_size)
+
+                for timings in (cold_ms, warm_ms):
+                    start = time.perf_counter()
+                    path = await store.get_or_render(lat, lon, args.zoom, args.image_size, render)
+                    await asyncio.to_thread(path.read_bytes)
+                    timings.append((time.perf_counter() - start) * 1000)
+
+        print(json.dumps({
+            "points": args.points,
+            "zoom": args.zoom,
+            "image_size": args.image_size,
+            "cold_ms": summary(cold_ms),
+            "warm_ms": summary(warm_ms),
+            "speedup_p50": round(summary(cold_ms)["p50"] / max(summary(warm_ms)["p50"], 1e-3), 1),
+            "cache": store.snapshot(),
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
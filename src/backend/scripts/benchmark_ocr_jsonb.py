@@ -0,0 +1,159 @@
+"""
+Benchmark: OCR-status filters on JSONB photos (PostgreSQL)
+
+Seeds a throwaway user with --violations violations and --photos photos
+spread over them (generate_series, so a million rows take seconds), about
+--ok-ratio of them with a recognised plate. Then, for random violations,
+times the submission check and the plate-vote query:
+  - python_filter: the old way, load the initial photos and check
+    ocr_results["status"] in Python
+  - sql_exists / sql_observations: the filters pushed into SQL, served by
+    the partial index ix_photos_violation_id_ocr_ok
+and prints EXPLAIN (ANALYZE, BUFFERS) of the SQL queries.
+
+Run `alembic upgrade head` first. Seeded rows are deleted at the end unless --keep.
+
+Usage (from src/backend):
+    python -m scripts.benchmark_ocr_jsonb --photos 1000000 --violations 200000
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+
+from sqlalchemy import delete, exists, select, text
+
+from foundation.database import AsyncSessionLocal
+from foundation.models import Photo, PhotoType, User, Violation, PHOTO_OCR_OK
+
+SEED_VIOLATIONS = text("""
+    INSERT INTO violations (id, user_id, status, has_road_sign_photo, created_at, version_id)
+    SELECT CAST(:prefix AS text) || i, :user_id, 'PENDING_VERIFICATION'::violationstatus, false, now(), 1
+    FROM generate_series(1, :count) AS i
+""")
+
+SEED_PHOTOS = text("""
+    INSERT INTO photos (id, violation_id, photo_type, storage_url, storage_key, file_size, mime_type, uploaded_at, ocr_results)
+    SELECT
+        gen_random_uuid()::text,
+        CAST(:prefix AS text) || (1 + (i % :violations)),
+        (ARRAY['INITIAL', 'VERIFICATION', 'CONTEXT'])[1 + (i % 3)]::phototype,
+        'https://example.invalid/p.jpg', 'benchmark/p.jpg', 250000, 'image/jpeg', now(),
+        CASE WHEN random() < :ok_ratio
+            THEN jsonb_build_object('status', 'OK', 'plate', 'AA' || lpad((i % 10000)::text, 4, '0') || 'BB',
+                                    'confidence', random(), 'crop_hash', md5(i::text))
+            ELSE jsonb_build_object('status', 'ERROR', 'code', 1, 'message', 'No plate detected')
+        END
+    FROM generate_series(1, :count) AS i
+""")
+
+
+async def seed(prefix: str, user_id: str, violations: int, photos: int, ok_ratio: float):
+    async with AsyncSessionLocal() as session:
+        session.add(User(id=user_id, diia_user_id=f"benchmark-{user_id}", is_active=True, is_verified=True))
+        await session.flush()
+        await session.execute(SEED_VIOLATIONS, {"prefix": prefix, "user_id": user_id, "count": violations})
+        await session.execute(
+            SEED_PHOTOS, {"prefix": prefix, "violations": violations, "count": photos, "ok_ratio": ok_ratio}
+        )
+        await session.commit()
+        await session.execute(text("ANALYZE photos"))
+
+
+async def timed(session, query_for, violation_ids: list[str]) -> dict:
+    runs = []
+    for violation_id in violation_ids:
+        start = time.perf_counter()
+        await query_for(session, violation_id)
+        runs.append((time.perf_counter() - start) * 1000)
+    runs.sort()
+    return {
+        "median_ms": round(statistics.median(runs), 3),
+        "p95_ms": round(runs[int(len(runs) * 0.95)], 3),
+    }
+
+
+async def python_filter(session, violation_id: str) -> bool:
+    result = await session.execute(
+        select(Photo).where(Photo.violation_id == violation_id, Photo.photo_type == PhotoType.INITIAL)
+    )
+    ok = any(p.ocr_results and p.ocr_results.get("status") == "OK" for p in result.scalars().all())
+    session.expunge_all()
+    return ok
+
+
+def exists_query(violation_id: str):
+    return select(exists().where(
+        Photo.violation_id == violation_id,
+        Photo.photo_type == PhotoType.INITIAL,
+        PHOTO_OCR_OK,
+    ))
+
+
+def observations_query(violation_id: str):
+    return select(Photo.ocr_results).where(
+        Photo.violation_id == violation_id,
+        Photo.photo_type.in_([PhotoType.INITIAL, PhotoType.VERIFICATION]),
+        PHOTO_OCR_OK,
+    )
+
+
+async def sql_exists(session, violation_id: str) -> bool:
+    return await session.scalar(exists_query(violation_id))
+
+
+async def sql_observations(session, violation_id: str) -> list:
+    return (await session.execute(observations_query(violation_id))).scalars().all()
+
+
+async def explain(session, query) -> list[str]:
+    compiled = query.compile(compile_kwargs={"literal_binds": True})
+    result = await session.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}"))
+    return [row[0] for row in result.all()]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--photos", type=int, default=1_000_000)
+    parser.add_argument("--violations", type=int, default=200_000)
+    parser.add_argument("--ok-ratio", type=float, default=0.3)
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded rows")
+    args = parser.parse_args()
+
+    prefix = f"bench-{uuid.uuid4().hex[:8]}-"
+    user_id = str(uuid.uuid4())
+    started = time.perf_counter()
+    await seed(prefix, user_id, args.violations, args.photos, args.ok_ratio)
+    seed_s = round(time.perf_counter() - started, 1)
+
+    violation_ids = [f"{prefix}{random.randint(1, args.violations)}" for _ in range(args.samples)]
+    try:
+        async with AsyncSessionLocal() as session:
+            report = {
+                "photos": args.photos,
+                "violations": args.violations,
+                "seed_s": seed_s,
+                "python_filter": await timed(session, python_filter, violation_ids),
+                "sql_exists": await timed(session, sql_exists, violation_ids),
+                "sql_observations": await timed(session, sql_observations, violation_ids),
+                "explain_exists": await explain(session, exists_query(violation_ids[0])),
+                "explain_observations": await explain(session, observations_query(violation_ids[0])),
+            }
+    finally:
+        if not args.keep:
+            async with AsyncSessionLocal() as session:
+                violation_ids_query = select(Violation.id).where(Violation.user_id == user_id)
+                await session.execute(delete(Photo).where(Photo.violation_id.in_(violation_ids_query)))
+                await session.execute(delete(Violation).where(Violation.user_id == user_id))
+                await session.execute(delete(User).where(User.id == user_id))
+                await session.commit()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""
+Compare HTTP/JSON and binary transports to the OCR service
+
+Sends the same photos through /recognize_crnn (multipart + JSON, one request
+per photo) and /recognize_crnn_binary (length-prefixed frames, one photo per
+request and whole batches per request) over a persistent connection and
+prints throughput and latency percentiles for each mode.
+
+Usage (from src/backend):
+    python -m scripts.benchmark_ocr_transport --images path/to/photos
+    python -m scripts.benchmark_ocr_transport --images path/to/photos --raw-pixels --batch-size 8
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+
+from interactors.ocr_service import OCRServiceClient
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 2)
+
+
+def summarize(name: str, latencies_ms: list[float], photos: int, elapsed_s: float) -> dict:
+    return {
+        "name": name,
+        "photos": photos,
+        "requests": len(latencies_ms),
+        "photos_per_s": round(photos / elapsed_s, 2) if elapsed_s else None,
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies_ms), 2),
+            "p50": percentile(latencies_ms, 50),
+            "p95": percentile(latencies_ms, 95),
+            "p99": percentile(latencies_ms, 99),
+        },
+    }
+
+
+async def run_mode(name: str, call, batches: list[list[bytes]], repeat: int) -> dict:
+    # Warm-up request opens the connection and triggers lazy model init
+    await call(batches[0])
+
+    latencies = []
+    photos = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for batch in batches:
+            start = time.perf_counter()
+            await call(batch)
+            latencies.append((time.perf_counter() - start) * 1000)
+            photos += len(batch)
+    return summarize(name, latencies, photos, time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", required=True, help="Directory with test photos")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the image set per mode")
+    parser.add_argument("--batch-size", type=int, default=8, help="Photos per streamed binary request")
+    parser.add_argument("--raw-pixels", action="store_true", help="Send raw RGB pixels in binary mode")
+    args = parser.parse_args()
+
+    paths = sorted(p for p in Path(args.images).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    images = [p.read_bytes() for p in paths]
+    if not images:
+        print(f"No images found in {args.images}")
+        return
+
+    client = OCRServiceClient()
+    client.raw_pixels = args.raw_pixels
+
+    async def http_single(batch):
+        client.transport = "http"
+        return [await client.detect_from_file(image, "photo.jpg") for image in batch]
+
+    async def binary_single(batch):
+        return [(await client.detect_batch([image]))[0] for image in batch]
+
+    singles = [[image] for image in images]
+    batches = [images[i:i + args.batch_size] for i in range(0, len(images), args.batch_size)]
+
+    try:
+        results = [
+            await run_mode("http_json", http_single, singles, args.repeat),
+            await run_mode("binary_single", binary_single, singles, args.repeat),
+            await run_mode(f"binary_batch_{args.batch_size}", client.detect_batch, batches, args.repeat),
+        ]
+    finally:
+        await OCRServiceClient.aclose()
+
+    print(json.dumps({
+        "ocr_service": client.base_url,
+        "images": len(images),
+        "raw_pixels": args.raw_pixels,
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
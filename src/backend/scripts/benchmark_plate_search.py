@@ -0,0 +1,132 @@
+"""
+Benchmark: fuzzy license plate search (PostgreSQL)
+
+Seeds a throwaway user with --violations violations carrying random
+Ukrainian-style plates (generate_series), then searches for sampled plates
+after applying OCR-like noise: Cyrillic look-alikes, O/0 and B/8 swaps,
+inserted spaces and random 1-2 character edits. Reports latency and recall
+(was the original plate among the matches) per max_distance, plus EXPLAIN
+(ANALYZE, BUFFERS) of one search.
+
+Run `alembic upgrade head` first. Seeded rows are deleted at the end unless --keep.
+
+Usage (from src/backend):
+    python -m scripts.benchmark_plate_search --violations 2000000 --samples 300
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+
+from sqlalchemy import delete, select, text
+
+from foundation.database import AsyncSessionLocal
+from foundation.models import User, Violation
+from interactors.plate_search import MAX_DISTANCE, PlateSearchInteractor
+
+PLATE_LETTERS = "ABCEHIKMOPTX"
+LOOK_ALIKES = {"A": "А", "B": "В", "E": "Е", "I": "І", "K": "К", "M": "М", "H": "Н", "O": "О", "P": "Р", "C": "С", "T": "Т", "X": "Х"}
+CONFUSIONS = {"O": "0", "0": "O", "B": "8", "8": "B", "I": "1", "1": "I"}
+
+SEED_VIOLATIONS = text("""
+    INSERT INTO violations (id, user_id, status, has_road_sign_photo, created_at, version_id, license_plate)
+    SELECT
+        CAST(:prefix AS text) || i, :user_id, 'SUBMITTED'::violationstatus, false,
+        now() - random() * interval '365 days', 1,
+        l[1 + floor(random() * 12)::int] || l[1 + floor(random() * 12)::int]
+            || lpad(floor(random() * 10000)::int::text, 4, '0')
+            || l[1 + floor(random() * 12)::int] || l[1 + floor(random() * 12)::int]
+    FROM generate_series(1, :count) AS i,
+         (SELECT string_to_array('A,B,C,E,H,I,K,M,O,P,T,X', ',') AS l) AS letters
+""")
+
+
+def add_noise(plate: str, edits: int) -> str:
+    """What OCR might read instead of `plate`: look-alikes and confusions (free), plus `edits` real edits"""
+    chars = [LOOK_ALIKES.get(c, c) if random.random() < 0.3 else CONFUSIONS.get(c, c) if random.random() < 0.2 else c for c in plate]
+    for _ in range(edits):
+        i = random.randrange(len(chars))
+        op = random.choice(("substitute", "insert", "delete"))
+        if op == "substitute":
+            chars[i] = random.choice(PLATE_LETTERS + "0123456789")
+        elif op == "insert":
+            chars.insert(i, random.choice(PLATE_LETTERS + "0123456789"))
+        else:
+            del chars[i]
+    noisy = "".join(chars)
+    return noisy[:2] + " " + noisy[2:] if random.random() < 0.3 else noisy
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--violations", type=int, default=1_000_000)
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded rows")
+    args = parser.parse_args()
+
+    prefix = f"bench-{uuid.uuid4().hex[:8]}-"
+    user_id = str(uuid.uuid4())
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        session.add(User(id=user_id, diia_user_id=f"benchmark-{user_id}", is_active=True, is_verified=True))
+        await session.flush()
+        await session.execute(SEED_VIOLATIONS, {"prefix": prefix, "user_id": user_id, "count": args.violations})
+        await session.commit()
+        await session.execute(text("ANALYZE violations"))
+    seed_s = round(time.perf_counter() - started, 1)
+
+    report = {"violations": args.violations, "seed_s": seed_s}
+    try:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Violation.license_plate)
+                .where(Violation.user_id == user_id)
+                .order_by(Violation.id)
+                .limit(args.samples)
+            )
+            samples = list(result.scalars().all())
+            interactor = PlateSearchInteractor(session)
+
+            for max_distance in range(MAX_DISTANCE + 1):
+                runs, found, candidates = [], 0, []
+                for plate in samples:
+                    query = add_noise(plate, max_distance)
+                    start = time.perf_counter()
+                    matches = await interactor.search(query, max_distance=max_distance)
+                    runs.append((time.perf_counter() - start) * 1000)
+                    await session.commit()
+                    found += any(plate in match["plates"] for match in matches)
+                    candidates.append(len(matches))
+                runs.sort()
+                report[f"distance_{max_distance}"] = {
+                    "median_ms": round(statistics.median(runs), 2),
+                    "p95_ms": round(runs[int(len(runs) * 0.95)], 2),
+                    "recall": round(found / len(samples), 3),
+                    "avg_matches": round(statistics.mean(candidates), 1),
+                }
+
+            await session.execute(text("SELECT set_config('pg_trgm.similarity_threshold', '0.4', true)"))
+            result = await session.execute(
+                text(
+                    "EXPLAIN (ANALYZE, BUFFERS) SELECT license_plate_normalized FROM violations "
+                    "WHERE license_plate_normalized % normalize_plate(:plate) "
+                    "AND levenshtein(license_plate_normalized, normalize_plate(:plate)) <= 1"
+                ),
+                {"plate": add_noise(samples[0], 1)},
+            )
+            report["explain"] = [row[0] for row in result.all()]
+    finally:
+        if not args.keep:
+            async with AsyncSessionLocal() as session:
+                await session.execute(delete(Violation).where(Violation.user_id == user_id))
+                await session.execute(delete(User).where(User.id == user_id))
+                await session.commit()
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+"""
+Benchmark: listing a heavy reporter's violations
+
+Creates a throwaway user with --violations rows in DATABASE_URL and times:
+  - full_orm: the old listing, every Violation loaded as an ORM entity
+  - keyset_first / keyset_deep: one page through UserInteractor.get_user_violations,
+    at the start and after walking --deep-pages pages with the cursor
+  - offset_deep: the same deep page with LIMIT/OFFSET, for comparison
+
+Run `alembic upgrade head` first so the (user_id, created_at, id) index
+exists. The user and its violations are deleted at the end unless --keep.
+
+Usage (from src/backend):
+    python -m scripts.benchmark_user_violations --violations 100000 --page-size 50
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, select
+
+from foundation.database import AsyncSessionLocal
+from foundation.models import User, Violation, ViolationStatus
+from interactors.users import LIST_COLUMNS, UserInteractor
+
+
+async def seed(user_id: str, count: int):
+    now = datetime.utcnow()
+    statuses = list(ViolationStatus)
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(User).values(
+            id=user_id, diia_user_id=f"benchmark-{user_id}", is_active=True, is_verified=True
+        ))
+        for start in range(0, count, 5000):
+            await session.execute(insert(Violation), [
+                {
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "status": random.choice(statuses),
+                    "license_plate": f"AA{random.randint(0, 9999):04d}BB",
+                    "latitude": 50.45 + random.uniform(-0.05, 0.05),
+                    "longitude": 30.52 + random.uniform(-0.05, 0.05),
+                    "address": "Kyiv",
+                    "notes": "x" * 200,
+                    "violations": [{"code": "15.10", "reason": "benchmark"}],
+                    "created_at": now - timedelta(seconds=random.randint(0, 365 * 86400)),
+                }
+                for _ in range(start, min(count, start + 5000))
+            ])
+        await session.commit()
+
+
+async def timed(func, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = await func()
+        runs.append((time.perf_counter() - start) * 1000)
+    return {"rows": rows, "median_ms": round(statistics.median(runs), 2), "max_ms": round(max(runs), 2)}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--violations", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--deep-pages", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded user and violations")
+    args = parser.parse_args()
+
+    user_id = str(uuid.uuid4())
+    started = time.perf_counter()
+    await seed(user_id, args.violations)
+    seed_s = round(time.perf_counter() - started, 1)
+
+    try:
+        async with AsyncSessionLocal() as session:
+            interactor = UserInteractor(session)
+
+            async def full_orm():
+                result = await session.execute(
+                    select(Violation).where(Violation.user_id == user_id).order_by(Violation.created_at.desc())
+                )
+                rows = len(result.scalars().all())
+                session.expunge_all()
+                return rows
+
+            async def keyset_first():
+                rows, _ = await interactor.get_user_violations(user_id, limit=args.page_size)
+                return len(rows)
+
+            cursor = None
+            for _ in range(args.deep_pages):
+                _, cursor = await interactor.get_user_violations(user_id, limit=args.page_size, cursor=cursor)
+
+            async def keyset_deep():
+                rows, _ = await interactor.get_user_violations(user_id, limit=args.page_size, cursor=cursor)
+                return len(rows)
+
+            async def offset_deep():
+                result = await session.execute(
+                    select(*LIST_COLUMNS)
+                    .where(Violation.user_id == user_id)
+                    .order_by(Violation.created_at.desc(), Violation.id.desc())
+                    .offset(args.deep_pages * args.page_size)
+                    .limit(args.page_size)
+                )
+                return len(result.all())
+
+            report = {
+                "violations": args.violations,
+                "page_size": args.page_size,
+                "deep_page": args.deep_pages,
+                "seed_s": seed_s,
+                "full_orm": await timed(full_orm, args.repeat),
+                "keyset_first": await timed(keyset_first, args.repeat),
+                "keyset_deep": await timed(keyset_deep, args.repeat),
+                "offset_deep": await timed(offset_deep, args.repeat),
+            }
+    finally:
+        if not args.keep:
+            async with AsyncSessionLocal() as session:
+                await session.execute(delete(Violation).where(Violation.user_id == user_id))
+                await session.execute(delete(User).where(User.id == user_id))
+                await session.commit()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+"""
+Benchmark: bounding-box / radius violation queries (PostgreSQL)
+
+Seeds a throwaway user with --violations violations at random points in
+--bbox (COPY in batches, geohash computed here), then times
+ViolationMapInteractor.query_area for random viewports at several zooms -
+points when zoomed in, server-side clusters when zoomed out - and a 300m
+radius query, against the same viewport filtered on bare latitude /
+longitude (a full scan), and prints EXPLAIN (ANALYZE, BUFFERS) of one viewport.
+
+Seeding 10M rows takes a few minutes (geohashes are encoded in Python).
+Run `alembic upgrade head` first. Seeded rows are deleted at the end unless --keep.
+
+Usage (from src/backend):
+    python -m scripts.benchmark_violation_area --violations 10000000 --bbox 50.35 30.35 50.55 30.75
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, text
+
+from foundation import geohash
+from foundation.database import AsyncSessionLocal
+from foundation.models import User, Violation
+from interactors.violation_map import ViolationMapInteractor
+
+COLUMNS = ["id", "user_id", "status", "latitude", "longitude", "geohash", "created_at", "has_road_sign_photo", "version_id"]
+BATCH = 100_000
+
+# Viewport size in degrees of latitude at a zoom, for a ~1000px tall map
+VIEWPORT_DEGREES = {17: 0.007, 15: 0.03, 13: 0.12, 11: 0.5}
+
+
+async def seed(user_id: str, count: int, bbox: list[float]):
+    min_lat, min_lon, max_lat, max_lon = bbox
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as session:
+        session.add(User(id=user_id, diia_user_id=f"benchmark-{user_id}", is_active=True, is_verified=True))
+        await session.commit()
+
+        connection = await session.connection()
+        raw = (await connection.get_raw_connection()).driver_connection
+        for start in range(0, count, BATCH):
+            records = []
+            for i in range(start, min(count, start + BATCH)):
+                lat, lon = random.uniform(min_lat, max_lat), random.uniform(min_lon, max_lon)
+                records.append((
+                    f"{user_id[:8]}-{i}", user_id, "SUBMITTED", lat, lon, geohash.encode(lat, lon),
+                    now - timedelta(seconds=random.randint(0, 365 * 86400)), False, 1,
+                ))
+            await raw.copy_records_to_table("violations", records=records, columns=COLUMNS)
+            print(f"Seeded {min(count, start + BATCH)}/{count}", flush=True)
+        await session.commit()
+        await session.execute(text("ANALYZE violations"))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--violations", type=int, default=10_000_000)
+    parser.add_argument(
+        "--bbox", nargs=4, type=float, default=[50.35, 30.35, 50.55, 30.75],
+        metavar=("MIN_LAT", "MIN_LON", "MAX_LAT", "MAX_LON"),
+    )
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded rows")
+    args = parser.parse_args()
+
+    user_id = str(uuid.uuid4())
+    started = time.perf_counter()
+    await seed(user_id, args.violations, args.bbox)
+    report = {"violations": args.violations, "seed_s": round(time.perf_counter() - started, 1)}
+
+    min_lat, min_lon, max_lat, max_lon = args.bbox
+    try:
+        async with AsyncSessionLocal() as session:
+            interactor = ViolationMapInteractor(session)
+
+            async def measure(name: str, query, samples: int = args.samples):
+                runs, sizes = [], []
+                for _ in range(samples):
+                    start = time.perf_counter()
+                    result = await query()
+                    runs.append((time.perf_counter() - start) * 1000)
+                    sizes.append(len(result["clusters"] if result["clustered"] else result["points"]))
+                runs.sort()
+                report[name] = {
+                    "clustered": result["clustered"],
+                    "median_ms": round(statistics.median(runs), 2),
+                    "p95_ms": round(runs[int(len(runs) * 0.95)], 2),
+                    "avg_items": round(statistics.mean(sizes), 1),
+                }
+
+            for zoom, size in VIEWPORT_DEGREES.items():
+                def viewport(zoom=zoom, size=size):
+                    lat = random.uniform(min_lat, max_lat - size)
+                    lon = random.uniform(min_lon, max_lon - size * 1.6)
+                    return interactor.query_area(lat, lon, lat + size, lon + size * 1.6, zoom=zoom)
+                await measure(f"zoom_{zoom}", viewport)
+
+            def radius():
+                lat, lon = random.uniform(min_lat, max_lat), random.uniform(min_lon, max_lon)
+                d_lat, d_lon = 300 / geohash.METERS_PER_DEGREE, 300 / (geohash.METERS_PER_DEGREE * 0.64)
+                return interactor.query_area(
+                    lat - d_lat, lon - d_lon, lat + d_lat, lon + d_lon, zoom=17, center=(lat, lon, 300.0)
+                )
+            await measure("radius_300m", radius)
+
+            # Baseline: the same zoom 17 viewport on bare latitude / longitude (no usable index)
+            async def latlon_only():
+                lat = random.uniform(min_lat, max_lat - 0.007)
+                lon = random.uniform(min_lon, max_lon - 0.011)
+                result = await session.execute(
+                    select(Violation.id, Violation.latitude, Violation.longitude)
+                    .where(Violation.latitude.between(lat, lat + 0.007), Violation.longitude.between(lon, lon + 0.011))
+                    .limit(501)
+                )
+                return {"clustered": False, "points": result.all(), "clusters": []}
+            await measure("zoom_17_latlon_only", latlon_only, samples=max(3, args.samples // 10))
+
+            lat, lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+            conditions = interactor._area_filter(lat, lon, lat + 0.007, lon + 0.011, None)
+            query = select(Violation.id, Violation.latitude, Violation.longitude).where(*conditions)
+            compiled = query.compile(compile_kwargs={"literal_binds": True})
+            result = await session.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}"))
+            report["explain_zoom_17"] = [row[0] for row in result.all()]
+    finally:
+        if not args.keep:
+            async with AsyncSessionLocal() as session:
+                await session.execute(delete(Violation).where(Violation.user_id == user_id))
+                await session.execute(delete(User).where(User.id == user_id))
+                await session.commit()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
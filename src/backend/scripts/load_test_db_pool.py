@@ -0,0 +1,112 @@
+"""
+Load test: database pool health while OCR is slow
+
+Fires concurrent photo uploads at a running backend and, at the same time,
+polls /health (a one-query endpoint) and the db_pool_connections gauge from
+/metrics. When sessions are released around the OCR call, the pool stays
+far below DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW and /health latency
+stays flat even though every upload waits on OCR for seconds.
+
+Point OCR_SERVICE_BASE_URL at a slow OCR instance (or one started with a
+large image set) to reproduce the slow-upstream case.
+
+Usage (from src/backend):
+    python -m scripts.load_test_db_pool --base-url http://localhost:8000 \\
+        --token <access token> --violation-id <draft violation id> --photo car.jpg --concurrency 30
+"""
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import time
+from pathlib import Path
+
+import httpx
+
+CHECKED_OUT_RE = re.compile(r'db_pool_connections\{state="checked_out"\} (\d+)')
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 2)
+
+
+async def upload(client: httpx.AsyncClient, args, photo: bytes) -> tuple[int, float]:
+    start = time.perf_counter()
+    response = await client.post(
+        f"/api/v1/violations/{args.violation_id}/photos",
+        params={"photo_type": "verification"},
+        files={"file": (Path(args.photo).name, photo, "image/jpeg")},
+    )
+    return response.status_code, (time.perf_counter() - start) * 1000
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, health_ms: list, checked_out: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            await client.get("/health")
+            health_ms.append((time.perf_counter() - start) * 1000)
+
+            metrics = await client.get("/metrics")
+            match = CHECKED_OUT_RE.search(metrics.text)
+            if match:
+                checked_out.append(int(match.group(1)))
+        except httpx.HTTPError as e:
+            print(f"Probe failed: {e!r}")
+        await asyncio.sleep(0.2)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True, help="Bearer access token")
+    parser.add_argument("--violation-id", required=True)
+    parser.add_argument("--photo", required=True, help="JPEG photo of a car")
+    parser.add_argument("--concurrency", type=int, default=30)
+    args = parser.parse_args()
+
+    photo = Path(args.photo).read_bytes()
+    headers = {"Authorization": f"Bearer {args.token}"}
+    limits = httpx.Limits(max_connections=args.concurrency + 2)
+
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, timeout=120.0, limits=limits) as client:
+        stop = asyncio.Event()
+        health_ms: list[float] = []
+        checked_out: list[int] = []
+        prober = asyncio.create_task(probe(client, stop, health_ms, checked_out))
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(upload(client, args, photo) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        stop.set()
+        await prober
+
+    statuses: dict[str, int] = {}
+    for code, _ in results:
+        statuses[str(code)] = statuses.get(str(code), 0) + 1
+    upload_ms = [ms for _, ms in results]
+
+    print(json.dumps({
+        "uploads": args.concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "status_codes": statuses,
+        "upload_latency_ms": {"p50": percentile(upload_ms, 50), "p95": percentile(upload_ms, 95)},
+        "health_latency_ms": {
+            "samples": len(health_ms),
+            "mean": round(statistics.mean(health_ms), 2) if health_ms else None,
+            "p95": percentile(health_ms, 95) if health_ms else None,
+            "max": round(max(health_ms), 2) if health_ms else None,
+        },
+        "db_pool_checked_out": {
+            "max": max(checked_out) if checked_out else None,
+            "mean": round(statistics.mean(checked_out), 2) if checked_out else None,
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+"""
+Maintain the monthly partitions of violations and violation_status_history
+
+Creates the partitions of the current month and the next --months-ahead
+months (inserts dated past the last partition fail, there is no default
+partition), then detaches the months older than --retention-months and
+moves them into the archive schema, where they can be dumped and dropped.
+API workers create upcoming partitions at startup too; run this daily from
+cron so a long-running deployment never runs out of them.
+
+Usage (from src/backend):
+    python -m scripts.maintain_partitions
+    python -m scripts.maintain_partitions --months-ahead 6 --retention-months 36
+"""
+import argparse
+import asyncio
+import json
+
+from foundation.partitions import archive_partitions, ensure_partitions
+from settings import settings
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--months-ahead", type=int, default=settings.PARTITION_PREMAKE_MONTHS)
+    parser.add_argument("--retention-months", type=int, default=settings.PARTITION_RETENTION_MONTHS,
+                        help="Archive months older than this (default: keep all)")
+    parser.add_argument("--archive-schema", default=settings.PARTITION_ARCHIVE_SCHEMA)
+    args = parser.parse_args()
+
+    created = await ensure_partitions(args.months_ahead)
+    archived = await archive_partitions(args.retention_months, args.archive_schema)
+
+    print(json.dumps({"created": created, "archived": archived}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+"""
+Precompute the geo risk grid for a city area
+
+Sweeps a bounding box cell by cell, runs the geo service rule-engine check
+(/api/check) for each cell center with bounded concurrency and stores the
+results in the geo_risk_cells table. API workers with GEO_GRID_ENABLED=true
+load the table into memory and answer rule-engine lookups for covered cells
+without calling the geo service.
+
+By default only cells missing or older than GEO_GRID_MAX_AGE_SECONDS are
+computed, so re-running the job on a schedule refreshes stale cells
+incrementally, along with cells invalidated by DELETE
+/api/v1/parking-analysis/cache. --full recomputes every cell of the box.
+
+Usage (from src/backend):
+    python -m scripts.precompute_geo_grid --bbox 50.43 30.50 50.46 30.54
+    python -m scripts.precompute_geo_grid --bbox 50.43 30.50 50.46 30.54 --concurrency 16 --full
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from interactors.geo_grid import precompute_region
+from interactors.parking_analysis import ParkingAnalysisInteractor
+from settings import settings
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--bbox", nargs=4, type=float, required=True, metavar=("MIN_LAT", "MIN_LON", "MAX_LAT", "MAX_LON")
+    )
+    parser.add_argument("--cell-meters", type=float, default=settings.GEO_GRID_CELL_METERS)
+    parser.add_argument("--concurrency", type=int, default=settings.GEO_GRID_SWEEP_CONCURRENCY)
+    parser.add_argument("--max-age", type=int, default=settings.GEO_GRID_MAX_AGE_SECONDS,
+                        help="Skip cells computed within this many seconds")
+    parser.add_argument("--full", action="store_true", help="Recompute every cell, fresh or not")
+    args = parser.parse_args()
+
+    min_lat, min_lon, max_lat, max_lon = args.bbox
+    if min_lat > max_lat or min_lon > max_lon:
+        parser.error("--bbox must be MIN_LAT MIN_LON MAX_LAT MAX_LON")
+
+    interactor = ParkingAnalysisInteractor()
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(timeout=30.0, limits=limits) as client:
+        async def fetch(lat: float, lon: float) -> dict:
+            geo_check = await interactor.fetch_geo_check(client, lat, lon)
+            return geo_check.model_dump()
+
+        started = time.perf_counter()
+        counts = await precompute_region(
+            fetch,
+            min_lat, min_lon, max_lat, max_lon,
+            cell_meters=args.cell_meters,
+            concurrency=args.concurrency,
+            max_age_seconds=None if args.full else args.max_age,
+        )
+        elapsed = time.perf_counter() - started
+
+    print(json.dumps({
+        "bbox": args.bbox,
+        "cell_meters": args.cell_meters,
+        "cells": counts,
+        "elapsed_s": round(elapsed, 2),
+        "cells_per_s": round(counts["computed"] / elapsed, 1) if elapsed else None,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
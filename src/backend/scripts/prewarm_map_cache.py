@@ -0,0 +1,115 @@
+"""
+Pre-warm the on-disk map image cache for known hotspots
+
+Renders the static map for every hotspot through the geo service and stores
+it in MAP_CACHE_DIR, so the first analysis there does not wait for OSM
+tiles. Hotspots come from a JSON file ([[lat, lon], ...]) and/or from the
+location cells with the most violations reported in the last --days.
+Already cached maps are skipped.
+
+Usage (from src/backend):
+    python -m scripts.prewarm_map_cache --from-violations --days 30 --top 500
+    python -m scripts.prewarm_map_cache --hotspots hotspots.json --zoom 17 --image-size 512
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import func, literal, select
+
+from foundation.database import AsyncSessionLocal
+from foundation.models import Violation
+from interactors.map_cache import get_map_store
+from interactors.parking_analysis import ParkingAnalysisInteractor
+from interactors.parking_cache import METERS_PER_DEGREE_LAT, lon_step
+from settings import settings
+
+
+async def violation_hotspots(days: int, top: int) -> list[tuple[float, float]]:
+    """Centers of the location cells with the most violations since `days` ago"""
+    # interactors.parking_cache.location_cell in SQL, so only the top cells leave the database
+    cell_meters = settings.PARKING_CACHE_CELL_METERS
+    lat_step = cell_meters / METERS_PER_DEGREE_LAT
+    rows = select(
+        func.floor(Violation.latitude / lat_step).label("lat_index"),
+        Violation.longitude,
+    ).where(
+        Violation.latitude.is_not(None),
+        Violation.longitude.is_not(None),
+        Violation.created_at >= datetime.utcnow() - timedelta(days=days),
+    ).subquery()
+    center_lat = (rows.c.lat_index + 0.5) * lat_step
+    lon_index = func.floor(rows.c.longitude / (
+        cell_meters / (METERS_PER_DEGREE_LAT * func.greatest(func.cos(func.radians(center_lat)), literal(1e-6)))
+    )).label("lon_index")
+    stmt = (
+        select(rows.c.lat_index, lon_index)
+        .group_by(rows.c.lat_index, lon_index)
+        .order_by(func.count().desc())
+        .limit(top)
+    )
+    async with AsyncSessionLocal() as session:
+        cells = (await session.execute(stmt)).all()
+
+    hotspots = []
+    for lat_index, lon_index in cells:
+        lat = (int(lat_index) + 0.5) * lat_step
+        hotspots.append((lat, (int(lon_index) + 0.5) * lon_step(lat, cell_meters)))
+    return hotspots
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hotspots", help="JSON file with [[lat, lon], ...]")
+    parser.add_argument("--from-violations", action="store_true", help="Use the busiest violation cells")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--top", type=int, default=500)
+    parser.add_argument("--zoom", type=int, nargs="+", default=[17])
+    parser.add_argument("--image-size", type=int, nargs="+", default=[512])
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    points: list[tuple[float, float]] = []
+    if args.hotspots:
+        points += [(lat, lon) for lat, lon in json.loads(Path(args.hotspots).read_text())]
+    if args.from_violations:
+        points += await violation_hotspots(args.days, args.top)
+    if not points:
+        parser.error("give --hotspots and/or --from-violations")
+
+    store = get_map_store()
+    interactor = ParkingAnalysisInteractor()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    counts = {"cached": 0, "rendered": 0, "failed": 0}
+
+    async def warm(lat: float, lon: float, zoom: int, image_size: int):
+        if await store.lookup(lat, lon, zoom, image_size) is not None:
+            counts["cached"] += 1
+            return
+        async with semaphore:
+            try:
+                await interactor.get_map_path(lat, lon, zoom, image_size)
+                counts["rendered"] += 1
+            except Exception as e:
+                counts["failed"] += 1
+                print(f"Failed to render ({lat}, {lon}) z{zoom} {image_size}px: {e!r}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        warm(lat, lon, zoom, image_size)
+        for lat, lon in points for zoom in args.zoom for image_size in args.image_size
+    ))
+
+    print(json.dumps({
+        "hotspots": len(points),
+        "maps": counts,
+        "elapsed_s": round(time.perf_counter() - started, 2),
+        "cache": store.snapshot(),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
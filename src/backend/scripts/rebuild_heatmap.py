@@ -0,0 +1,39 @@
+"""
+Rebuild the violation heatmap counts
+
+Recomputes heatmap_cells from the violations table: every submitted,
+non-duplicate violation counted once per bin at each level served by
+/api/v1/analytics/tiles (HEATMAP_MIN_ZOOM..HEATMAP_MAX_ZOOM). Submits
+keep the table current on their own; run this after changing the zoom
+range or to correct drift (e.g. after deleting violations). Submits wait
+for the rebuild to finish.
+
+Usage (from src/backend):
+    python -m scripts.rebuild_heatmap
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from foundation.database import AsyncSessionLocal
+from interactors.heatmap import HeatmapInteractor, levels
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        bins = await HeatmapInteractor(session).rebuild()
+
+    print(json.dumps({
+        "levels": [levels()[0], levels()[-1]],
+        "bins": bins,
+        "elapsed_s": round(time.perf_counter() - started, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -21,6 +21,14 @@ class Settings(BaseSettings):
     DATABASE_POOL_SIZE: int = 20
     DATABASE_MAX_OVERFLOW: int = 10
 
+    # Read replica (foundation/replica.py): read-only endpoints use it when set
+    DATABASE_READ_URL: Optional[str] = None
+    DATABASE_READ_POOL_SIZE: int = 20
+    DATABASE_READ_MAX_OVERFLOW: int = 10
+    DATABASE_READ_MAX_LAG_SECONDS: float = 5.0  # reads go to the primary while the replica is further behind
+    DATABASE_READ_LAG_CHECK_SECONDS: float = 2.0
+    READ_YOUR_WRITES_SECONDS: int = 10  # a client's reads stay on the primary this long after its own write
+
     # Redis (cache, sessions, rate limiting)
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_CACHE_TTL: int = 3600
@@ -51,6 +59,76 @@ class Settings(BaseSettings):
     OCR_SERVICE_BASE_URL: str = "http://3.79.95.116:5000"
     OCR_CONFIDENCE_THRESHOLD: float = 0.7
     OCR_MODEL_PATH: Optional[str] = None
+    OCR_SERVICE_TRANSPORT: str = "http"  # "http" (multipart/JSON) or "binary" (framed, /recognize_crnn_binary)
+    OCR_BINARY_RAW_PIXELS: bool = False  # binary transport: send raw RGB pixels instead of JPEG
+    OCR_SERVICE_REPLICA_URLS: list[str] = []  # additional OCR replicas, e.g. ["http://10.0.0.2:5000"]
+    OCR_HEDGE_REQUESTS: bool = True  # duplicate slow requests to another replica after p95 latency
+    OCR_LOAD_BALANCING: str = "least_outstanding"  # or "power_of_two"
+    OCR_HEALTH_CHECK_INTERVAL_SECONDS: float = 10.0  # active /health checks of replicas, 0 disables
+    OCR_LATENCY_EJECTION_FACTOR: float = 3.0  # eject a replica this many times slower than the pool median
+    OCR_EJECTION_SECONDS: float = 30.0
+
+    # Parking analysis cache (in-process + Redis + optional Postgres), keyed by location cell
+    CACHE_REDIS_ENABLED: bool = True
+    PARKING_CACHE_ENABLED: bool = True
+    PARKING_CACHE_CELL_METERS: float = 10.0
+    PARKING_CACHE_RULES_TTL: int = 86400  # geo service rule-engine JSON
+    PARKING_CACHE_MAP_TTL: int = 604800  # rendered map PNG
+    PARKING_CACHE_ANALYSIS_TTL: int = 86400  # final OpenAI analysis
+    PARKING_CACHE_MEMORY_TTL: int = 300  # in-process tier, bounds staleness after invalidation
+    PARKING_CACHE_PERSIST: bool = False  # also keep entries in the cache_entries table
+    PARKING_CACHE_GEO_PRUNE_INTERVAL: int = 3600  # seconds between sweeps of expired entries from the Redis GEO indexes
+    ADMIN_API_KEY: Optional[str] = None  # X-Admin-Key for maintenance endpoints (cache invalidation)
+
+    # On-disk cache of rendered map PNGs (scripts/prewarm_map_cache.py fills it for hotspots)
+    MAP_CACHE_ENABLED: bool = True
+    MAP_CACHE_DIR: str = "map_cache"
+    MAP_CACHE_MAX_BYTES: int = 536870912  # 512MB, least recently used maps are evicted beyond it
+
+    # Precomputed geo risk grid (scripts/precompute_geo_grid.py), answers rule-engine checks locally
+    GEO_GRID_ENABLED: bool = False
+    GEO_GRID_CELL_METERS: float = 10.0
+    GEO_GRID_MAX_AGE_SECONDS: int = 604800  # older cells fall back to the geo service
+    GEO_GRID_RELOAD_INTERVAL_SECONDS: float = 300.0  # picks up cells written by a sweep
+    GEO_GRID_SWEEP_CONCURRENCY: int = 8  # geo service checks in flight during a sweep
+
+    # Duplicate reports: same normalised plate, this close in space and time, joins the earlier case
+    DUPLICATE_DETECTION_ENABLED: bool = True
+    DUPLICATE_RADIUS_METERS: float = 50.0
+    DUPLICATE_WINDOW_MINUTES: int = 30
+
+    # Audit trail of mutating requests (foundation/audit.py), written in batches off the request path
+    AUDIT_LOG_ENABLED: bool = True
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500  # rows per INSERT
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 0.5  # longest an event waits for a batch to fill
+    AUDIT_ENQUEUE_TIMEOUT_SECONDS: float = 0.05  # wait for room in a full queue before dropping an event
+    AUDIT_SHUTDOWN_TIMEOUT_SECONDS: float = 5.0  # flush deadline on shutdown
+
+    # Monthly partitions of violations / violation_status_history (foundation/partitions.py)
+    PARTITION_PREMAKE_MONTHS: int = 3  # future months created at startup and by scripts/maintain_partitions.py
+    PARTITION_RETENTION_MONTHS: Optional[int] = None  # older months are detached and archived, None keeps all
+    PARTITION_ARCHIVE_SCHEMA: str = "archive"
+
+    # Violation heatmap tiles (/api/v1/analytics/tiles), counts kept per bin at each zoom in this range;
+    # run scripts/rebuild_heatmap.py after changing it
+    HEATMAP_ENABLED: bool = True
+    HEATMAP_MIN_ZOOM: int = 8
+    HEATMAP_MAX_ZOOM: int = 16
+    HEATMAP_TILE_MAX_AGE_SECONDS: int = 300  # Cache-Control max-age of a tile
+
+    # Verification timer pushed over /violations/{id}/timer-status/stream (interactors/timer_wheel.py)
+    TIMER_STREAM_TICK_SECONDS: int = 1  # countdown events; the expiry is pushed as soon as it happens
+
+    # OpenAI vision calls
+    VISION_ADAPTIVE_DETAIL: bool = True  # low image detail when it loses nothing (small or flat images)
+    LLM_USAGE_PERSIST: bool = True  # store token / latency accounting per call in llm_calls
+
+    # Upstream resilience (OCR, geo service, OpenAI)
+    UPSTREAM_FAILURE_THRESHOLD: int = 5  # consecutive failures that open a circuit
+    UPSTREAM_RESET_TIMEOUT_SECONDS: float = 30.0  # open circuit duration before a half-open probe
+    UPSTREAM_MIN_TIMEOUT_SECONDS: float = 2.0  # floor of the adaptive timeout
+    UPSTREAM_TIMEOUT_MULTIPLIER: float = 3.0  # adaptive timeout = p99 latency * multiplier
 
     # Geolocation
     GEOCODING_PROVIDER: str = "nominatim"
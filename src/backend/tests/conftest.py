@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Import the app's modules the way main.py does, from src/backend
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
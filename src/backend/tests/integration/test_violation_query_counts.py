@@ -0,0 +1,72 @@
+"""
+Statements each violation endpoint sends. The violation aggregate (photos,
+status history) comes from ViolationInteractor.get_violation in one joined
+query plus one SELECT ... IN; a count going up means something is loading
+a relationship or a table on its own again.
+"""
+import pytest
+from foundation.models import ViolationStatus
+
+pytestmark = pytest.mark.asyncio
+
+
+def selects(statements: list[str]) -> list[str]:
+    return [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+
+
+def photo_queries(statements: list[str]) -> list[str]:
+    """SELECTs that read photos on their own, not joined to their violation"""
+    return [s for s in selects(statements) if "FROM photos" in s and "violations" not in s]
+
+
+async def test_violation_detail(client, violation, statements):
+    response = await client.get(f"/api/v1/violations/{violation.id}")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["photos"]) == 3
+    assert len(body["status_history"]) == 2
+    # Violation joined with photos, then history
+    assert len(selects(statements)) == 2
+    assert photo_queries(statements) == []
+
+
+async def test_violation_status(client, violation, statements):
+    response = await client.get(f"/api/v1/violations/{violation.id}/status")
+
+    assert response.status_code == 200
+    assert len(selects(statements)) == 1
+
+
+async def test_evidence_package(client, violation, statements):
+    response = await client.get(f"/api/v1/violations/{violation.id}/evidence")
+
+    assert response.status_code == 200
+    assert len(response.json()["photos"]) == 3
+    assert len(selects(statements)) == 1
+
+
+async def test_violation_pdf(client, violation, statements):
+    response = await client.get(f"/api/v1/reports/violations/{violation.id}/pdf")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    # Violation with photos, then the user
+    assert len(selects(statements)) == 2
+    assert photo_queries(statements) == []
+
+
+async def test_submit_violation(client, violation, statements):
+    response = await client.put(
+        f"/api/v1/violations/{violation.id}/submit",
+        json={"violations": [{
+            "violation_type": "parking_prohibited_zone",
+            "violation_reason": "Parking under a no-parking sign",
+            "violation_code": "152.1",
+        }]},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["status"] == ViolationStatus.SUBMITTED.value
+    # Violation, EXISTS check for an OCR'd photo (no photo rows loaded), refresh after commit
+    assert len(selects(statements)) == 3
@@ -1,6 +1,7 @@
+import hmac
 import random
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 import cv2
 import numpy as np
 import torch
@@ -11,18 +12,30 @@ import traceback
 # CRNN imports
 from models.crnn_model import CRNN
 from utils.image_processor import preprocess_image_hls
-from utils.decoder import ctc_greedy_decode
+from utils.decoder import ctc_greedy_decode_with_char_probs
+from utils.plate_dedup import crop_fingerprint, find_near_duplicate
 
 # OCR imports
 from utils.ocr_processor import OCRProcessor
 from utils.plate_transformer import get_perspective_transform, enhance_for_ocr
 
 # YOLO imports
-from utils.yolo_detector import get_box
+from utils.yolo_detector import get_box, get_box_two_stage
 from ultralytics import YOLO
 import ultralytics
 
 from utils.car_motion import run_yolov8_seg_on_frame_1, detect_car_motion_by_error
+from utils.car_motion import MODEL as vehicle_model
+
+# Observability
+from utils.metrics import StageTimer, stage_metrics
+from utils.profiler import SamplingProfiler
+from utils.runtime_profile import RuntimeProfile
+
+# Internal binary transport
+from utils.frame_protocol import (
+    FRAME_CONTENT_TYPE, FrameError, read_request_frames, decode_frame_image, encode_result_frame
+)
 
 app = Flask(__name__)
 
@@ -31,6 +44,17 @@ UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'bmp'}
 MAX_FILE_SIZE = 16 * 1024 * 1024  # 16 MB
 
+# Plate detection: "two_stage" (coarse pass + high-res re-detection) or "single"
+DETECTION_MODE = os.environ.get('DETECTION_MODE', 'two_stage')
+
+# Profiling: a random fraction of requests given by PROFILE_SAMPLE_RATE (0
+# disables sampling), plus requests sending "X-Profile: <PROFILE_KEY>" (unset
+# disables profiling on request). Only the newest PROFILE_MAX_FILES are kept.
+PROFILE_FOLDER = os.environ.get('PROFILE_FOLDER', 'profiles')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_KEY = os.environ.get('PROFILE_KEY', '')
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', '100'))
+
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 
@@ -48,7 +72,8 @@ STATUS_CODES = {
     6: "Text recognition failed",
     7: "Invalid or corrupted image",
     8: "Model not loaded",
-    9: "Perspective transform failed"
+    9: "Perspective transform failed",
+    10: "Plate crop already processed"
 }
 
 # Global variables for models
@@ -56,6 +81,7 @@ yolo_model = None
 crnn_model = None
 ocr_processor = None
 device = None
+runtime_profile = None
 
 def make_json_serializable(obj):
     """Convert numpy types to Python native types for JSON serialization"""
@@ -92,13 +118,16 @@ def allowed_file(filename):
 
 def initialize_models():
     """Initialize YOLO, CRNN, and OCR models"""
-    global yolo_model, crnn_model, ocr_processor, device
+    global yolo_model, crnn_model, ocr_processor, device, runtime_profile
 
     print_versions()
 
     try:
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        runtime_profile = RuntimeProfile.from_env()
+        runtime_profile.apply()
+        device = runtime_profile.device
         print(f"Using device: {device}")
+        print(f"Runtime profile: {runtime_profile.describe()}")
 
         # Load YOLO model
         yolo_path = 'models/car-plate-best.pt'
@@ -109,6 +138,9 @@ def initialize_models():
         print("-" * 50)
         print(f"Attempting to load YOLO model from path: {yolo_path}")
         yolo_model = YOLO(yolo_path, task='detect')
+        if not runtime_profile.use_gpu:
+            # Ultralytics would otherwise pick any visible GPU on its own
+            yolo_model.overrides['device'] = 'cpu'
         print("YOLO model loaded successfully!")
 
         if hasattr(yolo_model, 'ckpt_path'):
@@ -124,12 +156,12 @@ def initialize_models():
             print("Attempting to load CRNN model...")
             crnn_model = CRNN(img_height=128, num_channels=3, hidden_size=256).to(device)
             crnn_model.load_state_dict(torch.load(crnn_path, map_location=device))
-            crnn_model.eval()
+            crnn_model = runtime_profile.optimize_crnn(crnn_model)
             print("CRNN model loaded successfully")
 
         # Initialize EasyOCR
         print("Initializing EasyOCR processor...")
-        ocr_processor = OCRProcessor(languages=['en'])
+        ocr_processor = OCRProcessor(languages=['en'], gpu=runtime_profile.use_gpu)
         print("EasyOCR initialized successfully")
 
         return True
@@ -152,17 +184,58 @@ def calculate_confidence(logits):
     return round(confidence, 2)
 
 
-def process_plate_image_crnn(image_path):
+def parse_known_hashes(raw):
+    """Parse a comma-separated list of crop fingerprints from a form field"""
+    if not raw:
+        return []
+    return [h.strip() for h in raw.split(',') if h.strip()]
+
+
+def detect_plate(img):
+    """Detect the plate with the configured detection mode"""
+    if DETECTION_MODE == 'single':
+        return get_box(img, yolo_model, conf=0.25)
+    return get_box_two_stage(img, yolo_model, conf=0.25, vehicle_model=vehicle_model)
+
+
+def process_plate_image_crnn(image_path, known_hashes=None, timer=None):
     """
     Process uploaded image using YOLO + CRNN pipeline
 
+    Args:
+        image_path: Path to the uploaded image
+        known_hashes: Fingerprints of plate crops already recognised for the
+            same car. If the detected crop is near-identical to one of them,
+            recognition is skipped and status "SKIPPED" is returned.
+        timer: Optional StageTimer collecting per-stage durations
+
     Returns:
-        dict: Result dictionary with status, code, plate, confidence, and bbox
+        dict: Result dictionary with status, code, plate, confidence, bbox,
+        per-character probabilities and the plate crop fingerprint
     """
-    try:
-        # Read image
+    timer = timer or StageTimer()
+
+    # Read image
+    with timer.stage("decode"):
         img = cv2.imread(image_path)
 
+    return process_plate_array_crnn(img, known_hashes=known_hashes, timer=timer)
+
+
+def process_plate_array_crnn(img, known_hashes=None, timer=None):
+    """
+    YOLO + CRNN pipeline on an already decoded BGR image
+
+    Args:
+        img: BGR image (np.ndarray) or None if decoding failed
+        known_hashes: See process_plate_image_crnn
+        timer: Optional StageTimer collecting per-stage durations
+
+    Returns:
+        dict: Same as process_plate_image_crnn
+    """
+    timer = timer or StageTimer()
+    try:
         if img is None:
             return {
                 "status": "ERROR",
@@ -174,7 +247,8 @@ def process_plate_image_crnn(image_path):
             }
 
         # Detect plate using YOLO
-        plate_img, bbox = get_box(img, yolo_model, conf=0.25)
+        with timer.stage("yolo"):
+            plate_img, bbox = detect_plate(img)
 
         if plate_img is None or bbox is None:
             return {
@@ -186,19 +260,37 @@ def process_plate_image_crnn(image_path):
                 "bbox": None
             }
 
-        # Recognize text using CRNN
-        with torch.no_grad():
-            x = preprocess_image_hls(plate_img, device)
-            logits = crnn_model(x)
+        bbox_dict = {"x1": bbox[0], "y1": bbox[1], "x2": bbox[2], "y2": bbox[3]}
 
-            # Decode text
-            text = ctc_greedy_decode(logits)[0]
+        # Skip recognition if this crop was already read for the same car
+        fingerprint = crop_fingerprint(plate_img)
+        duplicate_of = find_near_duplicate(fingerprint, known_hashes or [])
+        if duplicate_of is not None:
+            return {
+                "status": "SKIPPED",
+                "code": 10,
+                "message": STATUS_CODES[10],
+                "plate": None,
+                "confidence": 0.0,
+                "bbox": bbox_dict,
+                "crop_hash": fingerprint,
+                "duplicate_of": duplicate_of
+            }
+
+        # Recognize text using CRNN
+        with torch.inference_mode():
+            with timer.stage("preprocess"):
+                x = preprocess_image_hls(plate_img, device)
+            with timer.stage("crnn"):
+                logits = crnn_model(x)
 
-            # Calculate confidence
-            confidence = calculate_confidence(logits)
+            # Decode text together with per-character distributions
+            # ("_" is dropped here as in the plain decoder's clean up)
+            with timer.stage("ctc_decode"):
+                text, char_probs = ctc_greedy_decode_with_char_probs(logits)[0]
 
-            # Clean up text
-            text = text.replace("_", "")
+                # Calculate confidence
+                confidence = calculate_confidence(logits)
 
             if len(text) == 0:
                 return {
@@ -207,7 +299,8 @@ def process_plate_image_crnn(image_path):
                     "message": STATUS_CODES[6],
                     "plate": None,
                     "confidence": 0.0,
-                    "bbox": {"x1": bbox[0], "y1": bbox[1], "x2": bbox[2], "y2": bbox[3]}
+                    "bbox": bbox_dict,
+                    "crop_hash": fingerprint
                 }
 
             return {
@@ -216,7 +309,9 @@ def process_plate_image_crnn(image_path):
                 "message": STATUS_CODES[0],
                 "plate": text,
                 "confidence": confidence,
-                "bbox": {"x1": bbox[0], "y1": bbox[1], "x2": bbox[2], "y2": bbox[3]}
+                "bbox": bbox_dict,
+                "char_probs": char_probs,
+                "crop_hash": fingerprint
             }
 
     except Exception as e:
@@ -232,16 +327,22 @@ def process_plate_image_crnn(image_path):
         }
 
 
-def process_plate_image_ocr(image_path):
+def process_plate_image_ocr(image_path, timer=None):
     """
     Process uploaded image using YOLO + EasyOCR pipeline
 
+    Args:
+        image_path: Path to the uploaded image
+        timer: Optional StageTimer collecting per-stage durations
+
     Returns:
         dict: Result dictionary with status, code, plate, confidence, and bbox
     """
+    timer = timer or StageTimer()
     try:
         # Read image
-        img = cv2.imread(image_path)
+        with timer.stage("decode"):
+            img = cv2.imread(image_path)
 
         if img is None:
             return {
@@ -254,7 +355,8 @@ def process_plate_image_ocr(image_path):
             }
 
         # Detect plate using YOLO
-        plate_img, bbox = get_box(img, yolo_model, conf=0.25)
+        with timer.stage("yolo"):
+            plate_img, bbox = detect_plate(img)
 
         if plate_img is None or bbox is None:
             return {
@@ -267,7 +369,8 @@ def process_plate_image_ocr(image_path):
             }
 
         # Apply perspective transformation
-        transformed = get_perspective_transform(plate_img)
+        with timer.stage("perspective"):
+            transformed = get_perspective_transform(plate_img)
 
         if transformed is None:
             # Fallback to original plate if transform fails
@@ -275,10 +378,12 @@ def process_plate_image_ocr(image_path):
             transformed = plate_img
 
         # Enhance for OCR
-        enhanced = enhance_for_ocr(transformed)
+        with timer.stage("enhance"):
+            enhanced = enhance_for_ocr(transformed)
 
         # Recognize text using EasyOCR
-        text, confidence = ocr_processor.read_text_with_confidence(enhanced)
+        with timer.stage("easyocr"):
+            text, confidence = ocr_processor.read_text_with_confidence(enhanced)
 
         if len(text) == 0:
             return {
@@ -312,6 +417,47 @@ def process_plate_image_ocr(image_path):
         }
 
 
+def should_profile():
+    """Decide whether the current request is profiled"""
+    requested = request.headers.get('X-Profile')
+    if PROFILE_KEY and requested and hmac.compare_digest(requested.encode(), PROFILE_KEY.encode()):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def run_pipeline(model_name, pipeline, filepath, timer, **kwargs):
+    """
+    Run a recognition pipeline with stage timing, metrics and optional profiling
+
+    Returns:
+        Result dict with a "timings" field
+    """
+    if should_profile():
+        with SamplingProfiler() as profiler:
+            result = pipeline(filepath, timer=timer, **kwargs)
+        profile_path = profiler.dump(PROFILE_FOLDER, max_files=PROFILE_MAX_FILES)
+        print(f"Profile written to {profile_path}")
+    else:
+        result = pipeline(filepath, timer=timer, **kwargs)
+
+    result["timings"] = dict(timer.timings, total=timer.total_ms())
+    stage_metrics.record(model_name, timer, result["status"])
+    return result
+
+
+def timed_response(result, http_status, timer):
+    """JSON response carrying stage timings in the Server-Timing header"""
+    response = jsonify(result)
+    response.headers['Server-Timing'] = timer.server_timing_header()
+    return response, http_status
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics: per-stage latency histograms for each model"""
+    return Response(stage_metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -323,7 +469,8 @@ def health_check():
         "yolo_loaded": yolo_model is not None,
         "crnn_loaded": crnn_available,
         "ocr_loaded": ocr_processor is not None,
-        "device": str(device) if device else "unknown"
+        "device": str(device) if device else "unknown",
+        "runtime": runtime_profile.describe() if runtime_profile else None
     })
 
 
@@ -382,14 +529,19 @@ def recognize_plate_crnn():
             "bbox": None
         }), 400
 
+    timer = StageTimer()
     try:
         # Save uploaded file
         filename = secure_filename(file.filename)
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        with timer.stage("upload"):
+            file.save(filepath)
 
         # Process image
-        result = process_plate_image_crnn(filepath)
+        known_hashes = parse_known_hashes(request.form.get('known_hashes'))
+        result = run_pipeline(
+            "crnn", process_plate_image_crnn, filepath, timer, known_hashes=known_hashes
+        )
 
         # Clean up uploaded file
         try:
@@ -397,8 +549,8 @@ def recognize_plate_crnn():
         except:
             pass
 
-        http_status = 200 if result["status"] == "OK" else 400
-        return jsonify(result), http_status
+        http_status = 200 if result["status"] in ("OK", "SKIPPED") else 400
+        return timed_response(result, http_status, timer)
 
     except Exception as e:
         return jsonify({
@@ -412,6 +564,56 @@ def recognize_plate_crnn():
 
 
 
+@app.route('/recognize_crnn_binary', methods=['POST'])
+def recognize_plate_crnn_binary():
+    """
+    CRNN plate recognition over the internal binary frame protocol
+
+    Expects:
+        - application/x-ocr-frames body with one or more image frames
+          (see utils/frame_protocol.py)
+
+    Returns:
+        Stream of length-prefixed JSON result frames, one per image, in
+        request order, each written as soon as the image is processed
+    """
+    if yolo_model is None or crnn_model is None:
+        return jsonify({
+            "status": "ERROR",
+            "code": 8,
+            "message": "CRNN model not loaded",
+            "plate": None,
+            "confidence": 0.0,
+            "bbox": None
+        }), 503
+
+    stream = request.stream
+
+    def generate():
+        try:
+            for meta, payload in read_request_frames(stream):
+                timer = StageTimer()
+                with timer.stage("decode"):
+                    img = decode_frame_image(meta, payload)
+
+                result = process_plate_array_crnn(img, known_hashes=meta.get('known_hashes'), timer=timer)
+                result["id"] = meta.get('id')
+                result["timings"] = dict(timer.timings, total=timer.total_ms())
+                stage_metrics.record("crnn_binary", timer, result["status"])
+                yield encode_result_frame(result)
+        except FrameError as e:
+            yield encode_result_frame({
+                "status": "ERROR",
+                "code": 5,
+                "message": f"Invalid frame: {str(e)}",
+                "plate": None,
+                "confidence": 0.0,
+                "bbox": None
+            })
+
+    return Response(stream_with_context(generate()), mimetype=FRAME_CONTENT_TYPE)
+
+
 @app.route('/recognize_ocr', methods=['POST'])
 def recognize_plate_ocr():
     """
@@ -467,14 +669,16 @@ def recognize_plate_ocr():
             "bbox": None
         }), 400
 
+    timer = StageTimer()
     try:
         # Save uploaded file
         filename = secure_filename(file.filename)
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        with timer.stage("upload"):
+            file.save(filepath)
 
         # Process image
-        result = process_plate_image_ocr(filepath)
+        result = run_pipeline("easyocr", process_plate_image_ocr, filepath, timer)
 
         # Clean up uploaded file
         try:
@@ -483,7 +687,7 @@ def recognize_plate_ocr():
             pass
 
         http_status = 200 if result["status"] == "OK" else 400
-        return jsonify(result), http_status
+        return timed_response(result, http_status, timer)
 
     except Exception as e:
         return jsonify({
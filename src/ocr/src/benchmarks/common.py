@@ -0,0 +1,53 @@
+import os
+import resource
+import sys
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+def list_images(directory):
+    """Paths of all supported images in a directory, sorted by name"""
+    return [
+        os.path.join(directory, name)
+        for name in sorted(os.listdir(directory))
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    ]
+
+
+def load_images(directory):
+    """List of (file name, BGR image) for all readable images in a directory"""
+    images = []
+    for path in list_images(directory):
+        img = cv2.imread(path)
+        if img is not None:
+            images.append((os.path.basename(path), img))
+    return images
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def summarize_latencies(latencies_ms):
+    """Throughput and latency percentiles for a list of per-call durations"""
+    if not latencies_ms:
+        return {"calls": 0}
+
+    latencies = np.array(latencies_ms)
+    total_s = latencies.sum() / 1000
+    return {
+        "calls": len(latencies),
+        "throughput_per_s": round(len(latencies) / total_s, 2) if total_s > 0 else 0.0,
+        "latency_ms": {
+            "mean": round(float(latencies.mean()), 2),
+            "p50": round(float(np.percentile(latencies, 50)), 2),
+            "p95": round(float(np.percentile(latencies, 95)), 2),
+            "p99": round(float(np.percentile(latencies, 99)), 2),
+        },
+    }
@@ -0,0 +1,104 @@
+"""
+Recall and latency of single-pass vs two-stage plate detection
+
+Usage (from src/ocr/src):
+    python -m benchmarks.detection_benchmark --images path/to/photos \\
+        [--labels labels.json] [--output detection.json] [--no-vehicle-model]
+
+labels.json maps an image file name to its ground-truth plate box
+{"car1.jpg": [x1, y1, x2, y2], ...}. A detection counts as a hit when its
+IoU with the label is at least 0.5. Without labels, recall is the share of
+images where any plate was detected.
+"""
+import argparse
+import json
+import time
+
+from ultralytics import YOLO
+
+from benchmarks.common import load_images, summarize_latencies
+from utils.yolo_detector import get_box, get_box_two_stage
+
+
+def iou(box_a, box_b):
+    """Intersection over union of two (x1, y1, x2, y2) boxes"""
+    ix1, iy1 = max(box_a[0], box_b[0]), max(box_a[1], box_b[1])
+    ix2, iy2 = min(box_a[2], box_b[2]), min(box_a[3], box_b[3])
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    area_a = (box_a[2] - box_a[0]) * (box_a[3] - box_a[1])
+    area_b = (box_b[2] - box_b[0]) * (box_b[3] - box_b[1])
+    union = area_a + area_b - inter
+    return inter / union if union > 0 else 0.0
+
+
+def run_detector(name, detect, images, labels):
+    latencies = []
+    hits = 0
+
+    for filename, img in images:
+        start = time.perf_counter()
+        _, bbox = detect(img)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        if bbox is None:
+            continue
+        if filename in labels:
+            hits += iou(bbox, labels[filename]) >= 0.5
+        else:
+            hits += 1
+
+    return {
+        "detector": name,
+        "images": len(images),
+        "recall": round(hits / len(images), 4) if images else 0.0,
+        **summarize_latencies(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', required=True, help='Directory with test photos')
+    parser.add_argument('--labels', help='JSON file with ground-truth plate boxes')
+    parser.add_argument('--model', default='models/car-plate-best.pt', help='YOLO plate model')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    parser.add_argument('--no-vehicle-model', action='store_true', help='Skip the COCO vehicle proposal pass')
+    args = parser.parse_args()
+
+    images = load_images(args.images)
+
+    labels = {}
+    if args.labels:
+        with open(args.labels) as f:
+            labels = json.load(f)
+
+    plate_model = YOLO(args.model, task='detect')
+    vehicle_model = None
+    if not args.no_vehicle_model:
+        from utils.car_motion import MODEL as vehicle_model
+
+    # Warm up both paths so model initialisation is not measured
+    if images:
+        get_box(images[0][1], plate_model)
+        get_box_two_stage(images[0][1], plate_model, vehicle_model=vehicle_model)
+
+    report = {
+        "results": [
+            run_detector("single_pass", lambda img: get_box(img, plate_model), images, labels),
+            run_detector(
+                "two_stage",
+                lambda img: get_box_two_stage(img, plate_model, vehicle_model=vehicle_model),
+                images,
+                labels,
+            ),
+        ]
+    }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
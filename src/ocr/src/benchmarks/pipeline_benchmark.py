@@ -0,0 +1,174 @@
+"""
+Benchmark and regression check for the plate recognition pipeline
+
+Runs the full process_plate_image_crnn / process_plate_image_ocr pipelines
+and each stage (get_box, get_perspective_transform, preprocess_image_hls,
+CRNN forward, CTC decode) over a directory of images and reports
+throughput, p50/p95/p99 latency and peak RSS as JSON.
+
+Usage (from src/ocr/src):
+    python -m benchmarks.pipeline_benchmark --images path/to/photos --output report.json
+    python -m benchmarks.pipeline_benchmark --images path/to/photos --save-baseline benchmarks/baseline.json
+    python -m benchmarks.pipeline_benchmark --images path/to/photos --baseline benchmarks/baseline.json
+
+With --baseline the script exits with status 1 if any benchmark's p95
+latency grew, or its throughput dropped, by more than --tolerance
+(default 20%) compared with the stored baseline, and with status 2 if the
+baseline file is missing. Only the JSON report goes to stdout: progress,
+verdicts and whatever model loading and the pipelines print go to stderr.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+import torch
+
+import app
+from benchmarks.common import list_images, load_images, peak_rss_mb, summarize_latencies
+from utils.decoder import ctc_greedy_decode_with_char_probs
+from utils.image_processor import preprocess_image_hls
+from utils.plate_transformer import get_perspective_transform
+from utils.yolo_detector import get_box
+
+
+def time_calls(fn, inputs, repeat=1):
+    """Call fn on every input `repeat` times and return per-call durations in ms"""
+    latencies = []
+    for _ in range(repeat):
+        for item in inputs:
+            start = time.perf_counter()
+            fn(item)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def benchmark(name, fn, inputs, repeat):
+    if not inputs:
+        return {"name": name, "calls": 0}
+
+    # Warm-up call so lazy initialisation is not measured
+    fn(inputs[0])
+    result = {"name": name, **summarize_latencies(time_calls(fn, inputs, repeat))}
+    result["peak_rss_mb"] = peak_rss_mb()
+    print(f"{name}: {result.get('throughput_per_s')} /s, p95={result.get('latency_ms', {}).get('p95')} ms", file=sys.stderr)
+    return result
+
+
+def run_benchmarks(image_dir, repeat):
+    paths = list_images(image_dir)
+    images = [img for _, img in load_images(image_dir)]
+
+    results = []
+
+    # Full pipelines
+    if app.crnn_model is not None:
+        results.append(benchmark("pipeline_crnn", app.process_plate_image_crnn, paths, repeat))
+    results.append(benchmark("pipeline_ocr", app.process_plate_image_ocr, paths, repeat))
+
+    # Individual stages
+    results.append(benchmark("get_box", lambda img: get_box(img, app.yolo_model, conf=0.25), images, repeat))
+
+    crops = [crop for crop, _ in (get_box(img, app.yolo_model, conf=0.25) for img in images) if crop is not None]
+    results.append(benchmark("get_perspective_transform", get_perspective_transform, crops, repeat))
+    results.append(benchmark(
+        "preprocess_image_hls", lambda crop: preprocess_image_hls(crop, app.device), crops, repeat
+    ))
+
+    if app.crnn_model is not None:
+        tensors = [preprocess_image_hls(crop, app.device) for crop in crops]
+        with torch.inference_mode():
+            results.append(benchmark("crnn_forward", app.crnn_model, tensors, repeat))
+            logits = [app.crnn_model(x) for x in tensors]
+        results.append(benchmark("ctc_decode", ctc_greedy_decode_with_char_probs, logits, repeat))
+
+    return {
+        "images": len(paths),
+        "plates_detected": len(crops),
+        "repeat": repeat,
+        "device": str(app.device),
+        "torch_threads": torch.get_num_threads(),
+        "peak_rss_mb": peak_rss_mb(),
+        "results": results,
+    }
+
+
+def compare_with_baseline(report, baseline, tolerance):
+    """
+    Returns:
+        List of human readable regression descriptions (empty if none)
+    """
+    baseline_results = {r["name"]: r for r in baseline.get("results", [])}
+    regressions = []
+
+    for result in report["results"]:
+        base = baseline_results.get(result["name"])
+        if not base or not result.get("calls") or not base.get("calls"):
+            continue
+
+        p95, base_p95 = result["latency_ms"]["p95"], base["latency_ms"]["p95"]
+        if base_p95 > 0 and p95 > base_p95 * (1 + tolerance):
+            regressions.append(f"{result['name']}: p95 {base_p95} -> {p95} ms")
+
+        tput, base_tput = result["throughput_per_s"], base["throughput_per_s"]
+        if base_tput > 0 and tput < base_tput * (1 - tolerance):
+            regressions.append(f"{result['name']}: throughput {base_tput} -> {tput} /s")
+
+    base_rss = baseline.get("peak_rss_mb")
+    if base_rss and report["peak_rss_mb"] > base_rss * (1 + tolerance):
+        regressions.append(f"peak RSS {base_rss} -> {report['peak_rss_mb']} MB")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', required=True, help='Directory with test photos')
+    parser.add_argument('--repeat', type=int, default=3, help='Passes over the image set per benchmark')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    parser.add_argument('--baseline', help='Compare against this stored report')
+    parser.add_argument('--save-baseline', help='Store this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative regression (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    # Checked before the run: a gate that cannot compare must not pass
+    if args.baseline and not os.path.exists(args.baseline):
+        print(f"ERROR: Baseline {args.baseline} not found", file=sys.stderr)
+        sys.exit(2)
+
+    # app prints versions and pipeline warnings to stdout, which must stay JSON only
+    with contextlib.redirect_stdout(sys.stderr):
+        if not app.initialize_models():
+            print("ERROR: Failed to load models", file=sys.stderr)
+            sys.exit(2)
+
+        report = run_benchmarks(args.images, args.repeat)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            f.write(output)
+        print(f"Baseline saved to {args.save_baseline}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        regressions = compare_with_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print("Performance regressions detected:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  - {regression}", file=sys.stderr)
+            sys.exit(1)
+        print("No regressions compared to baseline", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
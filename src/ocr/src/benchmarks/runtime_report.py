@@ -0,0 +1,82 @@
+"""
+Print the effective OCR runtime profile and measured throughput per thread setting
+
+Usage (from src/ocr/src):
+    python -m benchmarks.runtime_report [--threads 1,2,4] [--iterations 50] [--output runtime.json]
+
+For every thread count the CRNN forward pass and the HLS preprocessing are
+timed on a synthetic plate crop (weights do not affect speed). Run it with
+the same OCR_WORKERS / *_THREADS environment as the service to see what a
+worker actually gets; run several copies in parallel to see the effect of
+oversubscription.
+"""
+import argparse
+import json
+import time
+
+import cv2
+import numpy as np
+import torch
+
+from benchmarks.common import summarize_latencies
+from models.crnn_model import CRNN
+from utils.image_processor import preprocess_image_hls
+from utils.runtime_profile import RuntimeProfile
+
+
+def measure(fn, iterations):
+    fn()  # warm-up
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return summarize_latencies(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', default=None, help='Comma-separated thread counts to try')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    profile = RuntimeProfile.from_env()
+    profile.apply()
+    effective = profile.describe()
+
+    print("Effective runtime profile:")
+    for key, value in effective.items():
+        print(f"  {key}: {value}")
+
+    thread_counts = [int(t) for t in args.threads.split(',')] if args.threads else sorted(
+        {1, 2, profile.intra_op_threads, profile.cores}
+    )
+
+    model = profile.optimize_crnn(CRNN(img_height=128, num_channels=3, hidden_size=256).to(profile.device))
+    crop = np.random.randint(0, 255, (60, 260, 3), dtype=np.uint8)
+    x = preprocess_image_hls(crop, profile.device)
+
+    settings = []
+    for threads in thread_counts:
+        torch.set_num_threads(threads)
+        cv2.setNumThreads(threads)
+        with torch.inference_mode():
+            crnn = measure(lambda: model(x), args.iterations)
+        preprocess = measure(lambda: preprocess_image_hls(crop, profile.device), args.iterations)
+        settings.append({"threads": threads, "crnn_forward": crnn, "preprocess_image_hls": preprocess})
+
+        print(
+            f"threads={threads:>3}  crnn {crnn['throughput_per_s']:>8} /s "
+            f"(p95 {crnn['latency_ms']['p95']} ms)  "
+            f"preprocess {preprocess['throughput_per_s']:>8} /s"
+        )
+
+    report = {"effective": effective, "settings": settings}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
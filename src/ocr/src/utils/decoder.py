@@ -125,4 +125,56 @@ def calculate_sequence_confidence(logits):
     # Average confidence across all timesteps and batch
     confidence = torch.mean(max_probs).item()
 
-    return confidence
\ No newline at end of file
+    return confidence
+
+def ctc_greedy_decode_with_char_probs(logits, skip_chars="_"):
+    """
+    Greedy CTC decoder that also returns a probability distribution per
+    decoded character.
+
+    Each emitted character corresponds to a run of consecutive timesteps with
+    the same argmax class. The distribution for that character is the mean of
+    the softmax over the run, restricted to non-blank classes and renormalised,
+    so observations of the same plate from several frames can be combined
+    position by position.
+
+    Args:
+        logits: Tensor of shape (T, B, C)
+        skip_chars: Characters to drop from the output (and their distributions)
+
+    Returns:
+        List (length B) of tuples (text, char_probs) where char_probs is a list
+        of per-character probability lists ordered as ALPHABET
+    """
+    probs = F.softmax(logits, dim=2)  # (T, B, C)
+    max_indices = probs.argmax(dim=2)  # (T, B)
+
+    T, B = max_indices.shape
+    results = []
+
+    for b in range(B):
+        chars = []
+        char_probs = []
+        run_idx = BLANK_IDX
+        run_start = 0
+
+        for t in range(T + 1):
+            idx = int(max_indices[t, b]) if t < T else BLANK_IDX
+            if t < T and idx == run_idx:
+                continue
+
+            # Close the previous run of a non-blank class
+            if run_idx != BLANK_IDX:
+                char = idx_to_char.get(run_idx, "?")
+                if char not in skip_chars:
+                    run_probs = probs[run_start:t, b, 1:].mean(dim=0)
+                    run_probs = run_probs / run_probs.sum().clamp_min(1e-8)
+                    chars.append(char)
+                    char_probs.append([round(float(p), 4) for p in run_probs])
+
+            run_idx = idx
+            run_start = t
+
+        results.append(("".join(chars), char_probs))
+
+    return results
@@ -0,0 +1,107 @@
+"""
+Length-prefixed binary frames for the internal backend <-> OCR transport
+
+Request body (Content-Type: application/x-ocr-frames) is a sequence of frames:
+
+    uint32 meta_len | uint32 payload_len | meta (UTF-8 JSON) | payload (bytes)
+
+meta describes the payload:
+    {"id": "...", "encoding": "jpeg" | "png" | "rgb" | "bgr",
+     "width": W, "height": H,            # required for raw rgb/bgr pixels
+     "known_hashes": ["..."]}            # optional, see /recognize_crnn
+
+The response body is a stream of result frames, written as soon as each
+image is processed:
+
+    uint32 result_len | result (UTF-8 JSON, same fields as /recognize_crnn plus "id")
+
+All integers are big-endian.
+"""
+import json
+import struct
+
+import cv2
+import numpy as np
+
+FRAME_CONTENT_TYPE = 'application/x-ocr-frames'
+
+_REQUEST_HEADER = struct.Struct('>II')
+_RESULT_HEADER = struct.Struct('>I')
+
+
+class FrameError(ValueError):
+    """Malformed or truncated frame"""
+
+
+def _read_exact(stream, size):
+    data = b''
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def read_request_frames(stream):
+    """
+    Iterate over (meta, payload) frames of a request body stream
+
+    Raises:
+        FrameError: on a truncated or malformed frame
+    """
+    while True:
+        header = _read_exact(stream, _REQUEST_HEADER.size)
+        if not header:
+            return
+        if len(header) < _REQUEST_HEADER.size:
+            raise FrameError("Truncated frame header")
+
+        meta_len, payload_len = _REQUEST_HEADER.unpack(header)
+        meta_bytes = _read_exact(stream, meta_len)
+        payload = _read_exact(stream, payload_len)
+        if len(meta_bytes) < meta_len or len(payload) < payload_len:
+            raise FrameError("Truncated frame body")
+
+        try:
+            meta = json.loads(meta_bytes.decode('utf-8')) if meta_len else {}
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise FrameError(f"Invalid frame metadata: {e}")
+        if not isinstance(meta, dict):
+            raise FrameError("Frame metadata must be a JSON object")
+
+        yield meta, payload
+
+
+def decode_frame_image(meta, payload):
+    """
+    Decode a frame payload into a BGR image
+
+    Returns:
+        BGR np.ndarray or None if the payload cannot be decoded
+
+    Raises:
+        FrameError: if raw pixels come without a positive integer width and height
+    """
+    encoding = meta.get('encoding', 'jpeg')
+
+    if encoding in ('rgb', 'bgr'):
+        width, height = meta.get('width'), meta.get('height')
+        for name, value in (('width', width), ('height', height)):
+            # bool is an int subclass, but true/false is not a size
+            if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+                raise FrameError(f"Raw {encoding} frame needs a positive integer {name}, got {value!r}")
+        if len(payload) != width * height * 3:
+            return None
+        img = np.frombuffer(payload, np.uint8).reshape(height, width, 3)
+        if encoding == 'rgb':
+            img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+        return img
+
+    return cv2.imdecode(np.frombuffer(payload, np.uint8), cv2.IMREAD_COLOR)
+
+
+def encode_result_frame(result):
+    """Serialize one result dict as a length-prefixed frame"""
+    body = json.dumps(result, separators=(',', ':')).encode('utf-8')
+    return _RESULT_HEADER.pack(len(body)) + body
@@ -0,0 +1,104 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Histogram bucket upper bounds in milliseconds
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class StageTimer:
+    """
+    Collects wall-clock durations of the pipeline stages of one request
+
+    Usage:
+        timer = StageTimer()
+        with timer.stage("yolo"):
+            ...
+        timer.timings  # {"yolo": 12.31}
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            # Stages that run more than once (e.g. tiles) are summed
+            self.timings[name] = round(self.timings.get(name, 0.0) + elapsed_ms, 2)
+
+    def total_ms(self) -> float:
+        return round((time.perf_counter() - self._start) * 1000, 2)
+
+    def server_timing_header(self) -> str:
+        """Format timings for the standard Server-Timing response header"""
+        parts = [f"{name};dur={ms}" for name, ms in self.timings.items()]
+        parts.append(f"total;dur={self.total_ms()}")
+        return ", ".join(parts)
+
+
+class Histogram:
+    """Cumulative latency histogram in the Prometheus exposition model"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class StageMetrics:
+    """Thread-safe registry of per-stage, per-model latency histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[tuple, Histogram] = {}
+        self._requests: Dict[tuple, int] = {}
+
+    def record(self, model: str, timer: StageTimer, status: Optional[str] = None):
+        with self._lock:
+            for stage, ms in list(timer.timings.items()) + [("total", timer.total_ms())]:
+                key = (stage, model)
+                if key not in self._histograms:
+                    self._histograms[key] = Histogram()
+                self._histograms[key].observe(ms)
+
+            request_key = (model, status or "unknown")
+            self._requests[request_key] = self._requests.get(request_key, 0) + 1
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in Prometheus text exposition format"""
+        lines = [
+            "# HELP ocr_stage_duration_ms Duration of OCR pipeline stages in milliseconds",
+            "# TYPE ocr_stage_duration_ms histogram",
+        ]
+        with self._lock:
+            for (stage, model), hist in sorted(self._histograms.items()):
+                labels = f'stage="{stage}",model="{model}"'
+                for bound, count in zip(hist.buckets, hist.counts):
+                    lines.append(f'ocr_stage_duration_ms_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'ocr_stage_duration_ms_bucket{{{labels},le="+Inf"}} {hist.count}')
+                lines.append(f"ocr_stage_duration_ms_sum{{{labels}}} {round(hist.sum, 2)}")
+                lines.append(f"ocr_stage_duration_ms_count{{{labels}}} {hist.count}")
+
+            lines.append("# HELP ocr_requests_total Recognition requests by model and result status")
+            lines.append("# TYPE ocr_requests_total counter")
+            for (model, status), count in sorted(self._requests.items()):
+                lines.append(f'ocr_requests_total{{model="{model}",status="{status}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+
+stage_metrics = StageMetrics()
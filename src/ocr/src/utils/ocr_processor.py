@@ -1,5 +1,6 @@
 import cv2
 import numpy as np
+import torch
 import easyocr
 from typing import List, Dict, Tuple, Optional
 
@@ -7,14 +8,15 @@ from typing import List, Dict, Tuple, Optional
 class OCRProcessor:
     """EasyOCR processor for license plate text recognition"""
 
-    def __init__(self, languages=['en']):
+    def __init__(self, languages=['en'], gpu=True):
         """
         Initialize EasyOCR reader
 
         Args:
             languages: List of languages for OCR (default: ['en'])
+            gpu: Use the GPU if available (EasyOCR's CPU path is used otherwise)
         """
-        self.reader = easyocr.Reader(languages, gpu=True)
+        self.reader = easyocr.Reader(languages, gpu=gpu)
 
     def read_text(self, image: np.ndarray) -> str:
         """
@@ -26,7 +28,8 @@ class OCRProcessor:
         Returns:
             Extracted text string
         """
-        result = self.reader.readtext(image, detail=0)
+        with torch.inference_mode():
+            result = self.reader.readtext(image, detail=0)
         text = ''.join(result)
         text = text.upper().replace(' ', '')
         return text
@@ -41,7 +44,8 @@ class OCRProcessor:
         Returns:
             Tuple of (text, average_confidence)
         """
-        result = self.reader.readtext(image, detail=1)
+        with torch.inference_mode():
+            result = self.reader.readtext(image, detail=1)
 
         if not result:
             return "", 0.0
@@ -69,7 +73,8 @@ class OCRProcessor:
         Returns:
             List of dictionaries containing char, prob, and bbox for each character
         """
-        result = self.reader.readtext(image, detail=1)
+        with torch.inference_mode():
+            result = self.reader.readtext(image, detail=1)
         extracted = []
 
         for bbox, text, prob in result:
@@ -0,0 +1,67 @@
+import cv2
+import numpy as np
+from typing import Iterable, Optional
+
+# Max number of differing bits for two crops to be considered the same plate view
+DUPLICATE_HAMMING_THRESHOLD = 6
+
+
+def crop_fingerprint(plate_bgr: np.ndarray) -> Optional[str]:
+    """
+    Compute a 64-bit difference hash (dHash) of a plate crop
+
+    The crop is reduced to a 9x8 grayscale thumbnail and each bit encodes
+    whether a pixel is brighter than its right neighbour. Near-identical crops
+    (same plate, same angle, small lighting/JPEG differences) end up within a
+    few bits of each other.
+
+    Args:
+        plate_bgr: Cropped plate image (BGR)
+
+    Returns:
+        16-character hex string, or None for an empty crop
+    """
+    if plate_bgr is None or plate_bgr.size == 0:
+        return None
+
+    gray = cv2.cvtColor(plate_bgr, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+
+    return f"{value:016x}"
+
+
+def hamming_distance(hash_a: str, hash_b: str) -> int:
+    """Number of differing bits between two hex fingerprints"""
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count("1")
+
+
+def find_near_duplicate(fingerprint: str, known: Iterable[str],
+                        threshold: int = DUPLICATE_HAMMING_THRESHOLD) -> Optional[str]:
+    """
+    Find an already processed crop that is near-identical to this one
+
+    Args:
+        fingerprint: Fingerprint of the current crop
+        known: Fingerprints of crops that were already recognised
+        threshold: Max Hamming distance to count as a duplicate
+
+    Returns:
+        The matching known fingerprint, or None
+    """
+    if not fingerprint:
+        return None
+
+    for other in known:
+        try:
+            if hamming_distance(fingerprint, other) <= threshold:
+                return other
+        except ValueError:
+            # Ignore malformed fingerprints sent by the client
+            continue
+
+    return None
@@ -0,0 +1,95 @@
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Optional
+
+
+class SamplingProfiler:
+    """
+    Minimal wall-clock sampling profiler for a single request thread
+
+    A background thread snapshots the target thread's Python stack every
+    `interval` seconds. The result is written in the "folded stacks" format
+    (`frame;frame;frame count` per line) understood by flamegraph.pl,
+    speedscope and inferno.
+
+    Usage:
+        with SamplingProfiler() as profiler:
+            ...
+        path = profiler.dump("profiles", max_files=100)
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+    def dump(self, directory: str, name: Optional[str] = None, max_files: Optional[int] = None) -> str:
+        """
+        Write collected samples to a .folded file
+
+        Args:
+            max_files: Keep at most this many .folded files in `directory`,
+                deleting the oldest
+
+        Returns:
+            Path of the written profile
+        """
+        os.makedirs(directory, exist_ok=True)
+        name = name or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        path = os.path.join(directory, f"{name}.folded")
+        with open(path, "w") as f:
+            f.write(self.folded() + "\n")
+        if max_files is not None:
+            prune_profiles(directory, max_files)
+        return path
+
+
+def prune_profiles(directory: str, max_files: int):
+    """Delete the oldest .folded files beyond `max_files`"""
+    paths = [os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(".folded")]
+    paths.sort(key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0)
+    for path in paths[:max(0, len(paths) - max_files)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
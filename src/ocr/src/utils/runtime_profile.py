@@ -0,0 +1,106 @@
+import os
+from typing import Optional
+
+import cv2
+import torch
+
+
+def _env_int(name: str, default: Optional[int] = None) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.environ.get(name)
+    if value in (None, ""):
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+class RuntimeProfile:
+    """
+    Thread and device configuration of one OCR worker process
+
+    Several workers on the same host must split the cores between them,
+    otherwise every worker starts one PyTorch and one OpenCV thread per core
+    and they oversubscribe the CPU. Defaults are derived from the number of
+    cores and OCR_WORKERS; every value can be overridden via environment:
+
+        OCR_WORKERS              workers per host (default 1)
+        TORCH_INTRA_OP_THREADS   threads inside one op (default cores / workers)
+        TORCH_INTER_OP_THREADS   threads across independent ops (default 1)
+        OPENCV_THREADS           OpenCV threads (default 1 with several workers)
+        FORCE_CPU                ignore an available GPU
+        CRNN_DYNAMIC_QUANT       int8 dynamic quantization of CRNN LSTM/Linear on CPU
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        intra_op_threads: Optional[int] = None,
+        inter_op_threads: int = 1,
+        opencv_threads: Optional[int] = None,
+        force_cpu: bool = False,
+        dynamic_quantization: bool = False,
+    ):
+        cores = os.cpu_count() or 1
+        self.cores = cores
+        self.workers = max(1, workers)
+        self.intra_op_threads = intra_op_threads or max(1, cores // self.workers)
+        self.inter_op_threads = max(1, inter_op_threads)
+        if opencv_threads is None:
+            opencv_threads = 1 if self.workers > 1 else self.intra_op_threads
+        self.opencv_threads = opencv_threads
+        self.use_gpu = torch.cuda.is_available() and not force_cpu
+        self.dynamic_quantization = dynamic_quantization and not self.use_gpu
+
+    @classmethod
+    def from_env(cls) -> "RuntimeProfile":
+        return cls(
+            workers=_env_int("OCR_WORKERS", 1),
+            intra_op_threads=_env_int("TORCH_INTRA_OP_THREADS"),
+            inter_op_threads=_env_int("TORCH_INTER_OP_THREADS", 1),
+            opencv_threads=_env_int("OPENCV_THREADS"),
+            force_cpu=_env_bool("FORCE_CPU"),
+            dynamic_quantization=_env_bool("CRNN_DYNAMIC_QUANT"),
+        )
+
+    @property
+    def device(self) -> torch.device:
+        return torch.device("cuda" if self.use_gpu else "cpu")
+
+    def apply(self):
+        """Apply thread settings to PyTorch and OpenCV for this process"""
+        torch.set_num_threads(self.intra_op_threads)
+        try:
+            torch.set_num_interop_threads(self.inter_op_threads)
+        except RuntimeError:
+            # Can only be set once, before any inter-op parallel work started
+            print("Warning: inter-op threads already initialised, keeping current value")
+
+        cv2.setNumThreads(self.opencv_threads)
+
+        if not self.use_gpu:
+            # Denormal floats are very slow on x86 CPUs and irrelevant for inference
+            torch.set_flush_denormal(True)
+
+    def optimize_crnn(self, model: torch.nn.Module) -> torch.nn.Module:
+        """Return the CRNN model prepared for the selected device"""
+        model.eval()
+        if self.dynamic_quantization:
+            model = torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.LSTM, torch.nn.Linear}, dtype=torch.qint8
+            )
+        return model
+
+    def describe(self) -> dict:
+        """Effective configuration, as reported by /health and the report command"""
+        return {
+            "device": str(self.device),
+            "cores": self.cores,
+            "workers": self.workers,
+            "torch_intra_op_threads": torch.get_num_threads(),
+            "torch_inter_op_threads": torch.get_num_interop_threads(),
+            "opencv_threads": cv2.getNumThreads(),
+            "crnn_dynamic_quantization": self.dynamic_quantization,
+        }
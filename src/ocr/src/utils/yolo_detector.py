@@ -166,4 +166,160 @@ def draw_detections(img_bgr: np.ndarray, detections: list, texts: list = None):
             1
         )
 
-    return img_copy
\ No newline at end of file
+    return img_copy
+
+# Two-stage detection defaults
+TWO_STAGE_MIN_SIDE = 1280     # below this a single 640 pass already sees enough pixels
+TILE_MIN_SIDE = 2560          # sliding tiles are only used for inputs at least this large
+TILE_SIZE = 1280
+TILE_OVERLAP = 0.2
+MAX_CANDIDATES = 3
+VEHICLE_CLASSES = [2, 5, 7]   # COCO car, bus, truck
+
+
+def _predict_boxes(model: YOLO, source, conf: float, imgsz: int = 640, classes=None):
+    """
+    Run YOLO on one image or a list of images
+
+    Returns:
+        List (one per image) of (boxes_xyxy, confidences) numpy arrays
+    """
+    kwargs = {"source": source, "imgsz": imgsz, "conf": conf, "verbose": False}
+    if classes is not None:
+        kwargs["classes"] = classes
+    results = model.predict(**kwargs)
+
+    out = []
+    for res in results:
+        if res.boxes is None or len(res.boxes) == 0:
+            out.append((np.zeros((0, 4)), np.zeros((0,))))
+        else:
+            out.append((res.boxes.xyxy.cpu().numpy(), res.boxes.conf.cpu().numpy()))
+    return out
+
+
+def _expand_region(box, w_img: int, h_img: int, scale: float, min_side: int):
+    """Grow a box around its centre (at least min_side) and clip it to the image"""
+    x1, y1, x2, y2 = box
+    cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+    half_w = max((x2 - x1) * scale, min_side) / 2
+    half_h = max((y2 - y1) * scale, min_side) / 2
+    return (
+        int(max(0, cx - half_w)),
+        int(max(0, cy - half_h)),
+        int(min(w_img, cx + half_w)),
+        int(min(h_img, cy + half_h)),
+    )
+
+
+def _tile_regions(w_img: int, h_img: int, tile: int = TILE_SIZE, overlap: float = TILE_OVERLAP):
+    """Sliding window regions covering the whole image"""
+    step = max(1, int(tile * (1 - overlap)))
+    xs = list(range(0, max(w_img - tile, 0) + 1, step))
+    ys = list(range(0, max(h_img - tile, 0) + 1, step))
+    if xs[-1] + tile < w_img:
+        xs.append(w_img - tile)
+    if ys[-1] + tile < h_img:
+        ys.append(h_img - tile)
+    return [(x, y, min(x + tile, w_img), min(y + tile, h_img)) for y in ys for x in xs]
+
+
+def _refine_in_regions(img_bgr: np.ndarray, model: YOLO, regions: list, conf: float, imgsz: int):
+    """
+    Re-detect plates inside full-resolution regions (batched)
+
+    Returns:
+        List of (x1, y1, x2, y2, confidence) in full-image coordinates
+    """
+    crops = [img_bgr[y1:y2, x1:x2] for x1, y1, x2, y2 in regions]
+    crops_and_regions = [(c, r) for c, r in zip(crops, regions) if c.size > 0]
+    if not crops_and_regions:
+        return []
+
+    predictions = _predict_boxes(model, [c for c, _ in crops_and_regions], conf, imgsz=imgsz)
+
+    detections = []
+    for (_, (rx1, ry1, _, _)), (boxes, confs) in zip(crops_and_regions, predictions):
+        for (x1, y1, x2, y2), c in zip(boxes, confs):
+            detections.append((x1 + rx1, y1 + ry1, x2 + rx1, y2 + ry1, float(c)))
+    return detections
+
+
+def get_box_two_stage(
+        img_bgr: np.ndarray,
+        model: YOLO,
+        conf: float = 0.25,
+        vehicle_model: YOLO = None,
+        refine_imgsz: int = 640,
+        use_tiles: bool = True,
+):
+    """
+    Detect license plate in a high-resolution image in two stages
+
+    1. Coarse pass over the whole image at imgsz=640 (plates, with a lower
+       threshold, and vehicles if a vehicle model is given).
+    2. High-resolution re-detection only inside the top candidate regions,
+       cropped from the original image. If it finds nothing, the best
+       coarse plate is kept when it already clears `conf`.
+
+    If the coarse pass finds nothing and the image is very large, sliding
+    tiles are used as a fallback. Compute therefore scales with the number
+    of candidates rather than with image size. Small images go straight to
+    the single-pass get_box.
+
+    Args:
+        img_bgr: Image in OpenCV format (BGR, np.ndarray)
+        model: YOLO plate detection model
+        conf: Minimum confidence threshold for the final detection
+        vehicle_model: Optional COCO YOLO model used to propose vehicle regions
+        refine_imgsz: Inference size for the re-detection pass
+        use_tiles: Allow the sliding-tile fallback
+
+    Returns:
+        Same as get_box: (cropped_plate, bbox) or (None, None)
+    """
+    h_img, w_img = img_bgr.shape[:2]
+    if max(h_img, w_img) < TWO_STAGE_MIN_SIDE:
+        return get_box(img_bgr, model, conf=conf)
+
+    # Stage 1: coarse candidates
+    plate_boxes, plate_confs = _predict_boxes(model, img_bgr, conf=conf / 2)[0]
+    order = np.argsort(-plate_confs)[:MAX_CANDIDATES]
+    regions = [
+        _expand_region(plate_boxes[i], w_img, h_img, scale=3.0, min_side=refine_imgsz // 2)
+        for i in order
+    ]
+
+    if len(regions) < MAX_CANDIDATES and vehicle_model is not None:
+        car_boxes, car_confs = _predict_boxes(
+            vehicle_model, img_bgr, conf=0.25, classes=VEHICLE_CLASSES
+        )[0]
+        for i in np.argsort(-car_confs)[:MAX_CANDIDATES - len(regions)]:
+            regions.append(_expand_region(car_boxes[i], w_img, h_img, scale=1.1, min_side=refine_imgsz // 2))
+
+    if not regions and use_tiles and max(h_img, w_img) >= TILE_MIN_SIDE:
+        regions = _tile_regions(w_img, h_img)
+
+    if not regions:
+        return None, None
+
+    # Stage 2: full-resolution re-detection inside candidate regions
+    detections = _refine_in_regions(img_bgr, model, regions, conf, refine_imgsz)
+    if detections:
+        # Same selection rule as get_box: the largest plate wins
+        x1, y1, x2, y2, _ = max(detections, key=lambda d: max(0, d[2] - d[0]) * max(0, d[3] - d[1]))
+    elif len(order) and plate_confs[order[0]] >= conf:
+        # Refinement lost a plate the coarse pass already found at full
+        # confidence: keep it, as the single-pass get_box would have
+        x1, y1, x2, y2 = plate_boxes[order[0]]
+    else:
+        return None, None
+
+    x1 = max(0, min(int(x1), w_img - 1))
+    x2 = max(0, min(int(x2), w_img))
+    y1 = max(0, min(int(y1), h_img - 1))
+    y2 = max(0, min(int(y2), h_img))
+
+    cropped = img_bgr[y1:y2, x1:x2].copy()
+
+    return cropped, (x1, y1, x2, y2)
@@ -172,9 +172,32 @@ export async function createViolation(latitude: number, longitude: number, notes
     });
 }
 
-export async function getUserViolations(): Promise<ViolationResponse[]> {
+export type ViolationListItem = {
+    id: string;
+    status: string;
+    license_plate?: string;
+    latitude?: number;
+    longitude?: number;
+    address?: string;
+    violation_type?: string;
+    violation_code?: string;
+    created_at: string;
+    submitted_at?: string;
+    resolved_at?: string;
+};
+
+export type ViolationPage = {
+    items: ViolationListItem[];
+    next_cursor?: string | null;
+};
+
+export async function getUserViolations(cursor?: string, limit = 50): Promise<ViolationPage> {
     const headers = await getAuthHeaders();
-    return fetchJson(`${API_BASE}/users/me/violations`, {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (cursor) {
+        params.append('cursor', cursor);
+    }
+    return fetchJson(`${API_BASE}/users/me/violations?${params}`, {
         method: 'GET',
         headers
     });
@@ -244,6 +267,92 @@ export async function getTimerStatus(violationId: string): Promise<TimerStatusRe
     });
 }
 
+export type TimerStreamHandlers = {
+    onStatus: (status: TimerStatusResponse) => void;
+    // The stream ended on its own (timer expired or not running) or failed; not called after close()
+    onEnd: (error?: unknown) => void;
+};
+
+// Server-Sent Events of /timer-status/stream: a `status` event first, then
+// `tick` events with seconds_remaining, then a final `status` with
+// can_submit true. Read through XMLHttpRequest, whose responseText grows as
+// the events arrive (React Native's fetch cannot stream a body). Returns close().
+export function streamTimerStatus(violationId: string, handlers: TimerStreamHandlers): () => void {
+    const url = `${VIOLATIONS_ENDPOINT}/${violationId}/timer-status/stream`;
+    const xhr = new XMLHttpRequest();
+    let status: TimerStatusResponse | null = null;
+    let parsed = 0;
+    let closed = false;
+
+    const end = (error?: unknown) => {
+        if (closed) return;
+        closed = true;
+        handlers.onEnd(error);
+    };
+
+    const handleEvent = (message: string) => {
+        let event = 'message';
+        const data: string[] = [];
+        for (const line of message.split('\n')) {
+            if (line.startsWith('event:')) event = line.slice(6).trim();
+            else if (line.startsWith('data:')) data.push(line.slice(5).trim());
+        }
+        if (!data.length) return;
+        const payload = JSON.parse(data.join('\n'));
+        if (event === 'status') status = payload;
+        else if (event === 'tick' && status) status = { ...status, ...payload };
+        else return;
+        handlers.onStatus(status as TimerStatusResponse);
+    };
+
+    // Events are separated by a blank line; a partial one waits for more text
+    const drain = () => {
+        const text = xhr.responseText;
+        let boundary;
+        while (!closed && (boundary = text.indexOf('\n\n', parsed)) !== -1) {
+            const message = text.slice(parsed, boundary);
+            parsed = boundary + 2;
+            try {
+                handleEvent(message);
+            } catch (error) {
+                xhr.abort();
+                end(error);
+            }
+        }
+    };
+
+    xhr.onprogress = () => {
+        if (xhr.status >= 200 && xhr.status < 300) drain();
+    };
+    xhr.onload = async () => {
+        if (xhr.status === 401) {
+            await clearAuthToken();
+            end(new Error('Unauthorized'));
+        } else if (xhr.status < 200 || xhr.status >= 300) {
+            end({ status: xhr.status, data: xhr.responseText });
+        } else {
+            drain();
+            end();
+        }
+    };
+    xhr.onerror = () => end(new Error('Timer status stream failed'));
+
+    getAuthHeaders().then((headers) => {
+        if (closed) return;
+        console.log(`[API] GET ${url} (stream)`);
+        xhr.open('GET', url);
+        for (const [name, value] of Object.entries({ ...headers, Accept: 'text/event-stream' })) {
+            xhr.setRequestHeader(name, value);
+        }
+        xhr.send();
+    }, end);
+
+    return () => {
+        closed = true;
+        xhr.abort();
+    };
+}
+
 export async function getEvidence(violationId: string): Promise<EvidenceResponse> {
     const headers = await getAuthHeaders();
     return fetchJson(`${VIOLATIONS_ENDPOINT}/${violationId}/evidence`, {